@@ -0,0 +1,98 @@
+"""Benchmark of the memory used by the port table entities.
+
+Compares the size of SubPort, RomePort and LogicalPort objects with the
+size of the same objects that keep their attributes, including derived
+ones, in __dict__ as it was before __slots__. Run from the repository root:
+python -m benchmarks.port_entities_memory
+"""
+import sys
+
+from w2w_rome.helpers.port_entity import PortTable
+
+from tests.w2w_rome.base import (
+    PORT_SHOW_MATRIX_A,
+    PORT_SHOW_MATRIX_Q128_1,
+    PORT_SHOW_MATRIX_Q128_2,
+    PORT_SHOW_MATRIX_XY,
+)
+
+SUB_PORT_DICT_ATTRS = (
+    "direction",
+    "sub_port_id",
+    "sub_port_full_name",
+    "sub_port_name",
+    "locked",
+    "enabled",
+    "connected",
+    "connected_to_direction",
+    "connected_to_sub_port_id",
+    "port_resource",
+    "original_logical_name",
+    "blade_letter",
+    "logical",
+    "port_name",
+)
+ROME_PORT_DICT_ATTRS = ("port_resource", "port_name", "sub_port_id", "e_port", "w_port")
+LOGICAL_PORT_DICT_ATTRS = (
+    "name",
+    "blade_letter",
+    "port_id",
+    "_rome_ports_map",
+    "is_q_port",
+)
+
+
+class DictEntity(object):
+    """Entity that keeps attributes in __dict__."""
+
+    def __init__(self, entity, attrs):
+        for attr in attrs:
+            setattr(self, attr, getattr(entity, attr))
+
+
+def get_size(obj):
+    size = sys.getsizeof(obj)
+    if hasattr(obj, "__dict__"):
+        size += sys.getsizeof(obj.__dict__)
+    return size
+
+
+def get_entities(port_table):
+    for logical_port in port_table:
+        yield logical_port, LOGICAL_PORT_DICT_ATTRS
+        for rome_port in logical_port:
+            yield rome_port, ROME_PORT_DICT_ATTRS
+            yield rome_port.e_port, SUB_PORT_DICT_ATTRS
+            yield rome_port.w_port, SUB_PORT_DICT_ATTRS
+
+
+def main():
+    port_tables = (
+        ("Matrix A", PortTable.from_output(PORT_SHOW_MATRIX_A, "host")),
+        ("Matrix XY", PortTable.from_output(PORT_SHOW_MATRIX_XY, "host")),
+        (
+            "Matrix Q128, two hosts",
+            PortTable.from_output(PORT_SHOW_MATRIX_Q128_1, "host1")
+            + PortTable.from_output(PORT_SHOW_MATRIX_Q128_2, "host2"),
+        ),
+    )
+    for name, port_table in port_tables:
+        entities = list(get_entities(port_table))
+        slots_size = sum(get_size(entity) for entity, _ in entities)
+        dict_size = sum(
+            get_size(DictEntity(entity, attrs)) for entity, attrs in entities
+        )
+        print(  # noqa: T201
+            "{}: {} objects, __dict__ {:.1f}KiB, __slots__ {:.1f}KiB, "
+            "{:.1f}x less".format(
+                name,
+                len(entities),
+                dict_size / 1024.0,
+                slots_size / 1024.0,
+                float(dict_size) / slots_size,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
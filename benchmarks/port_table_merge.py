@@ -0,0 +1,56 @@
+"""Benchmark of merging port tables of a few hosts.
+
+Compares PortTable.merge with the previous merge that copied every sub port
+into a new table. Run from the repository root:
+python -m benchmarks.port_table_merge
+"""
+import timeit
+from copy import copy
+
+from w2w_rome.helpers.port_entity import PortTable
+
+from tests.w2w_rome.base import PORT_SHOW_MATRIX_Q128_1, PORT_SHOW_MATRIX_Q128_2
+
+NUMBER = 100
+REPEAT = 5
+
+
+def add_with_copy(first_port_table, second_port_table):
+    """Merge port tables as PortTable.__add__ did before."""
+    new_port_table = PortTable()
+    for port_name, first_logical_port in first_port_table._map_ports.items():
+        second_logical_port = second_port_table[port_name]
+        new_logical_port = new_port_table.get_or_create(port_name)
+
+        for logical_port in (first_logical_port, second_logical_port):
+            for rome_port in logical_port:
+                new_logical_port.add_sub_port(copy(rome_port.e_port))
+                new_logical_port.add_sub_port(copy(rome_port.w_port))
+
+    return new_port_table
+
+
+def main():
+    port_tables = [
+        PortTable.from_output(PORT_SHOW_MATRIX_Q128_1, "host1"),
+        PortTable.from_output(PORT_SHOW_MATRIX_Q128_2, "host2"),
+    ]
+    copy_time = min(
+        timeit.repeat(lambda: add_with_copy(*port_tables), number=NUMBER, repeat=REPEAT)
+    )
+    merge_time = min(
+        timeit.repeat(
+            lambda: PortTable.merge(port_tables), number=NUMBER, repeat=REPEAT
+        )
+    )
+    print(  # noqa: T201
+        "Matrix Q128, two hosts: copy {:.2f}ms, merge {:.2f}ms, speedup {:.1f}x".format(
+            copy_time / NUMBER * 1000,
+            merge_time / NUMBER * 1000,
+            copy_time / merge_time,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Benchmark of the prompt detection.
+
+Compares the previous backtracking prompt regex with the current one and with
+the PromptMatcher used by Rome sessions. Outputs with "completed" log lines
+followed by a not log line are adversarial for the previous regex, its time
+grows exponentially with the number of the lines. Run from the repository root:
+python -m benchmarks.prompt_matcher
+"""
+import re
+import timeit
+
+from w2w_rome.cli.rome_command_modes import DefaultCommandMode
+
+from tests.w2w_rome.base import PORT_SHOW_MATRIX_A
+
+PREVIOUS_PROMPT = r"(?i)\w+\[\w+\]#\s*{}$".format(
+    r"(\d{1,2}-\d{1,2}-\d{2,4}\s\d{1,2}:\d{1,2}\s"
+    r"("
+    r"((dis)?connecting\.{3}\n?)|"
+    r"((connection operation \w+:\w+\[\w+\]<->\w+\[\w+\]\sop:\w+\n?)+|"
+    r"(connection .+ completed .+\n))*"
+    r")"
+    r")*"
+)
+OPERATION_LOG = (
+    "08-06-2019 09:01 CONNECTION OPERATION SUCCEEDED:E3[1AE3]<->W4[1AW4] "
+    "OP:connect\n"
+)
+COMPLETED_LOG = "08-06-2019 09:01 Connection A3<->A4 completed successfully\n"
+FIXTURES = (
+    ("port show", PORT_SHOW_MATRIX_A, True),
+    (
+        "port show with 50 logs after the prompt",
+        PORT_SHOW_MATRIX_A + "\n" + OPERATION_LOG * 50,
+        True,
+    ),
+    ("8 completed logs, no prompt", "ROME[OPER]# " + COMPLETED_LOG * 8 + "E", True),
+    ("12 completed logs, no prompt", "ROME[OPER]# " + COMPLETED_LOG * 12 + "E", True),
+    (
+        "1000 completed logs, no prompt",
+        "ROME[OPER]# " + COMPLETED_LOG * 1000 + "E",
+        False,  # the previous regex doesn't finish
+    ),
+)
+NUMBER = 10
+REPEAT = 3
+
+
+def get_time(func):
+    return min(timeit.repeat(func, number=NUMBER, repeat=REPEAT)) / NUMBER * 1000
+
+
+def main():
+    for name, output, check_previous in FIXTURES:
+        if check_previous:
+            previous_time = "{:.3f}ms".format(
+                get_time(lambda: re.search(PREVIOUS_PROMPT, output, re.DOTALL))
+            )
+        else:
+            previous_time = "-"
+        regex_time = get_time(
+            lambda: re.search(DefaultCommandMode.PROMPT, output, re.DOTALL)
+        )
+        matcher_time = get_time(lambda: DefaultCommandMode.PROMPT_MATCHER.match(output))
+        print(  # noqa: T201
+            "{}: previous regex {}, regex {:.3f}ms, matcher {:.3f}ms".format(
+                name, previous_time, regex_time, matcher_time
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -59,7 +59,10 @@ class Main(object):
         server = DriverListener(command_executor, xml_logger, command_logger)
 
         # Start listening
-        server.start_listening(port=self._port)
+        try:
+            server.start_listening(port=self._port)
+        finally:
+            driver_instance.shutdown()
 
 
 if __name__ == "__main__":
@@ -4908,8 +4908,6 @@ class BaseRomeTestCase(TestCase):
         with self.patch_sessions():
             self.driver_commands = DriverCommands(self.logger, self.runtime_config)
 
-        self.cli_handler = self.driver_commands._cli_handler
-
     def patch_sessions(self):
         return patch(
             "w2w_rome.cli.l1_cli_handler.RomeSSHSession",
@@ -4919,5 +4917,7 @@ class BaseRomeTestCase(TestCase):
         )
 
     def tearDown(self):
-        sm = self.driver_commands._cli_handler._cli._session_pool._session_manager
-        sm._existing_sessions = []
+        self.driver_commands.shutdown()
+        for cli_handler in self.driver_commands._host_group.cli_handlers:
+            sm = cli_handler._cli._session_pool._session_manager
+            sm._existing_sessions = []
@@ -5,6 +5,7 @@ from cloudshell.layer_one.core.response.resource_info.entities.chassis import Ch
 from cloudshell.layer_one.core.response.resource_info.entities.port import Port
 from mock import MagicMock, patch
 
+from w2w_rome.helpers.board_table_cache import BoardTableCache
 from w2w_rome.helpers.errors import BaseRomeException
 
 from tests.w2w_rome.base import (
@@ -677,3 +678,43 @@ class RomeTestAutoload(BaseRomeTestCase):
         )
 
         emu.check_calls()
+
+    def test_autoload_with_board_table_cache(self):
+        host = "192.168.122.10"
+        address = "{}:A".format(host)
+        user = "user"
+        password = "password"
+        self.driver_commands._board_table_cache = BoardTableCache(True)
+
+        emu = CliEmulator(
+            [
+                Command("", DEFAULT_PROMPT),
+                # autoload and getting the serial number use the board table
+                # loaded in login
+                Command("port show", PORT_SHOW_MATRIX_A),
+                Command("", DEFAULT_PROMPT),
+                # the board table is loaded again with the new session
+                Command(None, DEFAULT_PROMPT),
+                Command("", DEFAULT_PROMPT),
+                Command("show board", SHOW_BOARD),
+            ]
+        )
+        self.send_line_func_map[host] = emu.send_line
+        self.receive_all_func_map[host] = emu.receive_all
+
+        self.driver_commands.login(address, user, password)
+        info = self.driver_commands.get_resource_description(address)
+        self.assertEqual("9727-4733-2222", info.resource_info_list[0].serial_number)
+        serial_number = self.driver_commands.get_attribute_value(
+            address, "Serial Number"
+        )
+        self.assertEqual("9727-4733-2222", serial_number._value)
+
+        cli_handler = self.driver_commands._host_group.cli_handlers[0]
+        session_pool = cli_handler._cli._session_pool
+        session_pool.remove_session(session_pool._pool.get(), self.logger)
+        emu.request = None
+        with self.patch_sessions():
+            self.driver_commands.get_attribute_value(address, "Serial Number")
+
+        emu.check_calls()
@@ -1,9 +1,13 @@
+import re
+from unittest import TestCase
+
 from mock import MagicMock, patch
 
+from w2w_rome.cli.rome_command_modes import DefaultCommandMode
 from w2w_rome.cli.template_executor import RomeTemplateExecutor
 from w2w_rome.helpers.port_entity import PortTable
 
-from tests.w2w_rome.base import BaseRomeTestCase
+from tests.w2w_rome.base import DEFAULT_PROMPT, BaseRomeTestCase, CliEmulator, Command
 
 PORT_SHOW_WITH_LOG = """ROME[TECH]# port show
 
@@ -633,3 +637,85 @@ W28[1AW28]       Unlocked     Enabled     Disconnected  6                      P
             self.assertEqual(
                 fixed_str, RomeTemplateExecutor.remove_logs_from_output(raw_str)
             )
+
+
+@patch("cloudshell.cli.session.ssh_session.paramiko", MagicMock())
+@patch(
+    "cloudshell.cli.session.ssh_session.SSHSession._clear_buffer",
+    MagicMock(return_value=""),
+)
+class TestLogin(BaseRomeTestCase):
+    def test_login_to_the_same_device(self):
+        host = "192.168.122.10"
+        address = "{}:A".format(host)
+        user = "user"
+        password = "password"
+
+        emu = CliEmulator(
+            [
+                # the second login only checks the prompt of the pooled session
+                Command("", DEFAULT_PROMPT),
+            ]
+        )
+        self.send_line_func_map[host] = emu.send_line
+        self.receive_all_func_map[host] = emu.receive_all
+
+        self.driver_commands.login(address, user, password)
+        self.driver_commands.login(address, user, password)
+
+        emu.check_calls()
+
+
+class TestPromptMatcher(TestCase):
+    OUTPUTS = (
+        ("ROME[OPER]#", True),
+        ("ROME[OPER]# ", True),
+        ("ROME[OPER]# show board\nOPERATION COUNT  7766\nROME[OPER]# ", True),
+        (
+            "ROME[TECH]# connection create A3 to A4\n"
+            "OK - request added to pending queue (A3-A4)\n"
+            "ROME[TECH]# 08-06-2019 09:01 CONNECTING...\n"
+            "08-06-2019 09:01 CONNECTION OPERATION SUCCEEDED:E3[1AE3]<->W4[1AW4] "
+            "OP:connect\n"
+            "08-06-2019 09:01 Connection A3<->A4 completed successfully\n",
+            True,
+        ),
+        ("ROME[TECH]# \n08-05-2019 12:19 DISCONNECTING...", True),
+        ("ROME[TECH]# connection create A3 to A4\nOK - request added", False),
+        ("ROME[OPER]# port show\nE1[1AE1]         Unlocked     Enabled", False),
+        (
+            "ROME[OPER]# \n"
+            "08-06-2019 09:01 Connection A3<->A4 completed successfully\n" * 30 + "E",
+            False,
+        ),
+        ("", False),
+        (
+            "ROME[TECH]# \n08-06-2019 09:01 Connection A3<->A4 completed successfully",
+            False,
+        ),
+        ("ROME[TECH]# 08-06-2019 09:01 Connection A3<->A4 completed", False),
+        (
+            "ROME[TECH]# 08-06-2019 09:01 Connection A3<->A4 completed successfully\n",
+            True,
+        ),
+        ("OK - request added to pending queue ROME[TECH]# ", False),
+    )
+
+    def test_matcher_is_same_as_prompt_regex(self):
+        for output, expected in self.OUTPUTS:
+            self.assertEqual(
+                expected, DefaultCommandMode.PROMPT_MATCHER.match(output), output
+            )
+            self.assertEqual(
+                expected,
+                bool(re.search(DefaultCommandMode.PROMPT, output, re.DOTALL)),
+                output,
+            )
+
+    def test_logs_with_skipped_operation(self):
+        output = (
+            "ROME[OPER]# \n08-02-2020 10:48 CONNECTION OPERATION SKIPPED(already "
+            "done):E6[1AE6]<->W5[1AW5] OP:disconnect\n"
+        )
+
+        self.assertTrue(DefaultCommandMode.PROMPT_MATCHER.match(output))
@@ -1,13 +1,17 @@
 import re
+import time
 
 from mock import MagicMock, patch
 
+from w2w_rome.cli.rome_sessions import RomeSSHSession
 from w2w_rome.helpers.errors import (
     BaseRomeException,
     ConnectionPortsError,
     NotSupportedError,
 )
+from w2w_rome.helpers.poll_scheduler import BackoffPollScheduler
 from w2w_rome.helpers.port_entity import SubPort
+from w2w_rome.helpers.port_table_cache import PortTableCache
 
 from tests.w2w_rome.base import (
     DEFAULT_PROMPT,
@@ -20,6 +24,7 @@ from tests.w2w_rome.base import (
     PORT_SHOW_MATRIX_Q128_2_CHANGED_PORT,
     PORT_SHOW_MATRIX_XY,
     PORT_SHOW_MATRIX_XY_CHANGED_PORT,
+    SHOW_BOARD,
     BaseRomeTestCase,
     CliEmulator,
     Command,
@@ -124,6 +129,21 @@ def set_port_disconnected(sub_port_name, port_show_output):
     return port_show_output
 
 
+def get_port_info(logical_name, port_show_output):
+    lines = port_show_output.splitlines()
+    sub_port_lines = [
+        line
+        for line in lines
+        if re.search(r"\s{}\s*$".format(logical_name), line, re.IGNORECASE)
+    ]
+    return "\n".join(
+        ["ROME[OPER]# port show {}".format(logical_name)]
+        + lines[1:4]
+        + sub_port_lines
+        + ["ROME[OPER]#"]
+    )
+
+
 @patch("cloudshell.cli.session.ssh_session.paramiko", MagicMock())
 @patch(
     "cloudshell.cli.session.ssh_session.SSHSession._clear_buffer",
@@ -471,6 +491,51 @@ ROME[TECH]# 08-06-2019 09:01 CONNECTING...
 
         emu.check_calls()
 
+    def test_map_bidi_operation_statistics(self):
+        host = "192.168.122.10"
+        address = "{}:A".format(host)
+        user = "user"
+        password = "password"
+        src_port = "{}/1/003".format(address)
+        dst_port = "{}/1/004".format(address)
+        self.driver_commands._mapping_check_delay = 0.1
+
+        connected_port_show_a = set_port_connected("E3", "W4", PORT_SHOW_MATRIX_A)
+        connected_port_show_a = set_port_connected("E4", "W3", connected_port_show_a)
+        emu = CliEmulator(
+            [
+                Command("", DEFAULT_PROMPT),
+                Command("port show", PORT_SHOW_MATRIX_A),
+                Command(
+                    "connection create A3 to A4",
+                    "ROME[TECH]# connection create A3 to A4\n"
+                    "OK - request added to pending queue (A3-A4)\n"
+                    "ROME[TECH]# ",
+                ),
+                Command("connection show pending", get_connection_pending("A3", "A4")),
+                Command("connection show pending", CONNECTION_PENDING_EMPTY),
+                Command("port show", connected_port_show_a),
+            ]
+        )
+        self.send_line_func_map[host] = emu.send_line
+        self.receive_all_func_map[host] = emu.receive_all
+
+        self.driver_commands.login(address, user, password)
+        self.driver_commands.map_bidi(src_port, dst_port)
+
+        emu.check_calls()
+        statistics = self.driver_commands._operation_statistics.as_dict()
+        self.assertEqual(
+            {"submit", "queue_wait", "completion", "verification"},
+            set(statistics[host]["A"]),
+        )
+        self.assertEqual(1, statistics[host]["A"]["completion"]["count"])
+        self.assertIsNotNone(
+            self.driver_commands._operation_statistics.get_expected_move_duration(
+                host, "A"
+            )
+        )
+
     def test_map_bidi_failed(self):
         host = "192.168.122.10"
         address = "{}:A".format(host)
@@ -561,6 +626,70 @@ ROME[TECH]# 08-06-2019 09:01 CONNECTING...
 
         emu.check_calls()
 
+    def test_map_bidi_a_few_checks_with_backoff(self):
+        host = "192.168.122.10"
+        address = "{}:A".format(host)
+        user = "user"
+        password = "password"
+        src_port = "{}/1/003".format(address)
+        dst_port = "{}/1/004".format(address)
+        poll_scheduler = BackoffPollScheduler(0.01, 0.04, factor=2, jitter=0.1)
+        self.driver_commands._poll_scheduler = poll_scheduler
+
+        connected_port_show_a = set_port_connected("E3", "W4", PORT_SHOW_MATRIX_A)
+        connected_port_show_a = set_port_connected("E4", "W3", connected_port_show_a)
+        emu = CliEmulator(
+            [
+                Command("", DEFAULT_PROMPT),
+                Command("port show", PORT_SHOW_MATRIX_A),
+                Command(
+                    "connection create A3 to A4",
+                    """ROME[TECH]# connection create A3 to A4
+OK - request added to pending queue (A3-A4)
+ROME[TECH]# 08-06-2019 09:01 CONNECTING...
+08-06-2019 09:01 CONNECTION OPERATION SUCCEEDED:E3[1AE3]<->W4[1AW4] OP:connect
+08-06-2019 09:01 CONNECTION OPERATION SUCCEEDED:E4[1AE2]<->W3[1AW3] OP:connect
+08-06-2019 09:01 Connection A3<->A4 completed successfully
+""",
+                ),
+                Command("connection show pending", get_connection_pending("A3", "A4")),
+                Command("connection show pending", get_connection_pending("A3", "A4")),
+                Command("connection show pending", get_connection_pending("A3", "A4")),
+                Command("connection show pending", CONNECTION_PENDING_EMPTY),
+                Command("port show", connected_port_show_a),
+            ]
+        )
+        self.send_line_func_map[host] = emu.send_line
+        self.receive_all_func_map[host] = emu.receive_all
+
+        self.driver_commands.login(address, user, password)
+        self.driver_commands.map_bidi(src_port, dst_port)
+
+        emu.check_calls()
+        statistics = poll_scheduler.statistics.as_dict()
+        self.assertEqual(["A"], statistics.keys())
+        self.assertEqual(1, statistics["A"]["waits"])
+        self.assertEqual(4, statistics["A"]["polls"])
+        # the first check of the next wait is done near the expected completion
+        # of its moves
+        expected_duration = (
+            poll_scheduler.statistics.get_expected_move_duration("A") * 4
+        )
+        first_delay = poll_scheduler.new_schedule("A", 4).next_delay()
+        self.assertAlmostEqual(
+            first_delay, expected_duration * 0.8, delta=expected_duration * 0.09
+        )
+        # but not later than the timeout
+        first_delay = poll_scheduler.new_schedule(
+            "A", 4, expected_duration * 0.5
+        ).next_delay()
+        self.assertAlmostEqual(
+            first_delay, expected_duration * 0.5, delta=expected_duration * 0.06
+        )
+        # we don't have statistics for the matrix Q
+        first_delay = poll_scheduler.new_schedule("Q").next_delay()
+        self.assertAlmostEqual(first_delay, 0.01, delta=0.0011)
+
     def test_map_bidi_q_ports(self):
         host = "192.168.122.10"
         address = "{}:Q".format(host)
@@ -799,58 +928,764 @@ ROME[TECH]# 08-06-2019 09:01 CONNECTING...
 
         emu.check_calls()
 
-
-@patch("cloudshell.cli.session.ssh_session.paramiko", MagicMock())
-@patch(
-    "cloudshell.cli.session.ssh_session.SSHSession._clear_buffer",
-    MagicMock(return_value=""),
-)
-class RomeTestMapClear(BaseRomeTestCase):
-    def test_map_clear_matrix_b(self):
+    def test_map_bidi_with_port_table_cache(self):
         host = "192.168.122.10"
-        address = "{}:B".format(host)
+        address = "{}:A".format(host)
         user = "user"
         password = "password"
-        ports = ["{}/1/{}".format(address, port_id) for port_id in (249, 218, 246)]
+        src_port = "{}/1/003".format(address)
+        dst_port = "{}/1/004".format(address)
         self.driver_commands._mapping_check_delay = 0.1
+        self.driver_commands._port_table_cache = PortTableCache(60)
 
-        disconnected_port_show_b = set_port_disconnected("E246", PORT_SHOW_MATRIX_B)
-        disconnected_port_show_b = set_port_disconnected(
-            "E249", disconnected_port_show_b
+        emu = CliEmulator(
+            [
+                Command("", DEFAULT_PROMPT),
+                Command("port show", PORT_SHOW_MATRIX_A),
+                Command(
+                    "connection create A3 to A4",
+                    """ROME[TECH]# connection create A3 to A4
+OK - request added to pending queue (A3-A4)
+ROME[TECH]# 08-06-2019 09:01 CONNECTING...
+08-06-2019 09:01 CONNECTION OPERATION SUCCEEDED:E3[1AE3]<->W4[1AW4] OP:connect
+08-06-2019 09:01 CONNECTION OPERATION SUCCEEDED:E4[1AE2]<->W3[1AW3] OP:connect
+08-06-2019 09:01 Connection A3<->A4 completed successfully
+""",
+                ),
+                Command("connection show pending", CONNECTION_PENDING_EMPTY),
+                # the second MapBidi uses the port table from the cache
+                Command("", DEFAULT_PROMPT),
+            ]
         )
-        disconnected_port_show_b = set_port_disconnected(
-            "E253", disconnected_port_show_b
+        self.send_line_func_map[host] = emu.send_line
+        self.receive_all_func_map[host] = emu.receive_all
+
+        self.driver_commands.login(address, user, password)
+        self.driver_commands.map_bidi(src_port, dst_port)
+        self.driver_commands.map_bidi(src_port, dst_port)
+
+        emu.check_calls()
+
+    def test_map_bidi_with_port_table_cache_reload_table(self):
+        host = "192.168.122.10"
+        address = "{}:A".format(host)
+        user = "user"
+        password = "password"
+        src_port = "{}/1/003".format(address)
+        dst_port = "{}/1/004".format(address)
+        self.driver_commands._mapping_check_delay = 0.1
+        self.driver_commands._port_table_cache = PortTableCache(60)
+
+        connected_port_show_a = set_port_connected("E3", "W4", PORT_SHOW_MATRIX_A)
+        connected_port_show_a = set_port_connected("E4", "W3", connected_port_show_a)
+        emu = CliEmulator(
+            [
+                Command("", DEFAULT_PROMPT),
+                Command("port show", PORT_SHOW_MATRIX_A),
+                Command(
+                    "connection create A3 to A4",
+                    """ROME[TECH]# connection create A3 to A4
+OK - request added to pending queue (A3-A4)
+ROME[TECH]# 08-06-2019 09:01 CONNECTING...
+08-06-2019 09:01 CONNECTION OPERATION SUCCEEDED:E3[1AE3]<->W4[1AW4] OP:connect
+""",
+                ),
+                Command("connection show pending", CONNECTION_PENDING_EMPTY),
+                # didn't get logs for all sub ports, so reload the port table
+                Command("port show", connected_port_show_a),
+                Command("", DEFAULT_PROMPT),
+            ]
         )
+        self.send_line_func_map[host] = emu.send_line
+        self.receive_all_func_map[host] = emu.receive_all
+
+        self.driver_commands.login(address, user, password)
+        self.driver_commands.map_bidi(src_port, dst_port)
+        self.driver_commands.map_bidi(src_port, dst_port)
+
+        emu.check_calls()
+
+    def test_map_bidi_with_port_table_cache_unknown_operation(self):
+        host = "192.168.122.10"
+        address = "{}:A".format(host)
+        user = "user"
+        password = "password"
+        src_port = "{}/1/003".format(address)
+        dst_port = "{}/1/004".format(address)
+        self.driver_commands._mapping_check_delay = 0.1
+        self.driver_commands._port_table_cache = PortTableCache(60)
+
+        connected_port_show_a = set_port_connected("E3", "W4", PORT_SHOW_MATRIX_A)
+        connected_port_show_a = set_port_connected("E4", "W3", connected_port_show_a)
         emu = CliEmulator(
             [
                 Command("", DEFAULT_PROMPT),
-                Command("port show", PORT_SHOW_MATRIX_B),
+                Command("port show", PORT_SHOW_MATRIX_A),
                 Command(
-                    "connection disconnect E246 from W247",
-                    """ROME[TECH]# connection disconnect E246 from W247
-OK - request added to pending queue (E246-W247)
-ROME[TECH]# 08-05-2019 12:19 DISCONNECTING...
-08-05-2019 12:19 CONNECTION OPERATION SUCCEEDED:E246[1AE246]<->W247[1AW247] OP:disconnect
-""",  # noqa: E501
+                    "connection create A3 to A4",
+                    """ROME[TECH]# connection create A3 to A4
+OK - request added to pending queue (A3-A4)
+ROME[TECH]# 08-06-2019 09:01 CONNECTING...
+08-06-2019 09:01 CONNECTION OPERATION SUCCEEDED:E3[1AE3]<->W4[1AW4] OP:connect
+08-06-2019 09:01 CONNECTION OPERATION SUCCEEDED:E4[1AE2]<->W3[1AW3] OP:connect
+08-06-2019 09:01 CONNECTION OPERATION SUCCEEDED:E5[1AE5]<->W6[1AW6] OP:unlock
+08-06-2019 09:01 Connection A3<->A4 completed successfully
+""",
                 ),
+                Command("connection show pending", CONNECTION_PENDING_EMPTY),
+                # cannot apply the unknown operation, so reload the port table
+                Command("port show", connected_port_show_a),
+                Command("", DEFAULT_PROMPT),
+            ]
+        )
+        self.send_line_func_map[host] = emu.send_line
+        self.receive_all_func_map[host] = emu.receive_all
+
+        self.driver_commands.login(address, user, password)
+        self.driver_commands.map_bidi(src_port, dst_port)
+        self.driver_commands.map_bidi(src_port, dst_port)
+
+        emu.check_calls()
+
+    def test_map_bidi_with_port_table_cache_failed(self):
+        host = "192.168.122.10"
+        address = "{}:A".format(host)
+        user = "user"
+        password = "password"
+        src_port = "{}/1/003".format(address)
+        dst_port = "{}/1/004".format(address)
+        self.driver_commands._mapping_check_delay = 0.1
+        self.driver_commands._port_table_cache = PortTableCache(60)
+
+        connected_port_show_a = set_port_connected("E3", "W4", PORT_SHOW_MATRIX_A)
+        emu = CliEmulator(
+            [
+                Command("", DEFAULT_PROMPT),
+                Command("port show", PORT_SHOW_MATRIX_A),
                 Command(
-                    "connection disconnect E249 from W253",
-                    """ROME[TECH]# connection disconnect E249 from W253
-OK - request added to pending queue (E249-W253)
-ROME[TECH]# 08-05-2019 12:19 DISCONNECTING...
-08-05-2019 12:19 CONNECTION OPERATION SUCCEEDED:E249[1AE249]<->W253[1AW253] OP:disconnect
-""",  # noqa: E501
+                    "connection create A3 to A4",
+                    """ROME[TECH]# connection create A3 to A4
+OK - request added to pending queue (A3-A4)
+ROME[TECH]# 08-06-2019 09:01 CONNECTING...
+08-06-2019 09:01 CONNECTION OPERATION SUCCEEDED:E3[1AE3]<->W4[1AW4] OP:connect
+08-06-2019 09:01 CONNECTION OPERATION FAILED:E4[1AE2]<->W3[1AW3] OP:connect
+""",
                 ),
+                Command("connection show pending", CONNECTION_PENDING_EMPTY),
+                Command("port show", connected_port_show_a),
                 Command(
-                    "connection disconnect E253 from W249",
-                    """ROME[TECH]# connection disconnect E253 from W249
-OK - request added to pending queue (E253-W249)
+                    "connection disconnect A3 from A4",
+                    """ROME[TECH]# connection disconnect A3 from A4
+OK - request added to pending queue (A3-A4)
 ROME[TECH]# 08-05-2019 12:19 DISCONNECTING...
-08-05-2019 12:19 CONNECTION OPERATION SUCCEEDED:E253[1AE253]<->W249[1AW249] OP:disconnect
-""",  # noqa: E501
+08-05-2019 12:19 CONNECTION OPERATION SUCCEEDED:E3[1AE3]<->W4[1AW4] OP:disconnect
+""",
                 ),
                 Command("connection show pending", CONNECTION_PENDING_EMPTY),
-                Command("port show", disconnected_port_show_b),
+            ]
+        )
+        self.send_line_func_map[host] = emu.send_line
+        self.receive_all_func_map[host] = emu.receive_all
+
+        self.driver_commands.login(address, user, password)
+
+        with self.assertRaisesRegexp(
+            ConnectionPortsError, "Cannot connect port A3 to port A4"
+        ):
+            self.driver_commands.map_bidi(src_port, dst_port)
+
+        # we don't know the state of the ports after the failed mapping
+        self.assertIsNone(self.driver_commands._port_table_cache.get())
+
+    def test_map_bidi_with_port_table_change_detection(self):
+        host = "192.168.122.10"
+        address = "{}:A".format(host)
+        user = "user"
+        password = "password"
+        src_port = "{}/1/003".format(address)
+        dst_port = "{}/1/004".format(address)
+        self.driver_commands._port_table_cache = PortTableCache(
+            0, change_detection=True
+        )
+
+        connected_port_show_a = set_port_connected("E3", "W4", PORT_SHOW_MATRIX_A)
+        connected_port_show_a = set_port_connected("E4", "W3", connected_port_show_a)
+        show_board_changed = SHOW_BOARD.replace(
+            "OPERATION COUNT  7766", "OPERATION COUNT  7767"
+        )
+        emu = CliEmulator(
+            [
+                Command("", DEFAULT_PROMPT),
+                Command("show board", SHOW_BOARD),
+                Command("port show", connected_port_show_a),
+                # operation counter isn't changed, use the port table from the cache
+                Command("", DEFAULT_PROMPT),
+                Command("show board", SHOW_BOARD),
+                # operation counter is changed, reload the port table
+                Command("", DEFAULT_PROMPT),
+                Command("show board", show_board_changed),
+                Command("port show", connected_port_show_a),
+            ]
+        )
+        self.send_line_func_map[host] = emu.send_line
+        self.receive_all_func_map[host] = emu.receive_all
+
+        self.driver_commands.login(address, user, password)
+        self.driver_commands.map_bidi(src_port, dst_port)
+        self.driver_commands.map_bidi(src_port, dst_port)
+        self.driver_commands.map_bidi(src_port, dst_port)
+
+        emu.check_calls()
+        emu.check_calls()
+
+    def test_map_bidi_async_submission(self):
+        host = "192.168.122.10"
+        address = "{}:A".format(host)
+        user = "user"
+        password = "password"
+        src_port = "{}/1/003".format(address)
+        dst_port = "{}/1/004".format(address)
+        self.driver_commands._mapping_check_delay = 0.1
+        self.driver_commands._async_mapping = True
+
+        connected_port_show_a = set_port_connected("E3", "W4", PORT_SHOW_MATRIX_A)
+        connected_port_show_a = set_port_connected("E4", "W3", connected_port_show_a)
+        emu = CliEmulator(
+            [
+                Command("", DEFAULT_PROMPT),
+                Command("port show", PORT_SHOW_MATRIX_A),
+                Command(
+                    "connection create A3 to A4",
+                    "ROME[TECH]# connection create A3 to A4\n"
+                    "OK - request added to pending queue (A3-A4)\n"
+                    "ROME[TECH]# ",
+                ),
+                # completed in background
+                Command("", DEFAULT_PROMPT),
+                Command("connection show pending", get_connection_pending("A3", "A4")),
+                Command("", DEFAULT_PROMPT),
+                Command("connection show pending", CONNECTION_PENDING_EMPTY),
+                Command("port show", connected_port_show_a),
+                # the next mapping of the ports waits for the background one
+                Command("", DEFAULT_PROMPT),
+                Command("port show", connected_port_show_a),
+            ]
+        )
+        self.send_line_func_map[host] = emu.send_line
+        self.receive_all_func_map[host] = emu.receive_all
+
+        self.driver_commands.login(address, user, password)
+        handle = self.driver_commands.map_bidi_multiple([(src_port, dst_port)])
+        handles = self.driver_commands._mapping_tracker.get_handles()
+        self.assertEqual([handle], handles)
+        self.assertEqual({"A3", "A4"}, handles[0].port_names)
+
+        self.driver_commands.map_bidi(src_port, dst_port)
+
+        emu.check_calls()
+        self.assertTrue(handles[0].done)
+        self.assertIsNone(handles[0].error)
+        # the background wait is added to the statistics as the waits of map_bidi
+        statistics = self.driver_commands._operation_statistics.as_dict()
+        self.assertEqual(
+            {"submit", "queue_wait", "completion", "verification"},
+            set(statistics[host]["A"]),
+        )
+
+    def test_map_bidi_completed_without_check_delay(self):
+        host = "192.168.122.10"
+        address = "{}:A".format(host)
+        user = "user"
+        password = "password"
+        src_port = "{}/1/003".format(address)
+        dst_port = "{}/1/004".format(address)
+        self.driver_commands._mapping_check_delay = 10
+
+        connected_port_show_a = set_port_connected("E3", "W4", PORT_SHOW_MATRIX_A)
+        connected_port_show_a = set_port_connected("E4", "W3", connected_port_show_a)
+        emu = CliEmulator(
+            [
+                Command("", DEFAULT_PROMPT),
+                Command("port show", PORT_SHOW_MATRIX_A),
+                Command(
+                    "connection create A3 to A4",
+                    """ROME[TECH]# connection create A3 to A4
+OK - request added to pending queue (A3-A4)
+ROME[TECH]# 08-06-2019 09:01 CONNECTING...
+08-06-2019 09:01 CONNECTION OPERATION SUCCEEDED:E3[1AE3]<->W4[1AW4] OP:connect
+08-06-2019 09:01 CONNECTION OPERATION SUCCEEDED:E4[1AE2]<->W3[1AW3] OP:connect
+08-06-2019 09:01 Connection A3<->A4 completed successfully
+""",
+                ),
+                Command("connection show pending", CONNECTION_PENDING_EMPTY),
+                Command("port show", connected_port_show_a),
+            ]
+        )
+        self.send_line_func_map[host] = emu.send_line
+        self.receive_all_func_map[host] = emu.receive_all
+
+        self.driver_commands.login(address, user, password)
+        start_time = time.time()
+        self.driver_commands.map_bidi(src_port, dst_port)
+
+        self.assertLess(time.time() - start_time, 5)
+        emu.check_calls()
+
+    def test_map_bidi_completed_log_from_session(self):
+        host = "192.168.122.10"
+        address = "{}:A".format(host)
+        user = "user"
+        password = "password"
+        src_port = "{}/1/003".format(address)
+        dst_port = "{}/1/004".format(address)
+        self.driver_commands._mapping_check_delay = 10
+
+        connected_port_show_a = set_port_connected("E3", "W4", PORT_SHOW_MATRIX_A)
+        connected_port_show_a = set_port_connected("E4", "W3", connected_port_show_a)
+        emu = CliEmulator(
+            [
+                Command("", DEFAULT_PROMPT),
+                Command("port show", PORT_SHOW_MATRIX_A),
+                Command(
+                    "connection create A3 to A4",
+                    """ROME[TECH]# connection create A3 to A4
+OK - request added to pending queue (A3-A4)
+ROME[TECH]# 08-06-2019 09:01 CONNECTING...
+""",
+                ),
+                Command("connection show pending", CONNECTION_PENDING_EMPTY),
+                Command("port show", connected_port_show_a),
+            ]
+        )
+        self.send_line_func_map[host] = emu.send_line
+        self.receive_all_func_map[host] = emu.receive_all
+        logs = [
+            "",
+            """08-06-2019 09:01 CONNECTION OPERATION SUCCEEDED:E3[1AE3]<->W4[1AW4] OP:connect
+08-06-2019 09:01 CONNECTION OPERATION SUCCEEDED:E4[1AE2]<->W3[1AW3] OP:connect
+08-06-2019 09:01 Connection A3<->A4 completed successfully
+""",  # noqa: E501
+        ]
+
+        def clear_buffer(*args, **kwargs):
+            if emu.request == "connection create A3 to A4" and logs:
+                return logs.pop(0)
+            return ""
+
+        self.driver_commands.login(address, user, password)
+        start_time = time.time()
+        with patch.object(RomeSSHSession, "_clear_buffer", side_effect=clear_buffer):
+            self.driver_commands.map_bidi(src_port, dst_port)
+
+        self.assertLess(time.time() - start_time, 5)
+        self.assertFalse(logs)
+        emu.check_calls()
+
+    def test_map_bidi_multiple(self):
+        host = "192.168.122.10"
+        address = "{}:A".format(host)
+        user = "user"
+        password = "password"
+        port_pairs = [
+            ("{}/1/003".format(address), "{}/1/004".format(address)),
+            ("{}/1/005".format(address), "{}/1/006".format(address)),
+        ]
+        self.driver_commands._mapping_check_delay = 0.1
+
+        connected_port_show_a = set_port_connected("E3", "W4", PORT_SHOW_MATRIX_A)
+        connected_port_show_a = set_port_connected("E4", "W3", connected_port_show_a)
+        connected_port_show_a = set_port_connected("E5", "W6", connected_port_show_a)
+        connected_port_show_a = set_port_connected("E6", "W5", connected_port_show_a)
+        emu = CliEmulator(
+            [
+                Command("", DEFAULT_PROMPT),
+                Command("port show", PORT_SHOW_MATRIX_A),
+                Command(
+                    "connection create A3 to A4",
+                    """ROME[TECH]# connection create A3 to A4
+OK - request added to pending queue (A3-A4)
+ROME[TECH]# 08-06-2019 09:01 CONNECTING...
+""",
+                ),
+                Command(
+                    "connection create A5 to A6",
+                    """ROME[TECH]# connection create A5 to A6
+OK - request added to pending queue (A5-A6)
+ROME[TECH]# """,
+                ),
+                Command("connection show pending", get_connection_pending("A3", "A4")),
+                Command("connection show pending", CONNECTION_PENDING_EMPTY),
+                Command("port show", connected_port_show_a),
+            ]
+        )
+        self.send_line_func_map[host] = emu.send_line
+        self.receive_all_func_map[host] = emu.receive_all
+
+        self.driver_commands.login(address, user, password)
+        self.driver_commands.map_bidi_multiple(port_pairs)
+
+        emu.check_calls()
+
+    def test_map_bidi_multiple_failed(self):
+        host = "192.168.122.10"
+        address = "{}:A".format(host)
+        user = "user"
+        password = "password"
+        port_pairs = [
+            ("{}/1/003".format(address), "{}/1/004".format(address)),
+            ("{}/1/005".format(address), "{}/1/006".format(address)),
+        ]
+        self.driver_commands._mapping_check_delay = 0.1
+
+        connected_port_show_a = set_port_connected("E3", "W4", PORT_SHOW_MATRIX_A)
+        connected_port_show_a = set_port_connected("E4", "W3", connected_port_show_a)
+        connected_port_show_a = set_port_connected("E5", "W6", connected_port_show_a)
+        emu = CliEmulator(
+            [
+                Command("", DEFAULT_PROMPT),
+                Command("port show", PORT_SHOW_MATRIX_A),
+                Command(
+                    "connection create A3 to A4",
+                    """ROME[TECH]# connection create A3 to A4
+OK - request added to pending queue (A3-A4)
+ROME[TECH]# """,
+                ),
+                Command(
+                    "connection create A5 to A6",
+                    """ROME[TECH]# connection create A5 to A6
+OK - request added to pending queue (A5-A6)
+ROME[TECH]# """,
+                ),
+                Command("connection show pending", CONNECTION_PENDING_EMPTY),
+                Command("port show", connected_port_show_a),
+                Command(
+                    "connection disconnect A5 from A6",
+                    """ROME[TECH]# connection disconnect A5 from A6
+OK - request added to pending queue (A5-A6)
+ROME[TECH]# """,
+                ),
+                Command("connection show pending", CONNECTION_PENDING_EMPTY),
+            ]
+        )
+        self.send_line_func_map[host] = emu.send_line
+        self.receive_all_func_map[host] = emu.receive_all
+
+        self.driver_commands.login(address, user, password)
+        with self.assertRaisesRegexp(
+            ConnectionPortsError, "Cannot connect port A5 to port A6"
+        ):
+            self.driver_commands.map_bidi_multiple(port_pairs)
+
+        emu.check_calls()
+
+    def test_map_bidi_multiple_port_used_twice(self):
+        host = "192.168.122.10"
+        address = "{}:A".format(host)
+        user = "user"
+        password = "password"
+        port_pairs = [
+            ("{}/1/003".format(address), "{}/1/004".format(address)),
+            ("{}/1/005".format(address), "{}/1/003".format(address)),
+        ]
+
+        emu = CliEmulator(
+            [Command("", DEFAULT_PROMPT), Command("port show", PORT_SHOW_MATRIX_A)]
+        )
+        self.send_line_func_map[host] = emu.send_line
+        self.receive_all_func_map[host] = emu.receive_all
+
+        self.driver_commands.login(address, user, password)
+        with self.assertRaisesRegexp(
+            ConnectionPortsError, "Port A3 is used in a few connections"
+        ):
+            self.driver_commands.map_bidi_multiple(port_pairs)
+
+        emu.check_calls()
+
+    def test_map_bidi_targeted_verification(self):
+        host = "192.168.122.10"
+        address = "{}:A".format(host)
+        user = "user"
+        password = "password"
+        src_port = "{}/1/003".format(address)
+        dst_port = "{}/1/004".format(address)
+        self.driver_commands._mapping_check_delay = 0.1
+        self.driver_commands._port_table_targeted_verification = True
+
+        connected_port_show_a = set_port_connected("E3", "W4", PORT_SHOW_MATRIX_A)
+        connected_port_show_a = set_port_connected("E4", "W3", connected_port_show_a)
+        emu = CliEmulator(
+            [
+                Command("", DEFAULT_PROMPT),
+                Command("port show", PORT_SHOW_MATRIX_A),
+                Command(
+                    "connection create A3 to A4",
+                    """ROME[TECH]# connection create A3 to A4
+OK - request added to pending queue (A3-A4)
+ROME[TECH]# 08-06-2019 09:01 CONNECTING...
+08-06-2019 09:01 CONNECTION OPERATION SUCCEEDED:E3[1AE3]<->W4[1AW4] OP:connect
+08-06-2019 09:01 CONNECTION OPERATION SUCCEEDED:E4[1AE2]<->W3[1AW3] OP:connect
+08-06-2019 09:01 Connection A3<->A4 completed successfully
+""",
+                ),
+                Command("connection show pending", CONNECTION_PENDING_EMPTY),
+                Command("port show A3", get_port_info("A3", connected_port_show_a)),
+                Command("port show A4", get_port_info("A4", connected_port_show_a)),
+            ]
+        )
+        self.send_line_func_map[host] = emu.send_line
+        self.receive_all_func_map[host] = emu.receive_all
+
+        self.driver_commands.login(address, user, password)
+        self.driver_commands.map_bidi(src_port, dst_port)
+
+        emu.check_calls()
+
+    def test_map_bidi_targeted_verification_reload_table(self):
+        host = "192.168.122.10"
+        address = "{}:A".format(host)
+        user = "user"
+        password = "password"
+        src_port = "{}/1/003".format(address)
+        dst_port = "{}/1/004".format(address)
+        self.driver_commands._mapping_check_delay = 0.1
+        self.driver_commands._port_table_targeted_verification = True
+
+        connected_port_show_a = set_port_connected("E3", "W4", PORT_SHOW_MATRIX_A)
+        connected_port_show_a = set_port_connected("E4", "W3", connected_port_show_a)
+        emu = CliEmulator(
+            [
+                Command("", DEFAULT_PROMPT),
+                Command("port show", PORT_SHOW_MATRIX_A),
+                Command(
+                    "connection create A3 to A4",
+                    """ROME[TECH]# connection create A3 to A4
+OK - request added to pending queue (A3-A4)
+ROME[TECH]# 08-06-2019 09:01 CONNECTING...
+08-06-2019 09:01 CONNECTION OPERATION SUCCEEDED:E3[1AE3]<->W4[1AW4] OP:connect
+08-06-2019 09:01 CONNECTION OPERATION SUCCEEDED:E4[1AE2]<->W3[1AW3] OP:connect
+08-06-2019 09:01 Connection A3<->A4 completed successfully
+""",
+                ),
+                Command("connection show pending", CONNECTION_PENDING_EMPTY),
+                # the output doesn't have sub ports, reload the whole table
+                Command("port show A3", get_port_info("A5", connected_port_show_a)),
+                Command("port show", connected_port_show_a),
+            ]
+        )
+        self.send_line_func_map[host] = emu.send_line
+        self.receive_all_func_map[host] = emu.receive_all
+
+        self.driver_commands.login(address, user, password)
+        self.driver_commands.map_bidi(src_port, dst_port)
+
+        emu.check_calls()
+
+
+@patch("cloudshell.cli.session.ssh_session.paramiko", MagicMock())
+@patch(
+    "cloudshell.cli.session.ssh_session.SSHSession._clear_buffer",
+    MagicMock(return_value=""),
+)
+class RomeTestMapClear(BaseRomeTestCase):
+    def test_map_clear_matrix_b(self):
+        host = "192.168.122.10"
+        address = "{}:B".format(host)
+        user = "user"
+        password = "password"
+        ports = ["{}/1/{}".format(address, port_id) for port_id in (249, 218, 246)]
+        self.driver_commands._mapping_check_delay = 0.1
+
+        disconnected_port_show_b = set_port_disconnected("E246", PORT_SHOW_MATRIX_B)
+        disconnected_port_show_b = set_port_disconnected(
+            "E249", disconnected_port_show_b
+        )
+        disconnected_port_show_b = set_port_disconnected(
+            "E253", disconnected_port_show_b
+        )
+        emu = CliEmulator(
+            [
+                Command("", DEFAULT_PROMPT),
+                Command("port show", PORT_SHOW_MATRIX_B),
+                Command(
+                    "connection disconnect E246 from W247",
+                    """ROME[TECH]# connection disconnect E246 from W247
+OK - request added to pending queue (E246-W247)
+ROME[TECH]# 08-05-2019 12:19 DISCONNECTING...
+08-05-2019 12:19 CONNECTION OPERATION SUCCEEDED:E246[1AE246]<->W247[1AW247] OP:disconnect
+""",  # noqa: E501
+                ),
+                Command(
+                    "connection disconnect E249 from W253",
+                    """ROME[TECH]# connection disconnect E249 from W253
+OK - request added to pending queue (E249-W253)
+ROME[TECH]# 08-05-2019 12:19 DISCONNECTING...
+08-05-2019 12:19 CONNECTION OPERATION SUCCEEDED:E249[1AE249]<->W253[1AW253] OP:disconnect
+""",  # noqa: E501
+                ),
+                Command(
+                    "connection disconnect E253 from W249",
+                    """ROME[TECH]# connection disconnect E253 from W249
+OK - request added to pending queue (E253-W249)
+ROME[TECH]# 08-05-2019 12:19 DISCONNECTING...
+08-05-2019 12:19 CONNECTION OPERATION SUCCEEDED:E253[1AE253]<->W249[1AW249] OP:disconnect
+""",  # noqa: E501
+                ),
+                Command("connection show pending", CONNECTION_PENDING_EMPTY),
+                Command("port show", disconnected_port_show_b),
+            ]
+        )
+        self.send_line_func_map[host] = emu.send_line
+        self.receive_all_func_map[host] = emu.receive_all
+
+        self.driver_commands.login(address, user, password)
+        self.driver_commands.map_clear(ports)
+
+        emu.check_calls()
+
+    def test_map_clear_matrix_b_pipelined_disconnect(self):
+        host = "192.168.122.10"
+        address = "{}:B".format(host)
+        user = "user"
+        password = "password"
+        ports = ["{}/1/{}".format(address, port_id) for port_id in (249, 218, 246)]
+        self.driver_commands._mapping_check_delay = 0.1
+        self.driver_commands._pipelined_disconnect = True
+
+        disconnected_port_show_b = set_port_disconnected("E246", PORT_SHOW_MATRIX_B)
+        disconnected_port_show_b = set_port_disconnected(
+            "E249", disconnected_port_show_b
+        )
+        disconnected_port_show_b = set_port_disconnected(
+            "E253", disconnected_port_show_b
+        )
+        # all commands are sent, the emulator sees the last one
+        disconnect_commands = "connection disconnect E253 from W249"
+        emu = CliEmulator(
+            [
+                Command("", DEFAULT_PROMPT),
+                Command("port show", PORT_SHOW_MATRIX_B),
+                Command(
+                    disconnect_commands,
+                    """ROME[TECH]# connection disconnect E246 from W247
+OK - request added to pending queue (E246-W247)
+ROME[TECH]# connection disconnect E249 from W253
+OK - request added to pending queue (E249-W253)
+ROME[TECH]# 08-05-2019 12:19 DISCONNECTING...
+08-05-2019 12:19 CONNECTION OPERATION SUCCEEDED:E246[1AE246]<->W247[1AW247] OP:disconnect
+""",  # noqa: E501
+                ),
+                Command(
+                    disconnect_commands,
+                    """connection disconnect E253 from W249
+OK - request added to pending queue (E253-W249)
+ROME[TECH]# 08-05-2019 12:19 CONNECTION OPERATION SUCCEEDED:E249[1AE249]<->W253[1AW253] OP:disconnect
+08-05-2019 12:19 CONNECTION OPERATION SUCCEEDED:E253[1AE253]<->W249[1AW249] OP:disconnect
+""",  # noqa: E501
+                ),
+                Command("connection show pending", CONNECTION_PENDING_EMPTY),
+                Command("port show", disconnected_port_show_b),
+            ]
+        )
+        self.send_line_func_map[host] = emu.send_line
+        self.receive_all_func_map[host] = emu.receive_all
+
+        self.driver_commands.login(address, user, password)
+        self.driver_commands.map_clear(ports)
+
+        emu.check_calls()
+
+    def test_map_clear_matrix_b_pipelined_disconnect_failed(self):
+        host = "192.168.122.10"
+        address = "{}:B".format(host)
+        user = "user"
+        password = "password"
+        ports = ["{}/1/{}".format(address, port_id) for port_id in (249, 218, 246)]
+        self.driver_commands._mapping_check_delay = 0.1
+        self.driver_commands._pipelined_disconnect = True
+
+        emu = CliEmulator(
+            [
+                Command("", DEFAULT_PROMPT),
+                Command("port show", PORT_SHOW_MATRIX_B),
+                Command(
+                    "connection disconnect E253 from W249",
+                    # the prompt is printed again after the log
+                    """ROME[TECH]# connection disconnect E246 from W247
+OK - request added to pending queue (E246-W247)
+ROME[TECH]# 08-05-2019 12:19 DISCONNECTING...
+ROME[TECH]# connection disconnect E249 from W253
+Error: port E249 is locked
+ROME[TECH]# connection disconnect E253 from W249
+OK - request added to pending queue (E253-W249)
+ROME[TECH]# """,
+                ),
+                Command("connection show pending", CONNECTION_PENDING_EMPTY),
+            ]
+        )
+        self.send_line_func_map[host] = emu.send_line
+        self.receive_all_func_map[host] = emu.receive_all
+
+        self.driver_commands.login(address, user, password)
+        with self.assertRaisesRegexp(
+            BaseRomeException, r"Cannot disconnect ports: E249 - W253 \(Command error\)"
+        ):
+            self.driver_commands.map_clear(ports)
+
+        emu.check_calls()
+
+    def test_map_clear_matrix_b_targeted_verification(self):
+        host = "192.168.122.10"
+        address = "{}:B".format(host)
+        user = "user"
+        password = "password"
+        ports = ["{}/1/{}".format(address, port_id) for port_id in (249, 218, 246)]
+        self.driver_commands._mapping_check_delay = 0.1
+        self.driver_commands._port_table_targeted_verification = True
+
+        disconnected_port_show_b = set_port_disconnected("E246", PORT_SHOW_MATRIX_B)
+        disconnected_port_show_b = set_port_disconnected(
+            "E249", disconnected_port_show_b
+        )
+        disconnected_port_show_b = set_port_disconnected(
+            "E253", disconnected_port_show_b
+        )
+        emu = CliEmulator(
+            [
+                Command("", DEFAULT_PROMPT),
+                Command("port show", PORT_SHOW_MATRIX_B),
+                Command(
+                    "connection disconnect E246 from W247",
+                    """ROME[TECH]# connection disconnect E246 from W247
+OK - request added to pending queue (E246-W247)
+ROME[TECH]# 08-05-2019 12:19 DISCONNECTING...
+08-05-2019 12:19 CONNECTION OPERATION SUCCEEDED:E246[1AE246]<->W247[1AW247] OP:disconnect
+""",  # noqa: E501
+                ),
+                Command(
+                    "connection disconnect E249 from W253",
+                    """ROME[TECH]# connection disconnect E249 from W253
+OK - request added to pending queue (E249-W253)
+ROME[TECH]# 08-05-2019 12:19 DISCONNECTING...
+08-05-2019 12:19 CONNECTION OPERATION SUCCEEDED:E249[1AE249]<->W253[1AW253] OP:disconnect
+""",  # noqa: E501
+                ),
+                Command(
+                    "connection disconnect E253 from W249",
+                    """ROME[TECH]# connection disconnect E253 from W249
+OK - request added to pending queue (E253-W249)
+ROME[TECH]# 08-05-2019 12:19 DISCONNECTING...
+08-05-2019 12:19 CONNECTION OPERATION SUCCEEDED:E253[1AE253]<->W249[1AW249] OP:disconnect
+""",  # noqa: E501
+                ),
+                Command("connection show pending", CONNECTION_PENDING_EMPTY),
+            ]
+            + [
+                Command(
+                    "port show {}".format(port_name),
+                    get_port_info(port_name, disconnected_port_show_b),
+                )
+                for port_name in ("B218", "B246", "B247", "B249", "B253")
             ]
         )
         self.send_line_func_map[host] = emu.send_line
@@ -0,0 +1,65 @@
+from unittest import TestCase
+
+from mock import MagicMock
+
+from w2w_rome.cli.host_group import HostGroup
+from w2w_rome.helpers.errors import BaseRomeException
+
+from tests.w2w_rome.base import BaseRomeTestCase
+
+
+class TestHostGroup(TestCase):
+    def setUp(self):
+        self.host_group = HostGroup(MagicMock(name="logger"), sessions_per_host=2)
+
+    def test_session_pools_per_host(self):
+        hosts = ("192.168.122.10", "192.168.122.11", "192.168.122.12")
+        self.host_group.define_session_attributes(hosts, "user", "password")
+
+        self.assertEqual(hosts, self.host_group.hosts)
+        self.assertEqual(3, len(self.host_group))
+        session_pools = [
+            cli_handler._cli._session_pool
+            for cli_handler in self.host_group.cli_handlers
+        ]
+        self.assertEqual(2, self.host_group.sessions_per_host)
+        self.assertEqual([2, 2, 2], [pool._pool.maxsize for pool in session_pools])
+        self.assertEqual(
+            3, len({id(pool._session_manager) for pool in session_pools}),
+        )
+
+    def test_cli_handlers_are_reused(self):
+        hosts = ("192.168.122.10", "192.168.122.11", "192.168.122.12")
+        self.host_group.define_session_attributes(hosts, "user", "password")
+        cli_handlers = self.host_group.cli_handlers
+
+        self.host_group.define_session_attributes(
+            ("192.168.122.20",), "user", "password"
+        )
+
+        self.assertEqual(cli_handlers[:1], self.host_group.cli_handlers)
+        self.assertEqual("192.168.122.20", cli_handlers[0]._host)
+
+
+class TestResourceAddress(BaseRomeTestCase):
+    def test_a_few_hosts(self):
+        hosts, letter = self.driver_commands._split_addresses_and_letter(
+            "192.168.122.10:192.168.122.11:192.168.122.12:Q/1/Q3"
+        )
+
+        self.assertEqual(("192.168.122.10", "192.168.122.11", "192.168.122.12"), hosts)
+        self.assertEqual("Q", letter)
+
+    def test_one_host(self):
+        hosts, letter = self.driver_commands._split_addresses_and_letter(
+            "192.168.122.10:MatrixB"
+        )
+
+        self.assertEqual(("192.168.122.10",), hosts)
+        self.assertEqual("B", letter)
+
+    def test_a_few_hosts_not_for_matrix_q(self):
+        with self.assertRaisesRegexp(BaseRomeException, "Incorrect address"):
+            self.driver_commands._split_addresses_and_letter(
+                "192.168.122.10:192.168.122.11:A"
+            )
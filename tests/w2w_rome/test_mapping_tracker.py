@@ -0,0 +1,49 @@
+import threading
+from unittest import TestCase
+
+from mock import MagicMock
+
+from w2w_rome.helpers.mapping_tracker import MappingTracker
+
+
+class TestMappingTracker(TestCase):
+    def setUp(self):
+        self.logger = MagicMock(name="logger")
+        self.tracker = MappingTracker(self.logger)
+
+    def test_wait_for_ports(self):
+        event = threading.Event()
+        handle = self.tracker.submit(["A1", "A2"], event.wait, 5)
+
+        self.assertTrue(self.tracker.wait_for_ports(["A3", "A4"], timeout=0.1))
+        self.assertFalse(self.tracker.wait_for_ports(["A2", "A3"], timeout=0.1))
+        self.assertEqual([handle], self.tracker.get_handles(["A2"]))
+
+        event.set()
+        self.assertTrue(self.tracker.wait_for_ports(["A2", "A3"], timeout=5))
+        self.assertTrue(handle.done)
+        self.assertIsNone(handle.error)
+        self.assertEqual([], self.tracker.get_handles())
+
+    def test_failed_mapping(self):
+        error = ValueError("failed")
+
+        def mapping():
+            raise error
+
+        handle = self.tracker.submit(["A1", "A2"], mapping)
+
+        self.assertTrue(self.tracker.wait_all(timeout=5))
+        self.assertIs(error, handle.error)
+        self.logger.exception.assert_called_once()
+        # next commands of the ports are not blocked by the failed mapping
+        self.assertTrue(self.tracker.wait_for_ports(["A1", "A2"], timeout=0.1))
+
+    def test_shutdown_waits_for_mappings(self):
+        event = threading.Event()
+        handle = self.tracker.submit(["A1"], event.wait, 5)
+        threading.Timer(0.1, event.set).start()
+
+        self.tracker.shutdown()
+
+        self.assertTrue(handle.done)
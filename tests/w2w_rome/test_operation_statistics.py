@@ -0,0 +1,58 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from w2w_rome.helpers.operation_statistics import OperationStatistics
+
+
+class TestOperationStatistics(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.tmp_dir, "statistics.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_expected_durations(self):
+        statistics = OperationStatistics()
+        statistics.add("host", "A", OperationStatistics.COMPLETION, 20.0, 2)
+        statistics.add("host", "A", OperationStatistics.COMPLETION, 40.0, 2)
+        statistics.add("host", "A", OperationStatistics.COMPLETION, 90.0, 2)
+        statistics.add("host", "A", OperationStatistics.SUBMIT, 1.0, 1)
+
+        self.assertEqual(20, statistics.get_expected_move_duration("host", "A"))
+        self.assertEqual(
+            1, statistics.get_expected_duration("host", "A", OperationStatistics.SUBMIT)
+        )
+        self.assertIsNone(statistics.get_expected_move_duration("host", "B"))
+        self.assertIsNone(statistics.get_expected_move_duration("other_host", "A"))
+        self.assertEqual(
+            {"count": 3, "median": 40.0, "average": 50.0},
+            statistics.as_dict()["host"]["A"]["completion"],
+        )
+
+    def test_save_and_load(self):
+        statistics = OperationStatistics(self.file_path)
+        statistics.add("host", "A", OperationStatistics.COMPLETION, 20.0, 2)
+        statistics.add("host", "Q", OperationStatistics.QUEUE_WAIT, 5.0)
+        statistics.save()
+
+        loaded_statistics = OperationStatistics(self.file_path)
+
+        self.assertEqual(statistics.as_dict(), loaded_statistics.as_dict())
+        self.assertEqual(10, loaded_statistics.get_expected_move_duration("host", "A"))
+        self.assertFalse(os.path.exists(self.file_path + ".tmp"))
+
+    def test_broken_file(self):
+        with open(self.file_path, "w") as f:
+            f.write("{broken")
+
+        statistics = OperationStatistics(self.file_path)
+
+        self.assertEqual({}, statistics.as_dict())
+        statistics.add("host", "A", OperationStatistics.COMPLETION, 20.0, 2)
+        statistics.save()
+        self.assertEqual(
+            statistics.as_dict(), OperationStatistics(self.file_path).as_dict()
+        )
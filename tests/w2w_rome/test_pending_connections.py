@@ -0,0 +1,81 @@
+from unittest import TestCase
+
+from w2w_rome.helpers.pending_connections import PendingConnections
+
+from tests.w2w_rome.test_connectivity import (
+    CONNECTION_PENDING_EMPTY,
+    get_connection_pending,
+)
+
+CONNECTION_PENDING_WITH_REQUESTS = """ROME[TECH]# connection show pending
+Connection execution status: delayed due to command in process
+
+Command in process:
+disconnect, ports: E3-W4, status: in process with payload
+
+======= ========= ========= ================== ======= ===================
+Request Port1     Port2     Command            Source  User
+======= ========= ========= ================== ======= ===================
+772     A1        A2        connect            CLI     admin
+773     q5        Q6        disconnect         SNMP    user
+774     X1        Y2        connect
+775     A5        A6        CONNECT-BIDI       CLI     admin
+
+ROME[TECH]# """
+
+
+class TestPendingConnections(TestCase):
+    def test_empty(self):
+        pending_connections = PendingConnections.from_output(CONNECTION_PENDING_EMPTY)
+
+        self.assertEqual("enabled", pending_connections.execution_status)
+        self.assertIsNone(pending_connections.in_process)
+        self.assertEqual([], pending_connections.requests)
+        self.assertEqual(0, pending_connections.queue_depth)
+        self.assertFalse(pending_connections.contains_any([("A3", "A4")]))
+
+    def test_command_in_process(self):
+        pending_connections = PendingConnections.from_output(
+            get_connection_pending("A3", "A4")
+        )
+
+        self.assertEqual(
+            "delayed due to command in process", pending_connections.execution_status
+        )
+        self.assertEqual(("A3", "A4"), pending_connections.in_process.ports)
+        self.assertEqual("connect", pending_connections.in_process.command)
+        self.assertEqual(
+            "in process with payload", pending_connections.in_process_status
+        )
+        self.assertEqual(1, pending_connections.queue_depth)
+        self.assertIn(("a3", "a4"), pending_connections)
+        self.assertNotIn(("A4", "A3"), pending_connections)
+
+    def test_queued_requests(self):
+        pending_connections = PendingConnections.from_output(
+            CONNECTION_PENDING_WITH_REQUESTS
+        )
+
+        self.assertEqual(
+            [
+                ("772", "A1", "A2", "connect", "CLI", "admin"),
+                ("773", "Q5", "Q6", "disconnect", "SNMP", "user"),
+                ("774", "X1", "Y2", "connect", None, None),
+                ("775", "A5", "A6", "connect-bidi", "CLI", "admin"),
+            ],
+            [
+                (
+                    request.request_id,
+                    request.src_port,
+                    request.dst_port,
+                    request.command,
+                    request.source,
+                    request.user,
+                )
+                for request in pending_connections.requests
+            ],
+        )
+        self.assertEqual(5, pending_connections.queue_depth)
+        self.assertTrue(pending_connections.contains_any([("A3", "A4"), ("E3", "W4")]))
+        self.assertTrue(pending_connections.contains_any([("Q5", "Q6")]))
+        self.assertFalse(pending_connections.contains_any([("A3", "A4"), ("A2", "A1")]))
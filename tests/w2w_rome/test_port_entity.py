@@ -0,0 +1,188 @@
+from unittest import TestCase
+
+from w2w_rome.helpers.port_entity import PortTable, SubPort
+
+from tests.w2w_rome.base import (
+    PORT_SHOW_MATRIX_A,
+    PORT_SHOW_MATRIX_B,
+    PORT_SHOW_MATRIX_Q,
+    PORT_SHOW_MATRIX_Q128_1,
+    PORT_SHOW_MATRIX_Q128_2,
+    PORT_SHOW_MATRIX_XY,
+)
+
+PORT_SHOW_OUTPUTS = (
+    PORT_SHOW_MATRIX_A,
+    PORT_SHOW_MATRIX_B,
+    PORT_SHOW_MATRIX_Q,
+    PORT_SHOW_MATRIX_Q128_1,
+    PORT_SHOW_MATRIX_XY,
+)
+
+
+def get_sub_port_state(sub_port):
+    return (
+        sub_port.port_resource,
+        sub_port.sub_port_name,
+        sub_port.sub_port_full_name,
+        sub_port.locked,
+        sub_port.enabled,
+        sub_port.connected,
+        sub_port.connected_to_sub_port_name,
+        sub_port.logical,
+        sub_port.port_name,
+    )
+
+
+class TestPortTable(TestCase):
+    def test_sub_ports_from_output_same_as_from_lines(self):
+        for output in PORT_SHOW_OUTPUTS:
+            sub_ports = list(SubPort.from_output(output, "host"))
+            line_sub_ports = filter(
+                None, (SubPort.from_line(line, "host") for line in output.splitlines())
+            )
+
+            self.assertEqual(
+                map(get_sub_port_state, line_sub_ports),
+                map(get_sub_port_state, sub_ports),
+            )
+
+    def test_sub_ports_from_output_with_crlf(self):
+        output = PORT_SHOW_MATRIX_A.replace("\n", "\r\n")
+
+        sub_ports = list(SubPort.from_output(output, "host"))
+
+        self.assertEqual(512, len(sub_ports))
+        self.assertEqual("A1", sub_ports[0].logical)
+        self.assertEqual("W2", sub_ports[0].connected_to_sub_port_name)
+
+    def test_port_table_from_output(self):
+        port_table = PortTable.from_output(PORT_SHOW_MATRIX_Q128_1, "host")
+
+        self.assertEqual(128, len(port_table.logical_ports))
+        for logical_port in port_table:
+            for rome_port in logical_port:
+                self.assertIsNotNone(rome_port.e_port)
+                self.assertIsNotNone(rome_port.w_port)
+
+    def test_merge_port_tables(self):
+        port_tables = [
+            PortTable.from_output(PORT_SHOW_MATRIX_Q128_1, "host1"),
+            PortTable.from_output(PORT_SHOW_MATRIX_Q128_2, "host2"),
+            PortTable.from_output(PORT_SHOW_MATRIX_Q128_2, "host3"),
+        ]
+
+        port_table = PortTable.merge(port_tables)
+
+        self.assertEqual(128, len(port_table.logical_ports))
+        logical_port = port_table["Q1"]
+        self.assertEqual(
+            sum(len(table["Q1"].rome_ports) for table in port_tables),
+            len(logical_port.rome_ports),
+        )
+        for table in port_tables:
+            for rome_port in table["Q1"]:
+                self.assertIn(rome_port, logical_port.rome_ports)
+        # sub ports are not copied
+        sub_port = port_tables[1]["Q1"].e_sub_ports[0]
+        self.assertIs(
+            sub_port, port_table.get_sub_port("host2", sub_port.sub_port_name)
+        )
+
+    def test_merge_port_tables_with_different_ports(self):
+        port_tables = [
+            PortTable.from_output(PORT_SHOW_MATRIX_Q128_1, "host1"),
+            PortTable.from_output(PORT_SHOW_MATRIX_Q, "host2"),
+        ]
+
+        with self.assertRaisesRegexp(ValueError, "different logical ports"):
+            PortTable.merge(port_tables)
+
+    def test_merge_port_tables_with_the_same_host(self):
+        port_tables = [
+            PortTable.from_output(PORT_SHOW_MATRIX_Q128_1, "host1"),
+            PortTable.from_output(PORT_SHOW_MATRIX_Q128_2, "host1"),
+        ]
+
+        with self.assertRaisesRegexp(ValueError, "already added"):
+            PortTable.merge(port_tables)
+
+    def test_connection_index(self):
+        port_table = PortTable.from_output(PORT_SHOW_MATRIX_B, "host")
+        src_logic_port = port_table["B249"]
+        dst_logic_port = port_table["B253"]
+
+        self.assertTrue(port_table.is_connected(src_logic_port, dst_logic_port, True))
+        self.assertIs(
+            src_logic_port, port_table.get_connected_from_port(dst_logic_port)
+        )
+        self.assertIs(port_table.connection_index, port_table.connection_index)
+
+    def test_connection_index_updated_with_port_table(self):
+        port_table = PortTable.from_output(PORT_SHOW_MATRIX_A, "host")
+        src_logic_port = port_table["A3"]
+        dst_logic_port = port_table["A4"]
+        self.assertIsNone(port_table.get_connected_to_port(src_logic_port))
+
+        port_table.set_sub_ports_connected("host", "E3", "W4")
+        port_table.set_sub_ports_connected("host", "E4", "W3")
+
+        self.assertTrue(port_table.is_connected(src_logic_port, dst_logic_port, True))
+
+        port_table.set_sub_ports_disconnected("host", "E3", "W4")
+
+        self.assertIsNone(port_table.get_connected_to_port(src_logic_port))
+        self.assertIs(src_logic_port, port_table.get_connected_to_port(dst_logic_port))
+
+    def test_connections_hash(self):
+        port_table = PortTable.from_output(PORT_SHOW_MATRIX_A, "host")
+        connections_hash = port_table.get_connections_hash()
+        self.assertEqual(
+            connections_hash,
+            PortTable.from_output(PORT_SHOW_MATRIX_A, "host").get_connections_hash(),
+        )
+
+        port_table.set_sub_ports_connected("host", "E3", "W4")
+        self.assertNotEqual(connections_hash, port_table.get_connections_hash())
+
+        port_table.set_sub_ports_disconnected("host", "E3", "W4")
+        self.assertEqual(connections_hash, port_table.get_connections_hash())
+
+    def test_copy(self):
+        port_table = PortTable.merge(
+            [
+                PortTable.from_output(PORT_SHOW_MATRIX_Q128_1, "host1"),
+                PortTable.from_output(PORT_SHOW_MATRIX_Q128_2, "host2"),
+            ]
+        )
+        snapshot = port_table.copy()
+        self.assertEqual(
+            port_table.get_connections_hash(), snapshot.get_connections_hash()
+        )
+        self.assertEqual(
+            sorted(map(get_sub_port_state, port_table.map_sub_ports.values())),
+            sorted(map(get_sub_port_state, snapshot.map_sub_ports.values())),
+        )
+
+        snapshot.set_sub_ports_disconnected("host2", "E1", "W2")
+
+        self.assertNotEqual(
+            port_table.get_connections_hash(), snapshot.get_connections_hash()
+        )
+        self.assertTrue(port_table.get_sub_port("host2", "E1").connected)
+
+    def test_snapshot_is_copied_on_update(self):
+        port_table = PortTable.from_output(PORT_SHOW_MATRIX_A, "host")
+        connections_hash = port_table.get_connections_hash()
+        snapshot = port_table.snapshot()
+        self.assertIs(port_table["A3"], snapshot["A3"])
+
+        snapshot.set_sub_ports_connected("host", "E3", "W4")
+
+        self.assertIsNot(port_table["A3"], snapshot["A3"])
+        self.assertEqual(connections_hash, port_table.get_connections_hash())
+        self.assertTrue(snapshot.get_sub_port("host", "E3").connected)
+
+        port_table.set_sub_ports_connected("host", "E4", "W3")
+
+        self.assertFalse(snapshot.get_sub_port("host", "E4").connected)
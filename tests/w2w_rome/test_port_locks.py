@@ -0,0 +1,154 @@
+import threading
+from unittest import TestCase
+
+from w2w_rome.helpers.errors import PortLockDeadlockError, PortLockTimeoutError
+from w2w_rome.helpers.port_entity import PortTable
+from w2w_rome.helpers.port_locks import PortLockManager, get_port_lock_keys
+
+from tests.w2w_rome.base import (
+    PORT_SHOW_MATRIX_A,
+    PORT_SHOW_MATRIX_Q,
+    PORT_SHOW_MATRIX_XY,
+)
+
+
+def run_in_thread(func, *args):
+    result = {}
+
+    def target():
+        try:
+            result["value"] = func(*args)
+        except Exception as e:
+            result["error"] = e
+
+    thread = threading.Thread(target=target)
+    thread.start()
+    return thread, result
+
+
+class TestPortLockManager(TestCase):
+    def setUp(self):
+        self.manager = PortLockManager(timeout=5)
+
+    def lock_in_thread(self, keys, locked, release, more_keys=()):
+        def func():
+            with self.manager.lock(keys) as port_lock:
+                locked.set()
+                release.wait(5)
+                port_lock.acquire(more_keys)
+
+        return run_in_thread(func)
+
+    def test_disjoint_ports(self):
+        locked, release = threading.Event(), threading.Event()
+        thread, result = self.lock_in_thread(["A1", "A2"], locked, release)
+        locked.wait(5)
+
+        with self.manager.lock(["A3", "A4"]):
+            pass
+
+        release.set()
+        thread.join(5)
+        self.assertEqual({"value": None}, result)
+
+    def test_overlapping_ports_wait(self):
+        locked, release = threading.Event(), threading.Event()
+        thread, result = self.lock_in_thread(["A1", "A2"], locked, release)
+        locked.wait(5)
+        threading.Timer(0.1, release.set).start()
+
+        with self.manager.lock(["A2", "A3"]):
+            self.assertTrue(release.is_set())
+
+        thread.join(5)
+        self.assertEqual({"value": None}, result)
+
+    def test_lock_timeout(self):
+        self.manager = PortLockManager(timeout=0.1)
+        locked, release = threading.Event(), threading.Event()
+        thread, _ = self.lock_in_thread(["A1", "A2"], locked, release)
+        locked.wait(5)
+
+        with self.assertRaises(PortLockTimeoutError):
+            with self.manager.lock(["A2", "A3"]):
+                pass
+
+        release.set()
+        thread.join(5)
+        self.assertEqual({}, self.manager._owners)
+
+    def test_reentrant_lock(self):
+        with self.manager.lock(["A1", "A2"]) as port_lock:
+            port_lock.acquire(["A2", "A3"])
+            with self.manager.lock(["A1"]):
+                pass
+            # the inner lock doesn't release the ports of the outer one
+            self.assertEqual(
+                {"A1", "A2", "A3"}, set(self.manager._owners),
+            )
+        self.assertEqual({}, self.manager._owners)
+
+    def test_not_blocking_acquire(self):
+        locked, release = threading.Event(), threading.Event()
+        thread, _ = self.lock_in_thread(["A1", "A2"], locked, release)
+        locked.wait(5)
+
+        with self.manager.lock(["A3"]) as port_lock:
+            self.assertFalse(port_lock.acquire(["A2", "A4"], blocking=False))
+            # nothing is locked if some of the ports are locked
+            self.assertEqual({"A1", "A2", "A3"}, set(self.manager._owners))
+            self.assertTrue(port_lock.acquire(["A4"], blocking=False))
+            self.assertEqual({"A1", "A2", "A3", "A4"}, set(self.manager._owners))
+
+        release.set()
+        thread.join(5)
+        self.assertEqual({}, self.manager._owners)
+
+    def test_deadlock(self):
+        locked, release = threading.Event(), threading.Event()
+        thread, result = self.lock_in_thread(["A1"], locked, release, ["A2"])
+        locked.wait(5)
+
+        with self.assertRaises(PortLockDeadlockError):
+            with self.manager.lock(["A2"]) as port_lock:
+                release.set()
+                # wait for the thread is blocked by A2
+                while thread.ident not in self.manager._waits_for:
+                    threading.Event().wait(0.01)
+                port_lock.acquire(["A1"])
+
+        thread.join(5)
+        self.assertEqual({"value": None}, result)
+        self.assertEqual({}, self.manager._owners)
+
+
+class TestPortLockKeys(TestCase):
+    def test_logical_port(self):
+        port_table = PortTable.from_output(PORT_SHOW_MATRIX_A, "host")
+
+        self.assertEqual({"A1", "A2"}, get_port_lock_keys(port_table, ["A1", "A2"]))
+
+    def test_q_port(self):
+        port_table = PortTable.from_output(PORT_SHOW_MATRIX_Q, "host")
+
+        self.assertEqual(
+            {
+                "Q1",
+                "host:1AE1",
+                "host:1AE2",
+                "host:1AW1",
+                "host:1AW2",
+                "host:1BE1",
+                "host:1BE2",
+                "host:1BW1",
+                "host:1BW2",
+            },
+            get_port_lock_keys(port_table, ["Q1"]),
+        )
+
+    def test_xy_port(self):
+        port_table = PortTable.from_output(PORT_SHOW_MATRIX_XY, "host")
+
+        self.assertEqual(
+            {"X1", "host:1AW1", "host:1BE1"}, get_port_lock_keys(port_table, ["X1"])
+        )
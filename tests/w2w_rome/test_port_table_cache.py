@@ -0,0 +1,40 @@
+from unittest import TestCase
+
+from w2w_rome.helpers.port_entity import PortTable
+from w2w_rome.helpers.port_table_cache import PortTableCache
+
+from tests.w2w_rome.base import PORT_SHOW_MATRIX_A
+
+
+class TestPortTableCache(TestCase):
+    def setUp(self):
+        self.cache = PortTableCache(60)
+        self.cache.store(PortTable.from_output(PORT_SHOW_MATRIX_A, "host"))
+
+    def test_tables_are_independent(self):
+        port_table = self.cache.get()
+        port_table.set_sub_ports_connected("host", "E3", "W4")
+
+        self.assertFalse(self.cache.get().get_sub_port("host", "E3").connected)
+
+    def test_concurrent_updates(self):
+        first_table, second_table = self.cache.get(), self.cache.get()
+        first_table.set_sub_ports_connected("host", "E1", "W2")
+        first_table.set_sub_ports_connected("host", "E2", "W1")
+        second_table.set_sub_ports_connected("host", "E3", "W4")
+        second_table.set_sub_ports_connected("host", "E4", "W3")
+
+        self.cache.update(first_table, ["A1", "A2"])
+        self.cache.update(second_table, ["A3", "A4"])
+
+        port_table = self.cache.get()
+        self.assertTrue(port_table.is_connected(port_table["A1"], port_table["A2"]))
+        self.assertTrue(port_table.is_connected(port_table["A3"], port_table["A4"]))
+
+    def test_update_invalidated_cache(self):
+        port_table = self.cache.get()
+        self.cache.invalidate()
+
+        self.cache.update(port_table, ["A1"])
+
+        self.assertIsNone(self.cache.get())
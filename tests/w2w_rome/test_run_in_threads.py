@@ -0,0 +1,168 @@
+import threading
+import time
+from unittest import TestCase
+
+from mock import MagicMock
+
+from w2w_rome.helpers.errors import (
+    GotErrorInThreads,
+    TaskCancelledError,
+    TaskTimeoutError,
+)
+from w2w_rome.helpers.run_in_threads import run_in_threads
+from w2w_rome.helpers.thread_executor import (
+    ThreadExecutor,
+    cancellable_sleep,
+    check_cancelled,
+)
+
+
+def get_thread_ident():
+    return threading.current_thread().ident
+
+
+class TestThreadExecutor(TestCase):
+    def setUp(self):
+        self.executor = ThreadExecutor(processes=1)
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    def test_threads_are_reused(self):
+        first_ident = self.executor.submit(get_thread_ident).result()
+        second_ident = self.executor.submit(get_thread_ident).result()
+
+        self.assertEqual(first_ident, second_ident)
+
+    def test_task_timeout(self):
+        task = self.executor.submit(time.sleep, [0.5])
+
+        with self.assertRaisesRegexp(TaskTimeoutError, "didn't finish in 0.1sec"):
+            task.result(0.1)
+
+    def test_cancel_not_started_task(self):
+        event = threading.Event()
+        running_task = self.executor.submit(event.wait, [5])
+        waiting_task = self.executor.submit(get_thread_ident)
+
+        self.assertTrue(waiting_task.cancel())
+        event.set()
+
+        self.assertTrue(running_task.result(1))
+        with self.assertRaises(TaskCancelledError):
+            waiting_task.result(1)
+
+    def test_cancel_started_task(self):
+        event = threading.Event()
+        task = self.executor.submit(event.wait, [5])
+        time.sleep(0.1)
+
+        self.assertFalse(task.cancel())
+        event.set()
+        self.assertTrue(task.result(1))
+
+    def test_cancel_running_task(self):
+        started = threading.Event()
+
+        def wait():
+            started.set()
+            cancellable_sleep(5)
+
+        task = self.executor.submit(wait)
+        started.wait(1)
+        start_time = time.time()
+
+        self.assertFalse(task.cancel())
+        with self.assertRaisesRegexp(TaskCancelledError, "while it was running"):
+            task.result(1)
+        self.assertLess(time.time() - start_time, 0.5)
+        # the thread is reused by the next task
+        self.assertIsNone(self.executor.submit(check_cancelled).result(1))
+
+    def test_resize(self):
+        self.executor.submit(get_thread_ident).result()
+        self.executor.resize(2)
+
+        tasks = [self.executor.submit(time.sleep, [0.2]) for _ in range(2)]
+        start_time = time.time()
+        for task in tasks:
+            task.result(1)
+
+        self.assertLess(time.time() - start_time, 0.35)
+
+
+class TestRunInThreads(TestCase):
+    def test_run_in_threads_with_executor(self):
+        executor = ThreadExecutor(processes=2)
+        cli_services = [MagicMock(), MagicMock()]
+        param_map = {cli: [[cli], {}] for cli in cli_services}
+
+        try:
+            results_map = run_in_threads(id, MagicMock(), param_map, executor)
+        finally:
+            executor.shutdown()
+
+        self.assertEqual({cli: id(cli) for cli in cli_services}, results_map)
+
+    def test_run_in_threads_timeout(self):
+        executor = ThreadExecutor(processes=1, task_timeout=0.1)
+        cli_services = [MagicMock(), MagicMock()]
+        param_map = {cli: [[0.3], {}] for cli in cli_services}
+        logger = MagicMock()
+
+        try:
+            with self.assertRaises(GotErrorInThreads):
+                run_in_threads(time.sleep, logger, param_map, executor)
+        finally:
+            executor.shutdown()
+
+        self.assertEqual(2, logger.error.call_count)
+        # only the session of the running task is disconnected
+        self.assertEqual(
+            1, sum(cli.session.disconnect.call_count for cli in cli_services)
+        )
+
+    def test_run_in_threads_timeout_for_all_tasks(self):
+        executor = ThreadExecutor(processes=2, task_timeout=0.3)
+        fast_cli, slow_cli = MagicMock(), MagicMock()
+        param_map = {fast_cli: [[0.2], {}], slow_cli: [[0.6], {}]}
+        logger = MagicMock()
+        start_time = time.time()
+
+        try:
+            with self.assertRaises(GotErrorInThreads):
+                run_in_threads(time.sleep, logger, param_map, executor)
+            # not 0.2 + 0.3 sec
+            self.assertLess(time.time() - start_time, 0.45)
+        finally:
+            executor.shutdown()
+
+        logger.error.assert_called_once_with(
+            "Task on the host {} didn't finish in time".format(slow_cli.session.host)
+        )
+
+    def test_run_in_threads_fail_fast(self):
+        executor = ThreadExecutor(processes=2)
+        failed_cli, waiting_cli = MagicMock(), MagicMock()
+        error = ValueError("failed")
+
+        def mapping(cli_service):
+            if cli_service is failed_cli:
+                raise error
+            while True:
+                cancellable_sleep(0.1)
+
+        param_map = {cli: [[cli], {}] for cli in (failed_cli, waiting_cli)}
+        logger = MagicMock()
+        start_time = time.time()
+
+        try:
+            with self.assertRaises(GotErrorInThreads):
+                run_in_threads(mapping, logger, param_map, executor)
+        finally:
+            executor.shutdown()
+
+        self.assertLess(time.time() - start_time, 1)
+        logger.exception.assert_called_once_with(
+            "Got exception on the host {}".format(failed_cli.session.host)
+        )
@@ -0,0 +1,79 @@
+import re
+from unittest import TestCase
+
+from w2w_rome.cli.session_buffer import SessionBuffer
+from w2w_rome.command_actions.mapping_actions import MappingActions
+
+LOG_LINE = (
+    "08-05-2019 09:20 CONNECTION OPERATION SUCCEEDED:E3[1AE3]<->W4[1AW4] "
+    "OP:connect\n"
+)
+
+
+class TestSessionBuffer(TestCase):
+    def setUp(self):
+        self.buffer = SessionBuffer()
+
+    def test_matches_collected_incrementally(self):
+        self.buffer.watch(MappingActions.SUB_PORT_OPERATION_PATTERN)
+
+        self.buffer.append("ROME[OPER]# " + LOG_LINE)
+        self.buffer.append(LOG_LINE.replace("E3", "E5"))
+
+        self.assertEqual(
+            len(self.buffer.get_matches(MappingActions.SUB_PORT_OPERATION_PATTERN)), 2,
+        )
+
+    def test_match_split_between_chunks(self):
+        self.buffer.watch(MappingActions.SUB_PORT_OPERATION_PATTERN)
+
+        self.buffer.append("ROME[OPER]# " + LOG_LINE[:40])
+        self.buffer.append(LOG_LINE[40:])
+
+        self.assertEqual(
+            self.buffer.get_matches(MappingActions.SUB_PORT_OPERATION_PATTERN),
+            [LOG_LINE[17:-1]],
+        )
+
+    def test_not_finished_line_is_searched(self):
+        self.buffer.append("Multiple Cross Connect Severe ")
+        self.assertFalse(
+            self.buffer.search("(?i)multiple cross connect severe failure")
+        )
+
+        self.buffer.append("Failure")
+        self.assertTrue(self.buffer.search("(?i)multiple cross connect severe failure"))
+
+    def test_watch_scans_kept_data(self):
+        self.buffer.append(LOG_LINE)
+
+        self.assertTrue(self.buffer.search(re.compile("op:connect", re.I)))
+
+    def test_size_is_bounded(self):
+        self.buffer = SessionBuffer(max_size=len(LOG_LINE) * 2)
+        self.buffer.watch("OP:connect")
+
+        for _ in range(10):
+            self.buffer.append(LOG_LINE)
+
+        self.assertEqual(len(self.buffer), len(LOG_LINE) * 2)
+        self.assertEqual(str(self.buffer), LOG_LINE * 2)
+        self.assertEqual(len(self.buffer.get_matches("OP:connect")), 10)
+
+    def test_not_finished_line_is_bounded(self):
+        self.buffer = SessionBuffer(max_line_size=10)
+
+        self.buffer.append("a" * 100)
+
+        self.assertEqual(len(self.buffer._tail), 10)
+
+    def test_reset(self):
+        self.buffer.watch("OP:connect")
+        self.buffer.append(LOG_LINE)
+        self.buffer.append("OP:connect")
+
+        self.buffer.reset()
+
+        self.assertEqual(str(self.buffer), "")
+        self.assertEqual(len(self.buffer), 0)
+        self.assertFalse(self.buffer.search("OP:connect"))
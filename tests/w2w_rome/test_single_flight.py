@@ -0,0 +1,103 @@
+import threading
+from unittest import TestCase
+
+from w2w_rome.helpers.single_flight import SingleFlight
+
+
+class TestSingleFlight(TestCase):
+    def setUp(self):
+        self.single_flight = SingleFlight()
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.calls = []
+
+    def load(self, result=None, error=None):
+        def func():
+            self.calls.append(result)
+            self.started.set()
+            self.release.wait(5)
+            if error is not None:
+                raise error
+            return result
+
+        return func
+
+    def do_in_thread(self, key, func, fresh=False):
+        results = []
+
+        def target():
+            try:
+                results.append(self.single_flight.do(key, func, fresh))
+            except Exception as e:
+                results.append(e)
+
+        thread = threading.Thread(target=target)
+        thread.start()
+        return thread, results
+
+    def wait_for_followers(self, key, followers):
+        while self.single_flight._flights[key].followers < followers:
+            threading.Event().wait(0.01)
+
+    def test_concurrent_calls_are_shared(self):
+        leader, leader_results = self.do_in_thread("hosts", self.load("table"))
+        self.started.wait(5)
+        follower, follower_results = self.do_in_thread("hosts", self.load("other"))
+        self.wait_for_followers("hosts", 1)
+
+        self.release.set()
+        leader.join(5)
+        follower.join(5)
+
+        self.assertEqual(["table"], self.calls)
+        self.assertEqual([("table", True)], leader_results)
+        self.assertEqual([("table", True)], follower_results)
+        self.assertEqual({}, self.single_flight._flights)
+
+    def test_not_shared_call(self):
+        self.release.set()
+
+        self.assertEqual(
+            ("table", False), self.single_flight.do("hosts", self.load("table"))
+        )
+        self.assertEqual(
+            ("new table", False), self.single_flight.do("hosts", self.load("new table"))
+        )
+
+    def test_error_is_shared(self):
+        error = ValueError("failed")
+        leader, leader_results = self.do_in_thread("hosts", self.load(error=error))
+        self.started.wait(5)
+        follower, follower_results = self.do_in_thread("hosts", self.load("table"))
+        self.wait_for_followers("hosts", 1)
+
+        self.release.set()
+        leader.join(5)
+        follower.join(5)
+
+        self.assertEqual([error], leader_results)
+        self.assertEqual([error], follower_results)
+        self.assertEqual({}, self.single_flight._flights)
+
+    def test_fresh_call_doesnt_join_started_call(self):
+        leader, leader_results = self.do_in_thread("hosts", self.load("old table"))
+        self.started.wait(5)
+        old_flight = self.single_flight._flights["hosts"]
+        fresh, fresh_results = self.do_in_thread(
+            "hosts", self.load("new table"), fresh=True
+        )
+        while self.single_flight._flights["hosts"] is old_flight:
+            threading.Event().wait(0.01)
+        # the next call joins the fresh call
+        follower, follower_results = self.do_in_thread("hosts", self.load("other"))
+        self.wait_for_followers("hosts", 1)
+
+        self.release.set()
+        for thread in (leader, fresh, follower):
+            thread.join(5)
+
+        self.assertEqual(["old table", "new table"], self.calls)
+        self.assertEqual([("old table", False)], leader_results)
+        self.assertEqual([("new table", True)], fresh_results)
+        self.assertEqual([("new table", True)], follower_results)
+        self.assertEqual({}, self.single_flight._flights)
@@ -0,0 +1,109 @@
+from mock import MagicMock, patch
+
+from tests.w2w_rome.base import (
+    DEFAULT_PROMPT,
+    PORT_SHOW_MATRIX_A,
+    SHOW_BOARD,
+    BaseRomeTestCase,
+    CliEmulator,
+    Command,
+)
+from tests.w2w_rome.test_connectivity import set_port_connected
+
+
+def get_show_board(operation_count):
+    return SHOW_BOARD.replace(
+        "OPERATION COUNT  7766", "OPERATION COUNT  {}".format(operation_count)
+    )
+
+
+@patch("cloudshell.cli.session.ssh_session.paramiko", MagicMock())
+@patch(
+    "cloudshell.cli.session.ssh_session.SSHSession._clear_buffer",
+    MagicMock(return_value=""),
+)
+class RomeTestStateId(BaseRomeTestCase):
+    def test_state_id_for_unchanged_device(self):
+        host = "192.168.122.10"
+        address = "{}:A".format(host)
+        user = "user"
+        password = "password"
+
+        emu = CliEmulator(
+            [
+                Command("", DEFAULT_PROMPT),
+                Command("show board", SHOW_BOARD),
+                Command("port show", PORT_SHOW_MATRIX_A),
+                # set state id
+                Command("", DEFAULT_PROMPT),
+                Command("show board", SHOW_BOARD),
+                # the device isn't changed, so only show board
+                Command("", DEFAULT_PROMPT),
+                Command("show board", SHOW_BOARD),
+            ]
+        )
+        self.send_line_func_map[host] = emu.send_line
+        self.receive_all_func_map[host] = emu.receive_all
+
+        self.driver_commands.login(address, user, password)
+        state_id = self.driver_commands.get_state_id()._state_id
+        self.assertNotEqual("-1", state_id)
+
+        self.driver_commands.set_state_id("cs-state-id")
+        self.assertEqual("cs-state-id", self.driver_commands.get_state_id()._state_id)
+
+        emu.check_calls()
+
+    def test_state_id_for_changed_device(self):
+        host = "192.168.122.10"
+        address = "{}:A".format(host)
+        user = "user"
+        password = "password"
+        connected_port_show_a = set_port_connected("E3", "W4", PORT_SHOW_MATRIX_A)
+
+        emu = CliEmulator(
+            [
+                Command("", DEFAULT_PROMPT),
+                Command("show board", SHOW_BOARD),
+                Command("port show", PORT_SHOW_MATRIX_A),
+                # operation is performed, but connections are the same
+                Command("", DEFAULT_PROMPT),
+                Command("show board", get_show_board(7767)),
+                Command("port show", PORT_SHOW_MATRIX_A),
+                # connections are changed
+                Command("", DEFAULT_PROMPT),
+                Command("show board", get_show_board(7768)),
+                Command("port show", connected_port_show_a),
+            ]
+        )
+        self.send_line_func_map[host] = emu.send_line
+        self.receive_all_func_map[host] = emu.receive_all
+
+        self.driver_commands.login(address, user, password)
+        self.driver_commands.set_state_id("cs-state-id")
+
+        self.assertEqual("cs-state-id", self.driver_commands.get_state_id()._state_id)
+        self.assertNotIn(
+            self.driver_commands.get_state_id()._state_id, ("cs-state-id", "-1")
+        )
+
+        emu.check_calls()
+
+    def test_state_id_without_operation_count(self):
+        host = "192.168.122.10"
+        address = "{}:A".format(host)
+        user = "user"
+        password = "password"
+        show_board = SHOW_BOARD.replace("OPERATION COUNT  7766\n", "")
+
+        emu = CliEmulator(
+            [Command("", DEFAULT_PROMPT), Command("show board", show_board)]
+        )
+        self.send_line_func_map[host] = emu.send_line
+        self.receive_all_func_map[host] = emu.receive_all
+
+        self.driver_commands.login(address, user, password)
+
+        self.assertEqual("-1", self.driver_commands.get_state_id()._state_id)
+
+        emu.check_calls()
@@ -0,0 +1,104 @@
+from unittest import TestCase
+
+from mock import patch
+
+from w2w_rome.helpers.pending_connections import PendingConnections, PendingRequest
+from w2w_rome.helpers.wait_timeout import FixedWaitTimeout, QueueAwareWaitTimeout
+
+
+def get_pending_connections(*ports):
+    in_process = PendingRequest(None, ports[0][0], ports[0][1], "connect")
+    requests = [
+        PendingRequest(str(772 + i), src, dst, "connect")
+        for i, (src, dst) in enumerate(ports[1:])
+    ]
+    return PendingConnections("enabled", in_process, "in process", requests)
+
+
+@patch("w2w_rome.helpers.wait_timeout.time")
+class TestWaitTimeout(TestCase):
+    def test_fixed_timeout(self, time_mock):
+        time_mock.time.return_value = 100
+        timeout = FixedWaitTimeout(120, 2)
+
+        time_mock.time.return_value = 339
+        self.assertFalse(timeout.expired)
+        self.assertEqual(1, timeout.time_left)
+        self.assertIsNone(timeout.get_eta())
+
+        time_mock.time.return_value = 340
+        self.assertTrue(timeout.expired)
+        self.assertEqual(2, timeout.total_moves)
+
+    def test_stalled_device(self, time_mock):
+        time_mock.time.return_value = 100
+        timeout = QueueAwareWaitTimeout(120, 2, expected_move_duration=20)
+        pending_connections = get_pending_connections(("A1", "A2"), ("A3", "A4"))
+        ports = [("A1", "A2"), ("A3", "A4")]
+
+        time_mock.time.return_value = 110
+        timeout.update(pending_connections, ports, 0)
+        time_mock.time.return_value = 169
+        timeout.update(pending_connections, ports, 0)
+        self.assertFalse(timeout.expired)
+
+        time_mock.time.return_value = 170
+        self.assertTrue(timeout.expired)
+        self.assertEqual(60, timeout.stall_timeout)
+
+    def test_progress_extends_timeout(self, time_mock):
+        time_mock.time.return_value = 100
+        timeout = QueueAwareWaitTimeout(120, 2, expected_move_duration=20)
+        ports = [("A1", "A2"), ("A3", "A4")]
+
+        timeout.update(get_pending_connections(("A1", "A2"), ("A3", "A4")), ports, 0)
+        time_mock.time.return_value = 150
+        timeout.update(get_pending_connections(("A3", "A4")), ports, 1)
+
+        time_mock.time.return_value = 200
+        self.assertFalse(timeout.expired)
+        self.assertEqual(20, timeout.get_eta())
+
+    def test_queue_ahead(self, time_mock):
+        time_mock.time.return_value = 100
+        timeout = QueueAwareWaitTimeout(120, 1)
+        pending_connections = get_pending_connections(
+            ("E3", "W4"), ("B1", "B2"), ("A1", "A2")
+        )
+
+        timeout.update(pending_connections, [("a1", "a2")], 0)
+
+        self.assertEqual(3, timeout.total_moves)
+        self.assertEqual(120, timeout.stall_timeout)
+        self.assertIsNone(timeout.get_eta())
+        time_mock.time.return_value = 219
+        self.assertFalse(timeout.expired)
+        time_mock.time.return_value = 220
+        self.assertTrue(timeout.expired)
+
+    def test_total_timeout(self, time_mock):
+        time_mock.time.return_value = 100
+        timeout = QueueAwareWaitTimeout(30, 1, expected_move_duration=5)
+        ports = [("A1", "A2")]
+
+        for i in range(10):
+            time_mock.time.return_value = 100 + i * 5
+            timeout.update(get_pending_connections(("A1", "A2")), ports, i)
+
+        self.assertEqual(15, timeout.stall_timeout)
+        time_mock.time.return_value = 130
+        self.assertTrue(timeout.expired)
+
+    def test_long_request_ahead(self, time_mock):
+        time_mock.time.return_value = 100
+        timeout = QueueAwareWaitTimeout(120, 4, expected_move_duration=5)
+        pending_connections = get_pending_connections(("B1", "B2"), ("A1", "A2"))
+
+        timeout.update(pending_connections, [("A1", "A2")], 0)
+
+        # request of other user makes as many moves as ours
+        self.assertEqual(60, timeout.stall_timeout)
+        time_mock.time.return_value = 159
+        self.assertFalse(timeout.expired)
+        time_mock.time.return_value = 160
+        self.assertTrue(timeout.expired)
@@ -0,0 +1,91 @@
+import sys
+from contextlib import contextmanager
+
+from w2w_rome.cli.rome_cli_handler import RomeCliHandler
+
+
+class HostGroup(object):
+    """Hosts (chassis) behind one logical resource.
+
+    Every host has its own CLI handler with its own session pool, so the
+    number of sessions is limited per host. Commands get a session of every
+    host at once.
+    """
+
+    def __init__(self, logger, sessions_per_host=1):
+        """Host group.
+
+        :type logger: logging.Logger
+        :param sessions_per_host: number of sessions that can be opened to a host
+        :type sessions_per_host: int
+        """
+        self._logger = logger
+        self._sessions_per_host = sessions_per_host
+        self._hosts = ()
+        # the resource has at least one host
+        self._cli_handlers = [self._create_cli_handler()]
+
+    def _create_cli_handler(self):
+        return RomeCliHandler(self._logger, self._sessions_per_host)
+
+    @property
+    def hosts(self):
+        return self._hosts
+
+    @property
+    def sessions_per_host(self):
+        return self._sessions_per_host
+
+    @property
+    def cli_handlers(self):
+        """CLI handlers in the order of the hosts.
+
+        :rtype: list[RomeCliHandler]
+        """
+        return list(self._cli_handlers)
+
+    def __len__(self):
+        return len(self._hosts)
+
+    def define_session_attributes(self, hosts, username, password):
+        """Define hosts and credentials of the sessions.
+
+        CLI handlers are reused with their pooled sessions, the session is
+        reopened by the pool if the host or credentials are changed.
+        :type hosts: tuple[str]
+        :type username: str
+        :type password: str
+        """
+        cli_handlers = self._cli_handlers[: len(hosts)]
+        while len(cli_handlers) < len(hosts):
+            cli_handlers.append(self._create_cli_handler())
+
+        for cli_handler, host in zip(cli_handlers, hosts):
+            cli_handler.define_session_attributes(host, username, password)
+        self._cli_handlers = cli_handlers
+        self._hosts = tuple(hosts)
+
+    @contextmanager
+    def default_mode_services(self):
+        """Default mode CLI services of all hosts.
+
+        :rtype: collections.Iterator[list[cloudshell.cli.cli_service_impl.CliServiceImpl]]  # noqa: E501
+        """
+        stacks = [
+            cli_handler.default_mode_service() for cli_handler in self._cli_handlers
+        ]
+
+        services = []
+        for stack in stacks:
+            services.append(stack.__enter__())
+
+        try:
+            yield services
+        finally:
+            not_raise = False
+            exc_info = sys.exc_info()
+            for stack in stacks:
+                not_raise = stack.__exit__(*exc_info)
+
+            if not not_raise and exc_info[0]:
+                raise exc_info[1]
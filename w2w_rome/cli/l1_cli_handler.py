@@ -2,6 +2,7 @@
 # -*- coding: utf-8 -*-
 
 from cloudshell.cli.cli import CLI
+from cloudshell.cli.session_manager_impl import SessionManagerImpl
 from cloudshell.cli.session_pool_manager import SessionPoolManager
 from cloudshell.layer_one.core.helper.runtime_configuration import RuntimeConfiguration
 from cloudshell.layer_one.core.layer_one_driver_exception import LayerOneDriverException
@@ -10,9 +11,20 @@ from w2w_rome.cli.rome_sessions import RomeSSHSession, RomeTelnetSession
 
 
 class L1CliHandler(object):
-    def __init__(self, logger):
+    def __init__(self, logger, max_pool_size=1):
+        """L1 CLI handler.
+
+        :type logger: logging.Logger
+        :param max_pool_size: number of sessions that can be opened to the host,
+            sessions are counted only for this handler
+        :type max_pool_size: int
+        """
         self._logger = logger
-        self._cli = CLI(session_pool=SessionPoolManager(max_pool_size=1))
+        self._cli = CLI(
+            session_pool=SessionPoolManager(
+                session_manager=SessionManagerImpl(), max_pool_size=max_pool_size
+            )
+        )
         self._defined_session_types = {
             "SSH": RomeSSHSession,
             "TELNET": RomeTelnetSession,
@@ -0,0 +1,65 @@
+import re
+
+
+class PromptMatcher(object):
+    """Find the prompt at the end of the output followed only by log lines.
+
+    The device writes asynchronous log lines after the prompt, so the prompt
+    is not always at the end of the output. The output is inspected line by
+    line from the end, only the log lines after the prompt and the line with
+    the prompt are read. The prompt has to start the line and the last line
+    that isn't finished with the new line can be still being received.
+    """
+
+    def __init__(self, prompt_regex, log_line_regex, open_log_line_regex=None):
+        """Prompt matcher.
+
+        :param prompt_regex: prompt without logs, matches inside one line
+        :type prompt_regex: str
+        :param log_line_regex: one line of logs, matches inside one line
+        :type log_line_regex: str
+        :param open_log_line_regex: log line that is accepted at the end of the
+            output without the new line, by default any log line
+        :type open_log_line_regex: str|None
+        """
+        open_log_line_regex = open_log_line_regex or log_line_regex
+        self._prompt_line_pattern = self._compile_prompt_line(
+            prompt_regex, log_line_regex
+        )
+        self._open_prompt_line_pattern = self._compile_prompt_line(
+            prompt_regex, open_log_line_regex
+        )
+        self._log_line_pattern = self._compile_log_line(log_line_regex)
+        self._open_log_line_pattern = self._compile_log_line(open_log_line_regex)
+
+    @staticmethod
+    def _compile_prompt_line(prompt_regex, log_line_regex):
+        return re.compile(
+            r"[^\S\n]*{}[^\S\n]*({})?\s*$".format(prompt_regex, log_line_regex),
+            re.IGNORECASE,
+        )
+
+    @staticmethod
+    def _compile_log_line(log_line_regex):
+        return re.compile(r"\s*({})?\s*$".format(log_line_regex), re.IGNORECASE)
+
+    def match(self, output):
+        """Check that the output ends with the prompt.
+
+        :type output: str
+        :rtype: bool
+        """
+        end = len(output)
+        log_line_pattern = self._open_log_line_pattern
+        prompt_line_pattern = self._open_prompt_line_pattern
+        while True:
+            start = output.rfind("\n", 0, end) + 1
+            line = output[start:end]
+            if not log_line_pattern.match(line):
+                return bool(prompt_line_pattern.match(line))
+            if start == 0:
+                return False
+            end = start - 1
+            # lines before the last one are finished with the new line
+            log_line_pattern = self._log_line_pattern
+            prompt_line_pattern = self._prompt_line_pattern
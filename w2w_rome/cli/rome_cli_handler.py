@@ -7,8 +7,8 @@ from w2w_rome.cli.rome_command_modes import DefaultCommandMode
 
 
 class RomeCliHandler(L1CliHandler):
-    def __init__(self, logger):
-        super(RomeCliHandler, self).__init__(logger)
+    def __init__(self, logger, max_pool_size=1):
+        super(RomeCliHandler, self).__init__(logger, max_pool_size)
         self.modes = CommandModeHelper.create_command_mode()
 
     @property
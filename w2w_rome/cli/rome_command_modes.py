@@ -4,19 +4,33 @@ from collections import OrderedDict
 
 from cloudshell.cli.command_mode import CommandMode
 
-CONNECTION_OPERATION_REGEX = (
-    r"(\d{1,2}-\d{1,2}-\d{2,4}\s\d{1,2}:\d{1,2}\s"  # date time
-    r"("
-    r"((dis)?connecting\.{3}\n?)|"
-    r"((connection operation \w+:\w+\[\w+\]<->\w+\[\w+\]\sop:\w+\n?)+|"
-    r"(connection .+ completed .+\n))*"
-    r")"
-    r")*"
+from w2w_rome.cli.prompt_matcher import PromptMatcher
+
+PROMPT_REGEX = r"\w+\[\w+\]#"
+LOG_DATE_REGEX = r"\d{1,2}-\d{1,2}-\d{2,4}\s\d{1,2}:\d{1,2}\s"
+# 08-06-2019 09:01 CONNECTION OPERATION SUCCEEDED:E3[1AE3]<->W4[1AW4] OP:connect
+OPERATION_LOG_REGEX = (
+    r"(?:dis)?connecting\.{3}|"
+    r"connection operation [\w( )]+:\w+\[\w+\]<->\w+\[\w+\]\sop:\w+"
+)
+COMPLETED_LOG_REGEX = r"connection \S+ completed\b[^\n]*"
+# every alternative ends unambiguously, so the regex doesn't backtrack
+LOG_LINE_REGEX = r"(?:{}(?:{}|{})[^\S\n]*)+".format(
+    LOG_DATE_REGEX, OPERATION_LOG_REGEX, COMPLETED_LOG_REGEX
+)
+# the line with the completed log is finished only with the new line, without
+# it we can read just a part of the line
+OPEN_LOG_LINE_REGEX = r"(?:{}(?:{})[^\S\n]*)+".format(
+    LOG_DATE_REGEX, OPERATION_LOG_REGEX
 )
 
 
 class DefaultCommandMode(CommandMode):
-    PROMPT = r"(?i)\w+\[\w+\]#\s*{}$".format(CONNECTION_OPERATION_REGEX)
+    PROMPT = r"(?i)(?:^|\n)[^\S\n]*{}\s*(?:{}\n\s*)*(?:{})?\s*$".format(
+        PROMPT_REGEX, LOG_LINE_REGEX, OPEN_LOG_LINE_REGEX
+    )
+    # used by Rome sessions instead of searching the PROMPT in the whole output
+    PROMPT_MATCHER = PromptMatcher(PROMPT_REGEX, LOG_LINE_REGEX, OPEN_LOG_LINE_REGEX)
     ENTER_COMMAND = ""
     EXIT_COMMAND = "exit"
 
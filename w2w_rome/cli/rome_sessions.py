@@ -1,21 +1,38 @@
 from collections import OrderedDict
+from itertools import count
 
 from cloudshell.cli.session.ssh_session import SSHSession
 from cloudshell.cli.session.telnet_session import TelnetSession
 
+from w2w_rome.cli.rome_command_modes import DefaultCommandMode
+from w2w_rome.cli.session_buffer import SessionBuffer
+
+# every connection of the sessions gets a new ID, so we can see a reconnect
+_connection_ids = count(1)
+
 
 class RomeTelnetSession(TelnetSession):
     def __init__(self, host, username, password, *args, **kwargs):
         super(RomeTelnetSession, self).__init__(
             host, username, password, *args, **kwargs
         )
-        self.full_buffer = ""
+        self.full_buffer = SessionBuffer()
+        self.connection_id = None
 
     def _receive(self, timeout, logger):
         data = super(RomeTelnetSession, self)._receive(timeout, logger)
-        self.full_buffer += data
+        self.full_buffer.append(data)
         return data
 
+    def connect(self, prompt, logger):
+        super(RomeTelnetSession, self).connect(prompt, logger)
+        self.connection_id = next(_connection_ids)
+
+    def match_prompt(self, prompt, match_string, logger):
+        if prompt == DefaultCommandMode.PROMPT:
+            return DefaultCommandMode.PROMPT_MATCHER.match(match_string)
+        return super(RomeTelnetSession, self).match_prompt(prompt, match_string, logger)
+
     def _connect_actions(self, prompt, logger):
         action_map = OrderedDict()
         action_map[
@@ -39,9 +56,19 @@ class RomeTelnetSession(TelnetSession):
 class RomeSSHSession(SSHSession):
     def __init__(self, host, username, password, *args, **kwargs):
         super(RomeSSHSession, self).__init__(host, username, password, *args, **kwargs)
-        self.full_buffer = ""
+        self.full_buffer = SessionBuffer()
+        self.connection_id = None
 
     def _receive(self, timeout, logger):
         data = super(RomeSSHSession, self)._receive(timeout, logger)
-        self.full_buffer += data
+        self.full_buffer.append(data)
         return data
+
+    def connect(self, prompt, logger):
+        super(RomeSSHSession, self).connect(prompt, logger)
+        self.connection_id = next(_connection_ids)
+
+    def match_prompt(self, prompt, match_string, logger):
+        if prompt == DefaultCommandMode.PROMPT:
+            return DefaultCommandMode.PROMPT_MATCHER.match(match_string)
+        return super(RomeSSHSession, self).match_prompt(prompt, match_string, logger)
@@ -0,0 +1,103 @@
+import re
+from collections import deque
+
+
+class SessionBuffer(object):
+    """Bounded buffer of the data received by the session.
+
+    Keeps only the last received data and matches of the watched patterns.
+    New data is scanned once, line by line, a not finished line is kept until
+    the rest of it is received, so patterns have to match inside one line.
+    """
+
+    MAX_SIZE = 128 * 1024
+    MAX_LINE_SIZE = 4 * 1024
+
+    def __init__(self, max_size=MAX_SIZE, max_line_size=MAX_LINE_SIZE):
+        """Session buffer.
+
+        :param max_size: bytes of the last received data to keep
+        :type max_size: int
+        :param max_line_size: bytes of a not finished line to keep
+        :type max_line_size: int
+        """
+        self._max_size = max_size
+        self._max_line_size = max_line_size
+        self._chunks = deque()
+        self._size = 0
+        self._tail = ""  # not finished line
+        # (pattern, flags): [compiled pattern, matched strings]
+        self._watched = {}
+
+    def __str__(self):
+        return "".join(self._chunks)
+
+    def __len__(self):
+        return self._size
+
+    def _scan(self, text, watched):
+        if text:
+            for pattern, matches in watched:
+                matches.extend(match.group() for match in pattern.finditer(text))
+
+    def append(self, data):
+        """Add received data and scan finished lines.
+
+        :type data: str
+        """
+        if not data:
+            return
+
+        self._chunks.append(data)
+        self._size += len(data)
+        while self._size > self._max_size and len(self._chunks) > 1:
+            self._size -= len(self._chunks.popleft())
+
+        text = self._tail + data
+        lines_end = text.rfind("\n") + 1
+        self._scan(text[:lines_end], self._watched.values())
+        self._tail = text[lines_end:][-self._max_line_size :]
+
+    def watch(self, pattern):
+        """Start to watch the pattern.
+
+        The data kept in the buffer is scanned for the new pattern.
+        :type pattern: str|typing.Pattern
+        :return: compiled pattern and matched strings
+        :rtype: list
+        """
+        if not hasattr(pattern, "finditer"):
+            pattern = re.compile(pattern)
+        key = (pattern.pattern, pattern.flags)
+
+        try:
+            watched = self._watched[key]
+        except KeyError:
+            watched = self._watched[key] = [pattern, []]
+            text = str(self)
+            self._scan(text[: text.rfind("\n") + 1], [watched])
+        return watched
+
+    def get_matches(self, pattern):
+        """Strings matched the pattern since the last reset.
+
+        :type pattern: str|typing.Pattern
+        :rtype: list[str]
+        """
+        pattern, matches = self.watch(pattern)
+        return matches + [match.group() for match in pattern.finditer(self._tail)]
+
+    def search(self, pattern):
+        """Check that the pattern was received since the last reset.
+
+        :type pattern: str|typing.Pattern
+        :rtype: bool
+        """
+        return bool(self.get_matches(pattern))
+
+    def reset(self):
+        self._chunks.clear()
+        self._size = 0
+        self._tail = ""
+        for _, matches in self._watched.values():
+            del matches[:]
@@ -1,9 +1,12 @@
 import re
+from collections import OrderedDict
 
 from cloudshell.cli.command_template.command_template_executor import (
     CommandTemplateExecutor,
 )
 
+from w2w_rome.cli.rome_command_modes import PROMPT_REGEX
+
 
 class RomeTemplateExecutor(CommandTemplateExecutor):
     @staticmethod
@@ -24,3 +27,117 @@ class RomeTemplateExecutor(CommandTemplateExecutor):
         if remove_logs:
             output = self.remove_logs_from_output(output)
         return output
+
+
+class RomePipelinedTemplateExecutor(object):
+    """Execute a few commands of the template without waiting for every prompt.
+
+    All commands are written to the session at once and the device executes
+    them one by one, so the round trip of every command is not waited for.
+    The responses are split by the echoed commands, prompts reprinted after
+    asynchronous logs don't split them. The output is read until the last
+    command is added to the pending queue or failed. Responses are checked for
+    errors separately, errors are returned instead of raised.
+    """
+
+    ECHO_PATTERN = r"^[^\S\n]*(?:{}[^\S\n]*)?{}[^\S\n]*$"
+    # OK - request added to pending queue (E246-W247)
+    REQUEST_ADDED_PATTERN = r"request added[^\n]*\({}-{}\)"
+
+    def __init__(self, cli_service, command_template, logger, action_map=None):
+        """Pipelined template executor.
+
+        :type cli_service: cloudshell.cli.cli_service_impl.CliServiceImpl
+        :type command_template: cloudshell.cli.command_template.command_template.CommandTemplate  # noqa: E501
+        :type logger: logging.Logger
+        :type action_map: dict
+        """
+        self._cli_service = cli_service
+        self._command_template = command_template
+        self._logger = logger
+        self._action_map = OrderedDict(command_template.action_map)
+        self._action_map.update(action_map or {})
+
+    def execute_commands(self, command_kwargs_list):
+        """Execute the commands and get their responses.
+
+        :param command_kwargs_list: kwargs of the template for every command,
+            src_port and dst_port of the connection commands are used to find
+            the request added to the pending queue
+        :type command_kwargs_list: list[dict]
+        :return: output with logs and error message or None for every command
+        :rtype: list[tuple[str, str|None]]
+        """
+        commands = [
+            self._command_template.prepare_command(**command_kwargs)
+            for command_kwargs in command_kwargs_list
+        ]
+        session = self._cli_service.session
+        for command in commands:
+            self._logger.debug("Command: {}".format(command))
+            session.send_line(command, self._logger)
+
+        output = ""
+        while True:
+            output += self._cli_service.send_command(
+                None, action_map=self._action_map, logger=self._logger
+            )
+            responses = self._split_responses(output, commands)
+            if responses is not None and self._is_finished(
+                responses[-1], command_kwargs_list[-1]
+            ):
+                break
+
+        return [(response, self._get_error(response)) for response in responses]
+
+    def _split_responses(self, output, commands):
+        """Split the output by the echoed commands.
+
+        Logs received before the first command are kept in its response.
+        :type output: str
+        :type commands: list[str]
+        :return: response of every command, None if not all commands are echoed
+        :rtype: list[str]|None
+        """
+        starts = []
+        pos = 0
+        for command in commands:
+            match = re.compile(
+                self.ECHO_PATTERN.format(PROMPT_REGEX, re.escape(command)),
+                re.MULTILINE,
+            ).search(output, pos)
+            if not match:
+                return None
+            starts.append(match.start())
+            pos = match.end()
+
+        starts[0] = 0
+        ends = starts[1:] + [len(output)]
+        return [output[start:end] for start, end in zip(starts, ends)]
+
+    def _is_finished(self, response, command_kwargs):
+        """Check that the command is added to the pending queue or failed.
+
+        :type response: str
+        :type command_kwargs: dict
+        :rtype: bool
+        """
+        if "src_port" in command_kwargs and "dst_port" in command_kwargs:
+            request_added_pattern = self.REQUEST_ADDED_PATTERN.format(
+                re.escape(command_kwargs["src_port"]),
+                re.escape(command_kwargs["dst_port"]),
+            )
+            if re.search(request_added_pattern, response, re.IGNORECASE):
+                return True
+        return self._get_error(response) is not None
+
+    def _get_error(self, response):
+        """Get error of the command from its response.
+
+        :type response: str
+        :rtype: str|None
+        """
+        response = RomeTemplateExecutor.remove_logs_from_output(response)
+        for error_pattern, error in self._command_template.error_map.items():
+            if re.search(error_pattern, response, re.DOTALL):
+                return str(error)
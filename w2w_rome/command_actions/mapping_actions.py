@@ -4,10 +4,17 @@ from collections import defaultdict
 
 import w2w_rome.command_templates.mapping as command_template
 from w2w_rome.cli.template_executor import (
+    RomePipelinedTemplateExecutor,
     RomeTemplateExecutor as CommandTemplateExecutor,
 )
+from w2w_rome.helpers.connection_watcher import ConnectionCompletionWatcher
 from w2w_rome.helpers.errors import BaseRomeException, NotSupportedError
+from w2w_rome.helpers.operation_statistics import OperationStatistics
+from w2w_rome.helpers.pending_connections import PendingConnections
+from w2w_rome.helpers.poll_scheduler import ConstantPollScheduler
 from w2w_rome.helpers.run_in_threads import run_in_threads
+from w2w_rome.helpers.thread_executor import cancellable_sleep, check_cancelled
+from w2w_rome.helpers.wait_timeout import FixedWaitTimeout, QueueAwareWaitTimeout
 
 
 def reset_connection_pending(session, logger):
@@ -28,12 +35,67 @@ def reset_connection_pending(session, logger):
     )
 
 
+class DetachedWait(object):
+    """State of the wait for pending connections that doesn't keep the sessions."""
+
+    def __init__(self, ports, num_ports_to_connect, schedule, timeouts):
+        """Detached wait.
+
+        :param ports: src and dst ports that connects
+        :type ports: list[tuple[str, str]]
+        :param num_ports_to_connect: number of moves on every host
+        :type num_ports_to_connect: int
+        :type schedule: w2w_rome.helpers.poll_scheduler.PollSchedule
+        :param timeouts: timeouts of the hosts where the ports are pending
+        :type timeouts: dict[str, w2w_rome.helpers.wait_timeout.BaseWaitTimeout]
+        """
+        self.ports = ports
+        self.num_ports_to_connect = num_ports_to_connect
+        self.schedule = schedule
+        self.timeouts = timeouts
+        self.start_time = time.time()
+        self.queue_end_times = {}
+        # why the ports are pending after the timeout
+        self.timeout_message = None
+
+    @property
+    def completed(self):
+        return not self.timeouts
+
+    @property
+    def expired(self):
+        return self.timeout_message is not None
+
+    @property
+    def time_left(self):
+        return min(timeout.time_left for timeout in self.timeouts.values())
+
+
 class MappingActions(object):
     CONNECTION_PENDING_RESET_MAP = {
         "(?i)Multiple Cross Connect Severe Failure": reset_connection_pending,
     }
+    # 08-05-2019 09:20 CONNECTION OPERATION SUCCEEDED:E3[1AE3]<->W4[1AW4] OP:connect
+    SUB_PORT_OPERATION_PATTERN = re.compile(
+        r"connection operation (?P<status>[\w( )]+):"
+        r"(?P<first_port>[EW]\d+)\[\w*\]<->(?P<second_port>[EW]\d+)\[\w*\]\s+"
+        r"OP:(?P<operation>\w+)",
+        re.IGNORECASE,
+    )
+    SUB_PORT_OPERATION_SUCCESS_STATUSES = ("SUCCEEDED", "SKIPPED")
 
-    def __init__(self, cli_services, logger, mapping_timeout, mapping_check_delay):
+    def __init__(
+        self,
+        cli_services,
+        logger,
+        mapping_timeout,
+        mapping_check_delay,
+        poll_scheduler=None,
+        executor=None,
+        queue_aware_timeout=False,
+        operation_statistics=None,
+        pipelined_disconnect=False,
+    ):
         """Mapping actions.
 
         :param cli_services: default mode cli_services
@@ -41,20 +103,136 @@ class MappingActions(object):
         :type logger: logging.Logger
         :type mapping_timeout: int
         :type mapping_check_delay: int
+        :param poll_scheduler: delays between pending connections checks, by default
+            checks every mapping check delay
+        :type poll_scheduler: w2w_rome.helpers.poll_scheduler.BasePollScheduler
+        :param executor: runs commands on a few hosts in parallel
+        :type executor: w2w_rome.helpers.thread_executor.ThreadExecutor
+        :param queue_aware_timeout: abort the wait for pending connections if the
+            device doesn't make progress instead of the mapping timeout for every
+            port
+        :type queue_aware_timeout: bool
+        :param operation_statistics: measured durations of the mapping phases
+        :type operation_statistics: w2w_rome.helpers.operation_statistics.OperationStatistics  # noqa: E501
+        :param pipelined_disconnect: send all disconnect commands at once and then
+            read their responses
+        :type pipelined_disconnect: bool
         """
-        self._mapping_check_delay = mapping_check_delay
+        self._executor = executor
+        self._queue_aware_timeout = queue_aware_timeout
+        self._operation_statistics = operation_statistics
+        self._pipelined_disconnect = pipelined_disconnect
+        self._poll_scheduler = poll_scheduler or ConstantPollScheduler(
+            mapping_check_delay
+        )
+        self._matrix_letter = None
         self._mapping_timeout = mapping_timeout
         self._cli_services = cli_services
         self._cli_services_map = {cli.session.host: cli for cli in cli_services}
         self._logger = logger
         self._is_run_in_parallel = len(cli_services) > 1
+        # port resource, operation and names of the E and W sub ports
+        self._sub_port_operations = []
+        # number of logged operations on every host, progress of the device
+        self._num_sub_port_operations = defaultdict(int)
+
+    def bind_cli_services(self, cli_services):
+        """Use other sessions of the same hosts, e.g. taken for the next check.
+
+        :type cli_services: list[cloudshell.cli.cli_service_impl.CliServiceImpl]
+        """
+        self._cli_services = cli_services
+        self._cli_services_map = {cli.session.host: cli for cli in cli_services}
+
+    @property
+    def matrix_letter(self):
+        """Matrix letter of the mapped ports, A, B, Q or XY.
+
+        :rtype: str|None
+        """
+        return self._matrix_letter
+
+    def _set_matrix_letter(self, logic_port):
+        """Set matrix letter of the mapped ports, A, B, Q or XY.
+
+        :type logic_port: w2w_rome.helpers.port_entity.LogicalPort
+        """
+        letter = logic_port.blade_letter
+        self._matrix_letter = "XY" if letter in "XY" else letter
+
+    def _collect_sub_port_operations(self, cli_service, output):
+        """Collect successful sub port operations that the device logged.
+
+        :type cli_service: cloudshell.cli.cli_service_impl.CliServiceImpl
+        :type output: str
+        """
+        for match in self.SUB_PORT_OPERATION_PATTERN.finditer(output):
+            status = match.group("status").upper()
+            if not status.startswith(self.SUB_PORT_OPERATION_SUCCESS_STATUSES):
+                continue
+
+            e_port, w_port = sorted(
+                (match.group("first_port").upper(), match.group("second_port").upper())
+            )
+            self._num_sub_port_operations[cli_service.session.host] += 1
+            self._sub_port_operations.append(
+                (
+                    cli_service.session.host,
+                    match.group("operation").lower(),
+                    e_port,
+                    w_port,
+                )
+            )
+
+    def update_port_table(self, port_table):
+        """Update the port table in place with operations logged by the device.
+
+        :type port_table: w2w_rome.helpers.port_entity.PortTable
+        :raises BaseRomeException: if the device logged an operation that isn't
+            connect or disconnect, the port table cannot be updated with it
+        """
+        operations, self._sub_port_operations = self._sub_port_operations, []
+        for port_resource, operation, e_port, w_port in operations:
+            if operation == "connect":
+                port_table.set_sub_ports_connected(port_resource, e_port, w_port)
+            elif operation == "disconnect":
+                port_table.set_sub_ports_disconnected(port_resource, e_port, w_port)
+            else:
+                raise BaseRomeException(
+                    "Unknown operation {} of the sub ports {} and {}".format(
+                        operation, e_port, w_port
+                    )
+                )
 
     def check_full_output(self, cli_service):
+        """Check logs received by the session since the last check.
+
+        :type cli_service: cloudshell.cli.cli_service_impl.CliServiceImpl
+        """
+        full_buffer = cli_service.session.full_buffer
         for key, action in self.CONNECTION_PENDING_RESET_MAP.items():
-            if re.search(key, cli_service.session.full_buffer):
+            if full_buffer.search(key):
                 action(cli_service.session, self._logger)
 
-        cli_service.session.full_buffer = ""
+        self._collect_sub_port_operations(
+            cli_service,
+            "\n".join(full_buffer.get_matches(self.SUB_PORT_OPERATION_PATTERN)),
+        )
+        full_buffer.reset()
+
+    def _execute_mapping_command(self, cli_service, command, **command_kwargs):
+        """Execute connect/disconnect command and collect logged operations.
+
+        :type cli_service: cloudshell.cli.cli_service_impl.CliServiceImpl
+        :type command: cloudshell.cli.command_template.command_template.CommandTemplate
+        :return: output with logs
+        :rtype: str
+        """
+        output = CommandTemplateExecutor(
+            cli_service, command, action_map=self.CONNECTION_PENDING_RESET_MAP,
+        ).execute_command(remove_logs=False, **command_kwargs)
+        self._collect_sub_port_operations(cli_service, output)
+        return output
 
     def _connect(self, cli_service, src_port_name, dst_port_name):
         """Connect ports by name.
@@ -65,26 +243,46 @@ class MappingActions(object):
         :return: output
         :rtype: str
         """
-        return CommandTemplateExecutor(
+        return self._execute_mapping_command(
             cli_service,
             command_template.CONNECT,
-            action_map=self.CONNECTION_PENDING_RESET_MAP,
-        ).execute_command(src_port=src_port_name, dst_port=dst_port_name)
+            src_port=src_port_name,
+            dst_port=dst_port_name,
+        )
 
-    def _connect_and_wait(
-        self, cli_service, src_port_name, dst_port_name, num_ports_to_connect
-    ):
+    def _connect_and_wait(self, cli_service, port_names, num_ports_to_connect):
         """Connect multiple ports.
 
         :type cli_service: cloudshell.cli.cli_service_impl.CliServiceImpl
-        :type src_port_name: str
-        :type dst_port_name: str
+        :param port_names: src and dst port names
+        :type port_names: list[tuple[str, str]]
         :type num_ports_to_connect: int
         """
-        self._connect(cli_service, src_port_name, dst_port_name)
+        output = self._submit_connect(cli_service, port_names)
         self.wait_ports_not_in_pending_connections(
-            cli_service, [(src_port_name, dst_port_name)], num_ports_to_connect,
+            cli_service, port_names, num_ports_to_connect, output
+        )
+
+    def _submit_connect(self, cli_service, port_names):
+        """Add connections of multiple ports to the device queue.
+
+        :type cli_service: cloudshell.cli.cli_service_impl.CliServiceImpl
+        :param port_names: src and dst port names
+        :type port_names: list[tuple[str, str]]
+        :return: output of the connect commands
+        :rtype: str
+        """
+        start_time = time.time()
+        output = ""
+        for src_port_name, dst_port_name in port_names:
+            output += self._connect(cli_service, src_port_name, dst_port_name)
+        self._add_operation_statistics(
+            cli_service,
+            OperationStatistics.SUBMIT,
+            time.time() - start_time,
+            len(port_names),
         )
+        return output
 
     def connect(self, src_logic_port, dst_logic_port, bidi=True):
         """Connect logical ports.
@@ -93,36 +291,85 @@ class MappingActions(object):
         :type dst_logic_port: w2w_rome.helpers.port_entity.LogicalPort
         :type bidi: bool
         """
-        if not bidi:
-            if src_logic_port.is_q_port:
-                raise NotSupportedError("Uni connections not supported for Q ports")
-            if self._is_run_in_parallel:
-                raise NotSupportedError("Not supported multiple host and map uni")
-            e_port = src_logic_port.e_sub_ports[0].sub_port_name
-            w_port = dst_logic_port.w_sub_ports[0].sub_port_name
-            param_map = {
-                cli_service: [[cli_service, e_port, w_port, 2], {}]
-                for cli_service in self._cli_services
-            }
-        else:
-            src_logic_name = src_logic_port.original_logical_name
-            dst_logic_name = dst_logic_port.original_logical_name
+        if bidi:
+            return self.connect_multiple([(src_logic_port, dst_logic_port)])
+
+        self._set_matrix_letter(src_logic_port)
+        if src_logic_port.is_q_port:
+            raise NotSupportedError("Uni connections not supported for Q ports")
+        if self._is_run_in_parallel:
+            raise NotSupportedError("Not supported multiple host and map uni")
+        e_port = src_logic_port.e_sub_ports[0].sub_port_name
+        w_port = dst_logic_port.w_sub_ports[0].sub_port_name
+        self._connect_and_wait(self._cli_services[0], [(e_port, w_port)], 2)
+
+    def _get_bidi_port_names(self, connect_logic_ports):
+        """Get port names to connect and number of moves.
+
+        :type connect_logic_ports: list[tuple[w2w_rome.helpers.port_entity.LogicalPort]]  # noqa
+        :return: src and dst port names and number of moves on every host
+        :rtype: tuple[list[tuple[str, str]], int]
+        """
+        port_names = []
+        num_ports_to_connect = 0
+        for src_logic_port, dst_logic_port in connect_logic_ports:
+            self._set_matrix_letter(src_logic_port)
+            port_names.append(
+                (
+                    src_logic_port.original_logical_name,
+                    dst_logic_port.original_logical_name,
+                )
+            )
             # connect every E port to W in both directions
-            num_ports_to_connect = 2 * len(src_logic_port.rome_ports)
-            param_map = {
-                cli_service: [
-                    [cli_service, src_logic_name, dst_logic_name, num_ports_to_connect],
-                    {},
-                ]
-                for cli_service in self._cli_services
-            }
+            num_ports_to_connect += 2 * len(src_logic_port.rome_ports)
+        return port_names, num_ports_to_connect
+
+    def connect_multiple(self, connect_logic_ports):
+        """Connect pairs of logical ports bidirectional.
 
+        All connections are created one by one and then we wait for all of them
+        leave pending connections.
+        :type connect_logic_ports: list[tuple[w2w_rome.helpers.port_entity.LogicalPort]]  # noqa
+        """
+        port_names, num_ports_to_connect = self._get_bidi_port_names(
+            connect_logic_ports
+        )
+        param_map = {
+            cli_service: [[cli_service, port_names, num_ports_to_connect], {}]
+            for cli_service in self._cli_services
+        }
         if not self._is_run_in_parallel:
             params = param_map.values()[0]
             args, kwargs = params
             self._connect_and_wait(*args, **kwargs)
         else:
-            run_in_threads(self._connect_and_wait, self._logger, param_map)
+            run_in_threads(
+                self._connect_and_wait, self._logger, param_map, self._executor
+            )
+
+    def submit_connect_multiple(self, connect_logic_ports):
+        """Add bidirectional connections to the device queue without waiting.
+
+        :type connect_logic_ports: list[tuple[w2w_rome.helpers.port_entity.LogicalPort]]  # noqa
+        :return: src and dst port names and number of moves on every host
+        :rtype: tuple[list[tuple[str, str]], int]
+        """
+        port_names, num_ports_to_connect = self._get_bidi_port_names(
+            connect_logic_ports
+        )
+        param_map = {
+            cli_service: [[cli_service, port_names], {}]
+            for cli_service in self._cli_services
+        }
+        if not self._is_run_in_parallel:
+            params = param_map.values()[0]
+            args, kwargs = params
+            self._submit_connect(*args, **kwargs)
+        else:
+            run_in_threads(
+                self._submit_connect, self._logger, param_map, self._executor
+            )
+        return port_names, num_ports_to_connect
 
     def _disconnect(self, cli_service, src_port, dst_port):
         """Disconnect ports by name.
@@ -133,9 +380,12 @@ class MappingActions(object):
         :return: output
         :rtype: str
         """
-        return CommandTemplateExecutor(
-            cli_service, command_template.DISCONNECT, self.CONNECTION_PENDING_RESET_MAP,
-        ).execute_command(src_port=src_port, dst_port=dst_port)
+        return self._execute_mapping_command(
+            cli_service,
+            command_template.DISCONNECT,
+            src_port=src_port,
+            dst_port=dst_port,
+        )
 
     def _disconnect_and_wait(
         self, cli_service, connected_port_names, num_ports_to_disconnect
@@ -146,19 +396,78 @@ class MappingActions(object):
         :type connected_port_names: list[tuple[str, str]]
         :type num_ports_to_disconnect: int
         """
-        for src, dst in connected_port_names:
-            self._disconnect(cli_service, src, dst)
+        start_time = time.time()
+        errors = {}
+        if self._pipelined_disconnect and len(connected_port_names) > 1:
+            output, errors = self._disconnect_pipelined(
+                cli_service, connected_port_names
+            )
+        else:
+            output = ""
+            for src, dst in connected_port_names:
+                output += self._disconnect(cli_service, src, dst)
+        self._add_operation_statistics(
+            cli_service,
+            OperationStatistics.SUBMIT,
+            time.time() - start_time,
+            len(connected_port_names),
+        )
 
-        self.wait_ports_not_in_pending_connections(
-            cli_service, connected_port_names, num_ports_to_disconnect
+        # wait for the requests the device accepted even if some of them failed
+        submitted_port_names = [
+            ports for ports in connected_port_names if ports not in errors
+        ]
+        if submitted_port_names:
+            self.wait_ports_not_in_pending_connections(
+                cli_service, submitted_port_names, num_ports_to_disconnect, output
+            )
+        if errors:
+            raise BaseRomeException(
+                "Cannot disconnect ports: {}".format(
+                    ", ".join(
+                        "{} - {} ({})".format(src, dst, errors[(src, dst)])
+                        for src, dst in connected_port_names
+                        if (src, dst) in errors
+                    )
+                )
+            )
+
+    def _disconnect_pipelined(self, cli_service, connected_port_names):
+        """Send all disconnect commands at once and collect their responses.
+
+        :type cli_service: cloudshell.cli.cli_service_impl.CliServiceImpl
+        :type connected_port_names: list[tuple[str, str]]
+        :return: output with logs and errors of the failed commands
+        :rtype: tuple[str, dict[tuple[str, str], str]]
+        """
+        responses = RomePipelinedTemplateExecutor(
+            cli_service,
+            command_template.DISCONNECT,
+            self._logger,
+            action_map=self.CONNECTION_PENDING_RESET_MAP,
+        ).execute_commands(
+            [{"src_port": src, "dst_port": dst} for src, dst in connected_port_names]
         )
 
+        output = ""
+        errors = {}
+        for ports, (response, error) in zip(connected_port_names, responses):
+            self._collect_sub_port_operations(cli_service, response)
+            output += response
+            if error is not None:
+                errors[ports] = error
+        return output, errors
+
     def disconnect(self, connected_logic_ports, bidi=False):
         """Disconnect logical ports.
 
         :type connected_logic_ports: set[tuple[w2w_rome.helpers.port_entity.LogicalPort]]  # noqa
         :type bidi: bool
         """
+        for src_logic_port, _ in connected_logic_ports:
+            self._set_matrix_letter(src_logic_port)
+            break
+
         if bidi:
             connected_port_names = []
             num_ports = 0
@@ -197,18 +506,15 @@ class MappingActions(object):
             args, kwargs = params
             self._disconnect_and_wait(*args, **kwargs)
         else:
-            run_in_threads(self._disconnect_and_wait, self._logger, param_map)
-
-    def ports_in_pending_connections(self, cli_service, ports):
-        """Check ports in process or pending.
+            run_in_threads(
+                self._disconnect_and_wait, self._logger, param_map, self._executor
+            )
 
-        Command in process:
-        connect, ports: A3-A4, status: in process with payload
+    def get_pending_connections(self, cli_service):
+        """Get connections in process or pending.
 
-        ======= ========= ========= ================== ======= ===================
-        Request Port1     Port2     Command            Source  User
-        ======= ========= ========= ================== ======= ===================
-        772     A1        A2        connect            CLI     admin
+        :type cli_service: cloudshell.cli.cli_service_impl.CliServiceImpl
+        :rtype: PendingConnections
         """
         self.check_full_output(cli_service)
 
@@ -216,38 +522,269 @@ class MappingActions(object):
             cli_service,
             command_template.CONNECTION_SHOW_PENDING,
             action_map=self.CONNECTION_PENDING_RESET_MAP,
-        ).execute_command()
+        ).execute_command(remove_logs=False)
 
         self.check_full_output(cli_service)
+        self._collect_sub_port_operations(cli_service, output)
+        output = CommandTemplateExecutor.remove_logs_from_output(output)
+        return PendingConnections.from_output(output)
 
-        for src, dst in ports:
-            match = re.search(r"ports:\s+{}-{}\D".format(src, dst), output, re.I)
-            match = match or re.search(
-                r"\w+\s+{}\s+{}\s+\w+".format(src, dst), output, re.I
-            )
-            if match:
-                return True
+    def ports_in_pending_connections(self, cli_service, ports):
+        """Check ports in process or pending.
 
-        return False
+        :type cli_service: cloudshell.cli.cli_service_impl.CliServiceImpl
+        :param ports: src and dst ports
+        :type ports: list[tuple[str, str]]
+        :rtype: bool
+        """
+        return self.get_pending_connections(cli_service).contains_any(ports)
+
+    def ports_in_pending_connections_on_hosts(self, ports):
+        """Check ports in process or pending on any of the hosts.
+
+        :param ports: src and dst ports
+        :type ports: list[tuple[str, str]]
+        :rtype: bool
+        """
+        return any(
+            self.ports_in_pending_connections(cli_service, ports)
+            for cli_service in self._cli_services
+        )
 
     def wait_ports_not_in_pending_connections(
-        self, cli_service, ports, num_ports_to_connect
+        self, cli_service, ports, num_ports_to_connect, output=""
     ):
         """Wait for ports go away from pending connections.
 
+        Instead of sleeping between the checks we watch the session for logs
+        about completed connections and check pending connections as soon as
+        they are completed. If the device doesn't log it we check pending
+        connections every mapping check delay.
+
         :type cli_service: cloudshell.cli.cli_service_impl.CliServiceImpl
         :param ports: src and dst ports that connects
         :type ports: list[tuple[str, str]]
         :param num_ports_to_connect: timeout depends on it
         :type num_ports_to_connect: int
+        :param output: output of the connect or disconnect commands
+        :type output: str
         """
-        end_time = time.time() + (self._mapping_timeout * num_ports_to_connect)
-        while time.time() < end_time:
-            time.sleep(self._mapping_check_delay)
-            if not self.ports_in_pending_connections(cli_service, ports):
+        watcher = ConnectionCompletionWatcher(cli_service.session, ports, self._logger)
+        watcher.feed(output)
+        is_completed = False
+        timeout = self._create_wait_timeout(cli_service, num_ports_to_connect)
+        schedule = self._poll_scheduler.new_schedule(
+            self._matrix_letter, num_ports_to_connect, timeout.time_left
+        )
+        start_time = queue_end_time = time.time()
+        is_queued = True
+
+        while not timeout.expired:
+            # stop waiting if the mapping failed on another host
+            check_cancelled()
+            delay = min(schedule.next_delay(), timeout.time_left)
+            if is_completed:
+                # connections are completed but still pending, poll the device
+                cancellable_sleep(delay)
+            else:
+                is_completed = watcher.wait(delay)
+            pending_connections = self.get_pending_connections(cli_service)
+            if is_queued and not pending_connections.get_requests_ahead(ports):
+                is_queued = False
+                queue_end_time = time.time()
+
+            if pending_connections.contains_any(ports):
+                timeout.update(
+                    pending_connections,
+                    ports,
+                    self._num_sub_port_operations[cli_service.session.host],
+                )
+                eta = timeout.get_eta()
+                self._logger.debug(
+                    "Ports are pending, queue depth is {}{}".format(
+                        pending_connections.queue_depth,
+                        ", ETA {:.0f}sec".format(eta) if eta is not None else "",
+                    )
+                )
+            else:
+                schedule.finish(timeout.total_moves)
+                self._add_wait_statistics(
+                    cli_service,
+                    queue_end_time - start_time,
+                    time.time() - queue_end_time,
+                    num_ports_to_connect,
+                )
+                self._logger.debug(
+                    "Pending connections checks statistics: {}".format(
+                        self._poll_scheduler.statistics.as_dict()
+                    )
+                )
                 break
         else:
-            msg = "There are some pending connections after {}sec".format(
-                self._mapping_timeout
+            raise BaseRomeException(self._get_wait_timeout_message(timeout))
+
+    def _get_wait_timeout_message(self, timeout):
+        """Message about the ports that are pending after the timeout.
+
+        :type timeout: w2w_rome.helpers.wait_timeout.BaseWaitTimeout
+        :rtype: str
+        """
+        if self._queue_aware_timeout:
+            return (
+                "There are some pending connections after {:.0f}sec, the device "
+                "didn't make progress for {:.0f}sec".format(
+                    timeout.elapsed, timeout.stall_timeout
+                )
+            )
+        return "There are some pending connections after {}sec".format(
+            self._mapping_timeout
+        )
+
+    def start_detached_wait(self, ports, num_ports_to_connect):
+        """Start the wait for pending connections that doesn't keep the sessions.
+
+        The sessions are taken only for the checks and bound before every
+        check, see bind_cli_services. The timeout, poll scheduler and
+        statistics are the same as in wait_ports_not_in_pending_connections.
+        :param ports: src and dst ports that connects
+        :type ports: list[tuple[str, str]]
+        :param num_ports_to_connect: number of moves on every host
+        :type num_ports_to_connect: int
+        :rtype: DetachedWait
+        """
+        timeouts = {
+            cli_service.session.host: self._create_wait_timeout(
+                cli_service, num_ports_to_connect
+            )
+            for cli_service in self._cli_services
+        }
+        schedule = self._poll_scheduler.new_schedule(
+            self._matrix_letter,
+            num_ports_to_connect,
+            max(timeout.time_left for timeout in timeouts.values()),
+        )
+        return DetachedWait(ports, num_ports_to_connect, schedule, timeouts)
+
+    def get_detached_wait_delay(self, wait):
+        """Seconds to sleep before the next check of the detached wait.
+
+        :type wait: DetachedWait
+        :rtype: float
+        """
+        return min(wait.schedule.next_delay(), wait.time_left)
+
+    def check_detached_wait(self, wait):
+        """Check pending connections of the detached wait on the hosts.
+
+        :type wait: DetachedWait
+        :return: the ports are not pending on all hosts, if they are pending
+            after the timeout the wait is expired
+        :rtype: bool
+        """
+        total_moves = max(timeout.total_moves for timeout in wait.timeouts.values())
+        for cli_service in self._cli_services:
+            host = cli_service.session.host
+            timeout = wait.timeouts.get(host)
+            if timeout is None:
+                continue
+
+            pending_connections = self.get_pending_connections(cli_service)
+            if host not in wait.queue_end_times and not (
+                pending_connections.get_requests_ahead(wait.ports)
+            ):
+                wait.queue_end_times[host] = time.time()
+
+            if pending_connections.contains_any(wait.ports):
+                timeout.update(
+                    pending_connections,
+                    wait.ports,
+                    self._num_sub_port_operations[host],
+                )
+                if timeout.expired and not wait.expired:
+                    wait.timeout_message = self._get_wait_timeout_message(timeout)
+            else:
+                del wait.timeouts[host]
+                queue_end_time = wait.queue_end_times.get(host, wait.start_time)
+                self._add_wait_statistics(
+                    cli_service,
+                    queue_end_time - wait.start_time,
+                    time.time() - queue_end_time,
+                    wait.num_ports_to_connect,
+                )
+
+        if wait.completed:
+            wait.schedule.finish(total_moves)
+        return wait.completed
+
+    def _create_wait_timeout(self, cli_service, num_ports_to_connect):
+        """Create timeout of the wait for pending connections.
+
+        :type cli_service: cloudshell.cli.cli_service_impl.CliServiceImpl
+        :param num_ports_to_connect: number of moves we wait for
+        :type num_ports_to_connect: int
+        :rtype: w2w_rome.helpers.wait_timeout.BaseWaitTimeout
+        """
+        if not self._queue_aware_timeout:
+            return FixedWaitTimeout(self._mapping_timeout, num_ports_to_connect)
+
+        # measured on the host before, otherwise during this driver run
+        statistics = self._operation_statistics
+        expected_move_duration = statistics and statistics.get_expected_move_duration(
+            cli_service.session.host, self._matrix_letter
+        )
+        if expected_move_duration is None:
+            poll_statistics = self._poll_scheduler.statistics
+            expected_move_duration = poll_statistics.get_expected_move_duration(
+                self._matrix_letter
+            )
+        return QueueAwareWaitTimeout(
+            self._mapping_timeout, num_ports_to_connect, expected_move_duration
+        )
+
+    def _add_operation_statistics(self, cli_service, phase, duration, moves=None):
+        """Add measured duration of the mapping phase on the host.
+
+        :type cli_service: cloudshell.cli.cli_service_impl.CliServiceImpl
+        :type phase: str
+        :type duration: float
+        :type moves: int|None
+        """
+        if self._operation_statistics:
+            self._operation_statistics.add(
+                cli_service.session.host, self._matrix_letter, phase, duration, moves
+            )
+
+    def _add_wait_statistics(self, cli_service, queue_wait, completion, moves):
+        """Add durations of the completed pending connections wait and save them.
+
+        :type cli_service: cloudshell.cli.cli_service_impl.CliServiceImpl
+        :param queue_wait: seconds our requests waited behind other requests
+        :type queue_wait: float
+        :param completion: seconds the device executed our requests
+        :type completion: float
+        :param moves: number of our moves
+        :type moves: int
+        """
+        if not self._operation_statistics:
+            return
+        self._add_operation_statistics(
+            cli_service, OperationStatistics.QUEUE_WAIT, queue_wait
+        )
+        self._add_operation_statistics(
+            cli_service, OperationStatistics.COMPLETION, completion, moves
+        )
+        self._operation_statistics.save()
+
+    def add_verification_statistics(self, duration):
+        """Add duration of the port table verification after the mapping.
+
+        :param duration: seconds
+        :type duration: float
+        """
+        if not self._operation_statistics:
+            return
+        for cli_service in self._cli_services:
+            self._add_operation_statistics(
+                cli_service, OperationStatistics.VERIFICATION, duration
             )
-            raise BaseRomeException(msg)
+        self._operation_statistics.save()
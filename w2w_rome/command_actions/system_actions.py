@@ -1,5 +1,6 @@
 import re
 
+import w2w_rome.command_templates.mapping as mapping_command_template
 import w2w_rome.command_templates.system as command_template
 from w2w_rome.cli.template_executor import (
     RomeTemplateExecutor as CommandTemplateExecutor,
@@ -9,15 +10,34 @@ from w2w_rome.helpers.run_in_threads import run_in_threads
 
 
 class SystemActions(object):
-    def __init__(self, cli_services, logger):
+    def __init__(
+        self,
+        cli_services,
+        logger,
+        port_table_cache=None,
+        executor=None,
+        board_table_cache=None,
+        port_table_flight=None,
+    ):
         """Autoload actions.
 
         :param cli_services: default mode cli_services
         :type cli_services: list[cloudshell.cli.cli_service_impl.CliServiceImpl]
         :type logger: logging.Logger
+        :type port_table_cache: w2w_rome.helpers.port_table_cache.PortTableCache
+        :param executor: runs commands on a few hosts in parallel
+        :type executor: w2w_rome.helpers.thread_executor.ThreadExecutor
+        :type board_table_cache: w2w_rome.helpers.board_table_cache.BoardTableCache
+        :param port_table_flight: shares loading of the port table between
+            concurrent commands
+        :type port_table_flight: w2w_rome.helpers.single_flight.SingleFlight
         """
         self._cli_services = cli_services
         self._logger = logger
+        self._port_table_cache = port_table_cache
+        self._executor = executor
+        self._board_table_cache = board_table_cache
+        self._port_table_flight = port_table_flight
         self._is_run_in_parallel = len(cli_services) > 1
 
     @staticmethod
@@ -27,9 +47,55 @@ class SystemActions(object):
         ).execute_command()
         return PortTable.from_output(port_table_output, cli_service.session.host)
 
-    def get_port_table(self):
+    def get_port_table(self, force_reload=False, operation_counts=None):
         """Get port table from hosts and concatenating it.
 
+        With the change detection of the cache "show board" is executed first
+        and the cached port table is used if the operation counters are the same.
+        Concurrent commands share one loading of the port table, every command
+        gets its own snapshot of it that is copied only when it's updated.
+        :param force_reload: load the port table from the device even if we have
+            not stale port table in the cache
+        :type force_reload: bool
+        :param operation_counts: operation counters already read from the hosts
+        :type operation_counts: tuple[int]|None
+        :rtype: PortTable
+        """
+        cache = self._port_table_cache
+        if cache is not None and not force_reload:
+            port_table = cache.get()
+            if port_table is not None:
+                self._logger.debug("Use the port table from the cache")
+                return port_table
+
+        if cache is not None and cache.change_detection:
+            if operation_counts is None:
+                operation_counts = self.get_operation_counts()
+            if not force_reload:
+                port_table = cache.get_unchanged(operation_counts)
+                if port_table is not None:
+                    self._logger.debug(
+                        "Operation counters are not changed, "
+                        "use the port table from the cache"
+                    )
+                    return port_table
+
+        if self._port_table_flight is None:
+            return self._load_port_table(operation_counts)
+
+        hosts = tuple(cli_service.session.host for cli_service in self._cli_services)
+        port_table, is_shared = self._port_table_flight.do(
+            hosts, lambda: self._load_port_table(operation_counts), fresh=force_reload
+        )
+        if is_shared:
+            self._logger.debug("Port table is loaded once for concurrent commands")
+            port_table = port_table.snapshot()
+        return port_table
+
+    def _load_port_table(self, operation_counts=None):
+        """Load port table from hosts and keep it in the cache.
+
+        :type operation_counts: tuple[int]|None
         :rtype: PortTable
         """
         if not self._is_run_in_parallel:
@@ -38,10 +104,47 @@ class SystemActions(object):
             param_map = {
                 cli_service: [[cli_service], {}] for cli_service in self._cli_services
             }
-            results_map = run_in_threads(self._get_port_table, self._logger, param_map)
-            port_table = reduce(PortTable.__add__, results_map.values())  # noqa: F821
+            results_map = run_in_threads(
+                self._get_port_table, self._logger, param_map, self._executor
+            )
+            port_table = PortTable.merge(
+                [results_map[cli_service] for cli_service in self._cli_services]
+            )
+
+        cache = self._port_table_cache
+        if cache is not None:
+            cache.store(port_table, operation_counts)
         return port_table
 
+    @staticmethod
+    def _update_logical_ports(cli_service, port_table, logical_ports):
+        host = cli_service.session.host
+        for logical_port in logical_ports:
+            port_info_output = CommandTemplateExecutor(
+                cli_service, mapping_command_template.PORT_INFO
+            ).execute_command(port=logical_port.original_logical_name)
+            port_table.update_logical_port(host, logical_port, port_info_output)
+
+    def update_port_table(self, port_table, port_names):
+        """Update the port table in place with the state of the given ports.
+
+        Loads only sub ports of the logical ports instead of the whole table.
+        :type port_table: PortTable
+        :param port_names: logical port names, A1, Q2
+        :type port_names: list[str]
+        """
+        logical_ports = [port_table[port_name] for port_name in sorted(port_names)]
+        if not self._is_run_in_parallel:
+            self._update_logical_ports(self._cli_services[0], port_table, logical_ports)
+        else:
+            param_map = {
+                cli_service: [[cli_service, port_table, logical_ports], {}]
+                for cli_service in self._cli_services
+            }
+            run_in_threads(
+                self._update_logical_ports, self._logger, param_map, self._executor
+            )
+
     @staticmethod
     def _board_table(cli_service):
         """Get board table.
@@ -70,21 +173,69 @@ class SystemActions(object):
         if sw_version_search:
             board_table["sw_version"] = sw_version_search.group(1)
 
+        operation_count_search = re.search(
+            r"^OPERATION\s+COUNT\s+(\d+)\s*$", output, re.MULTILINE
+        )
+        if operation_count_search:
+            board_table["operation_count"] = int(operation_count_search.group(1))
+
         return board_table
 
-    def get_board_tables_map(self):
+    def get_board_tables_map(self, force_reload=False):
         """Get board tables from hosts.
 
+        :param force_reload: load board tables from the device even if we have
+            them in the cache
+        :type force_reload: bool
         :return: dict[cli_service, dict with board table info[
         :rtype: dict[cloudshell.cli.cli_service_impl.CliServiceImpl, dict]
         """
-        if not self._is_run_in_parallel:
-            results_map = {
-                self._cli_services[0]: self._board_table(self._cli_services[0])
-            }
-        else:
+        cache = self._board_table_cache
+        results_map = {}
+        if cache is not None and not force_reload:
+            for cli_service in self._cli_services:
+                board_table = cache.get(cli_service.session)
+                if board_table is not None:
+                    results_map[cli_service] = board_table
+            if results_map:
+                self._logger.debug("Use board tables from the cache")
+
+        cli_services = [
+            cli_service
+            for cli_service in self._cli_services
+            if cli_service not in results_map
+        ]
+        if len(cli_services) == 1:
+            loaded_map = {cli_services[0]: self._board_table(cli_services[0])}
+        elif cli_services:
             param_map = {
-                cli_service: [[cli_service], {}] for cli_service in self._cli_services
+                cli_service: [[cli_service], {}] for cli_service in cli_services
             }
-            results_map = run_in_threads(self._board_table, self._logger, param_map)
+            loaded_map = run_in_threads(
+                self._board_table, self._logger, param_map, self._executor
+            )
+        else:
+            loaded_map = {}
+
+        if cache is not None:
+            for cli_service, board_table in loaded_map.items():
+                cache.store(cli_service.session, board_table)
+        results_map.update(loaded_map)
         return results_map
+
+    def get_operation_counts(self):
+        """Get operation counters of the hosts.
+
+        The device increments the counter with every operation, so the port
+        table isn't changed while the counters are the same.
+        :return: counters in order of the hosts, None if some host doesn't
+            show the counter
+        :rtype: tuple[int]|None
+        """
+        board_tables_map = self.get_board_tables_map(force_reload=True)
+        operation_counts = tuple(
+            board_tables_map[cli_service].get("operation_count")
+            for cli_service in self._cli_services
+        )
+        if None not in operation_counts:
+            return operation_counts
@@ -1,7 +1,8 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
+import os
 import re
-import sys
+import time
 from contextlib import contextmanager
 
 from cloudshell.layer_one.core.driver_commands_interface import DriverCommandsInterface
@@ -11,52 +12,167 @@ from cloudshell.layer_one.core.response.response_info import (
     ResourceDescriptionResponseInfo,
 )
 
-from w2w_rome.cli.rome_cli_handler import RomeCliHandler
+from w2w_rome.cli.host_group import HostGroup
 from w2w_rome.command_actions.mapping_actions import MappingActions
 from w2w_rome.command_actions.system_actions import SystemActions
 from w2w_rome.helpers.autoload_helper import AutoloadHelper
+from w2w_rome.helpers.board_table_cache import BoardTableCache
 from w2w_rome.helpers.errors import (
     BaseRomeException,
     ConnectionPortsError,
     NotSupportedError,
 )
+from w2w_rome.helpers.mapping_tracker import MappingTracker
+from w2w_rome.helpers.operation_statistics import OperationStatistics
+from w2w_rome.helpers.poll_scheduler import BackoffPollScheduler
+from w2w_rome.helpers.port_locks import PortLockManager, get_port_lock_keys
+from w2w_rome.helpers.port_table_cache import PortTableCache
+from w2w_rome.helpers.single_flight import SingleFlight
+from w2w_rome.helpers.state_id import DeviceStateId
+from w2w_rome.helpers.thread_executor import ThreadExecutor, cancellable_sleep
 
 
 class DriverCommands(DriverCommandsInterface):
     """Driver commands implementation."""
 
     ADDRESS_PATTERN = re.compile(
-        (
-            r"^(?P<host>[^:]+?):"
-            r"((?P<second_host>[^:]+?):)?"
-            r"(matrix)?(?P<letter>(a|b|q|xy))(/.+)?$"
-        ),
+        (r"^(?P<hosts>[^:]+(:[^:]+)*?):" r"(matrix)?(?P<letter>(a|b|q|xy))(/.+)?$"),
         re.IGNORECASE,
     )
 
     def __init__(self, logger, runtime_config):
         self._logger = logger
         self._runtime_config = runtime_config
-        self._cli_handler = RomeCliHandler(logger)
-        self._second_cli_handler = None
 
         self._mapping_timeout = runtime_config.read_key("MAPPING.TIMEOUT", 120)
         self._mapping_check_delay = runtime_config.read_key("MAPPING.CHECK_DELAY", 3)
+        self._pipelined_disconnect = runtime_config.read_key(
+            "MAPPING.PIPELINED_DISCONNECT", False
+        )
+        self._async_mapping = runtime_config.read_key("MAPPING.ASYNC_SUBMISSION", False)
+        self._mapping_tracker = MappingTracker(logger)
+        self._port_locks = PortLockManager(
+            runtime_config.read_key("MAPPING.LOCK_TIMEOUT", 300)
+        )
+        self._host_group = HostGroup(
+            logger, runtime_config.read_key("CLI.SESSIONS_PER_HOST", 1)
+        )
+        self._queue_aware_timeout = (
+            runtime_config.read_key("MAPPING.TIMEOUT_MODEL", "FIXED").upper()
+            == "QUEUE_AWARE"
+        )
         self.support_multiple_blades = runtime_config.read_key(
             "SUPPORT_MULTIPLE_BLADES", False
         )
+        self._port_table_cache = PortTableCache(
+            runtime_config.read_key("PORT_TABLE.CACHE_TTL", 0),
+            runtime_config.read_key("PORT_TABLE.CHANGE_DETECTION", False),
+        )
+        self._port_table_targeted_verification = runtime_config.read_key(
+            "PORT_TABLE.TARGETED_VERIFICATION", False
+        )
+
+        self._poll_scheduler = self._create_poll_scheduler(runtime_config)
+        self._operation_statistics = OperationStatistics(
+            self._get_statistics_file_path(runtime_config), logger
+        )
+        self._executor = ThreadExecutor(
+            task_timeout=runtime_config.read_key("THREADS.TASK_TIMEOUT")
+        )
+
+        self._board_table_cache = BoardTableCache(
+            runtime_config.read_key("BOARD_TABLE.CACHE", False)
+        )
+        self._port_table_flight = SingleFlight()
+        self._state_id = DeviceStateId()
+        self._login_target = None
 
         self.__ports_association_table = None
 
-    def _initialize_second_cli_handler(self):
-        if self._second_cli_handler is None:
-            self._second_cli_handler = RomeCliHandler(self._logger)
-            self._cli_handler._cli._session_pool._pool.maxsize = 2
-            self._second_cli_handler._cli._session_pool._pool.maxsize = 2
+    @staticmethod
+    def _create_poll_scheduler(runtime_config):
+        """Create pending connections poll scheduler.
+
+        :return: None if the mapping check delay is used
+        :rtype: w2w_rome.helpers.poll_scheduler.BasePollScheduler|None
+        """
+        scheduler_type = runtime_config.read_key("MAPPING.POLL_SCHEDULER", "CONSTANT")
+        if scheduler_type.upper() == "BACKOFF":
+            return BackoffPollScheduler(
+                runtime_config.read_key("MAPPING.BACKOFF.INITIAL_DELAY", 1),
+                runtime_config.read_key("MAPPING.BACKOFF.MAX_DELAY", 15),
+                runtime_config.read_key("MAPPING.BACKOFF.FACTOR", 2),
+                runtime_config.read_key("MAPPING.BACKOFF.JITTER", 0.1),
+            )
+
+    @staticmethod
+    def _get_statistics_file_path(runtime_config):
+        """Path to the file with the mapping operation statistics.
+
+        Relative path is relative to the driver folder.
+        :rtype: str|None
+        """
+        file_path = runtime_config.read_key("STATISTICS.FILE")
+        if file_path and not os.path.isabs(file_path):
+            driver_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            file_path = os.path.join(driver_path, file_path)
+        return file_path
+
+    @contextmanager
+    def _lock_ports(self, port_names):
+        """Lock the ports and wait for their mappings in progress.
+
+        :param port_names: logical port names
+        :type port_names: collections.Iterable[str]
+        :rtype: collections.Iterator[w2w_rome.helpers.port_locks.PortLock]
+        """
+        port_names = set(port_names)
+        with self._port_locks.lock(port_names) as port_lock:
+            self._mapping_tracker.wait_for_ports(port_names)
+            yield port_lock
+
+    @contextmanager
+    def _lock_mapping(self, port_names, get_lock_keys):
+        """Lock the ports, get the sessions and the port table for the mapping.
+
+        Ports found in the port table (sub ports, connected ports) are locked
+        without waiting while the sessions are kept. If another command keeps
+        them, the sessions are returned to the pool before waiting for the
+        ports and the port table is read again, so the commands never wait for
+        each other's sessions and ports at the same time.
+        :param port_names: logical port names
+        :type port_names: collections.Iterable[str]
+        :param get_lock_keys: lock keys of the ports found in the port table
+        :type get_lock_keys: function
+        :rtype: collections.Iterator[tuple[list[cloudshell.cli.cli_service_impl.CliServiceImpl], w2w_rome.helpers.port_entity.PortTable]]  # noqa: E501
+        """
+        with self._lock_ports(port_names) as port_lock:
+            while True:
+                with self._get_cli_services_lst() as cli_services_lst, (
+                    self._port_table_cache.invalidate_on_error()
+                ):
+                    system_actions = self._create_system_actions(cli_services_lst)
+                    port_table = system_actions.get_port_table()
+                    lock_keys = get_lock_keys(port_table)
+                    if port_lock.acquire(lock_keys, blocking=False):
+                        yield cli_services_lst, port_table
+                        return
+                self._logger.debug("Ports are locked by another command, wait")
+                port_lock.acquire(lock_keys)
+
+    def shutdown(self):
+        """Stop the driver threads when the driver is stopped.
+
+        Background mappings are completed before the threads are stopped.
+        """
+        self._mapping_tracker.shutdown()
+        self._executor.shutdown()
 
     def login(self, address, username, password):
         """Perform login operation on the device.
 
+        If the address and credentials are the same as in the last login only
+        the pooled session is checked.
         :param address: resource address specified in CloudShell, "192.168.42.240:A"
         :param username: username to login on the device
         :param password: password
@@ -64,49 +180,69 @@ class DriverCommands(DriverCommandsInterface):
         :raises Exception: if command failed
         """
         hosts, _ = self._split_addresses_and_letter(address)
-        first_host = hosts[0]
-
-        self._cli_handler.define_session_attributes(first_host, username, password)
-        if len(hosts) == 2:
-            second_host = hosts[1]
-            self._initialize_second_cli_handler()
-            self._second_cli_handler.define_session_attributes(
-                second_host, username, password
-            )
+        login_target = (hosts, username, password)
+        if login_target == self._login_target:
+            # entering the CLI service checks the prompt of the pooled session
+            # and reconnects it if the session is dead
+            self._logger.debug("Already logged in, check the session")
+            with self._get_cli_services_lst():
+                return
+
+        self._login_target = None
+        self._port_table_cache.bind(hosts)
+        self._state_id.bind(hosts)
+        # every command that keeps the sessions runs a task per host, so the
+        # commands on disjoint ports don't wait for each other's threads
+        self._executor.resize(len(hosts) * self._host_group.sessions_per_host)
+        self._host_group.define_session_attributes(hosts, username, password)
 
         with self._get_cli_services_lst() as cli_services_lst:
-            system_actions = SystemActions(cli_services_lst, self._logger)
+            system_actions = self._create_system_actions(cli_services_lst)
             board_tables_map = system_actions.get_board_tables_map()
             for cli_service, board_table in board_tables_map.items():
                 model_name = board_table["model_name"]
                 self._logger.info("Connected to {}".format(model_name))
 
+        self._login_target = login_target
+
     def get_state_id(self):
         """Check if CS synchronized with the device.
 
+        The ID is changed when the connections on the device are changed. For the
+        unchanged device only "show board" is executed.
         :return: Synchronization ID, GetStateIdResponseInfo(-1) if not used
         :rtype: cloudshell.layer_one.core.response.response_info.GetStateIdResponseInfo
         :raises Exception: if command failed
-
-        Example:
-            # Obtain cli session
-            with self._cli_handler.default_mode_service() as session:
-                # Execute command
-                chassis_name = session.send_command('show chassis sub_port_name')
-                return chassis_name
         """
-        return GetStateIdResponseInfo("-1")
+        self._update_state_id()
+        return GetStateIdResponseInfo(self._state_id.value)
 
     def set_state_id(self, state_id):
         """Set synchronization state id to the device.
 
-        Called after Autoload or SyncFomDevice commands
+        Called after Autoload or SyncFomDevice commands. The device cannot keep
+        the ID, so it's kept in the driver while the connections are the same.
         :param state_id: synchronization ID
         :type state_id: str
         :return: None
         :raises Exception: if command failed
         """
-        pass
+        self._update_state_id()
+        self._state_id.set_synced(state_id)
+
+    def _update_state_id(self):
+        """Load the port table if the device performed some operations."""
+        with self._get_cli_services_lst() as cli_services_lst:
+            system_actions = self._create_system_actions(cli_services_lst)
+            operation_counts = system_actions.get_operation_counts()
+            if operation_counts is None:
+                self._logger.debug("Device doesn't show operation counters")
+                self._state_id.invalidate()
+            elif not self._state_id.is_actual(operation_counts):
+                port_table = system_actions.get_port_table(
+                    force_reload=True, operation_counts=operation_counts
+                )
+                self._state_id.update(operation_counts, port_table)
 
     def _convert_cs_port_to_port_name(self, cs_port):
         _, matrix_letter = self._split_addresses_and_letter(cs_port)
@@ -118,6 +254,105 @@ class DriverCommands(DriverCommandsInterface):
             port_name = "{}{}".format(matrix_letter, port_num)
         return port_name
 
+    def _create_mapping_actions(self, cli_services_lst):
+        """Create mapping actions with the driver settings.
+
+        :type cli_services_lst: list[cloudshell.cli.cli_service_impl.CliServiceImpl]
+        :rtype: MappingActions
+        """
+        return MappingActions(
+            cli_services_lst,
+            self._logger,
+            self._mapping_timeout,
+            self._mapping_check_delay,
+            self._poll_scheduler,
+            self._executor,
+            self._queue_aware_timeout,
+            self._operation_statistics,
+            self._pipelined_disconnect,
+        )
+
+    def _create_system_actions(self, cli_services_lst):
+        """Create system actions with the driver caches.
+
+        :type cli_services_lst: list[cloudshell.cli.cli_service_impl.CliServiceImpl]
+        :rtype: SystemActions
+        """
+        return SystemActions(
+            cli_services_lst,
+            self._logger,
+            self._port_table_cache,
+            self._executor,
+            self._board_table_cache,
+            self._port_table_flight,
+        )
+
+    def _get_port_table_after_mapping(
+        self, system_actions, mapping_actions, port_table, port_names, is_mapped
+    ):
+        """Get the port table that shows the result of the mapping.
+
+        Duration of the verification is added to the operation statistics.
+        :type system_actions: SystemActions
+        :type mapping_actions: MappingActions
+        :type port_table: w2w_rome.helpers.port_entity.PortTable
+        :type port_names: list[str]|set[str]
+        :type is_mapped: function
+        :rtype: w2w_rome.helpers.port_entity.PortTable
+        """
+        start_time = time.time()
+        port_table = self._load_port_table_after_mapping(
+            system_actions, mapping_actions, port_table, port_names, is_mapped
+        )
+        mapping_actions.add_verification_statistics(time.time() - start_time)
+        return port_table
+
+    def _load_port_table_after_mapping(
+        self, system_actions, mapping_actions, port_table, port_names, is_mapped
+    ):
+        """Load the port table that shows the result of the mapping.
+
+        When the port table cache is used the table is updated in place with
+        the operations logged by the device. With the targeted verification only
+        the mapped ports are loaded from the device and updated in the table.
+        The whole table is reloaded from the device only if the updated table
+        doesn't show the expected result.
+
+        :type system_actions: SystemActions
+        :type mapping_actions: MappingActions
+        :type port_table: w2w_rome.helpers.port_entity.PortTable
+        :param port_names: logical port names that were mapped
+        :type port_names: list[str]|set[str]
+        :param is_mapped: check that the port table shows the expected result
+        :type is_mapped: function
+        :rtype: w2w_rome.helpers.port_entity.PortTable
+        """
+        if self._port_table_cache.enabled:
+            try:
+                mapping_actions.update_port_table(port_table)
+                if is_mapped(port_table):
+                    self._port_table_cache.update(port_table, port_names)
+                    return port_table
+            except BaseRomeException:
+                # the cached table can have the same ports the device changed
+                self._logger.debug("Cannot update the port table with the logs")
+                self._port_table_cache.invalidate()
+
+        if self._port_table_targeted_verification:
+            try:
+                system_actions.update_port_table(port_table, port_names)
+                if is_mapped(port_table):
+                    self._port_table_cache.update(port_table, port_names)
+                    return port_table
+            except BaseRomeException:
+                pass
+
+        if self._port_table_cache.enabled or self._port_table_targeted_verification:
+            self._logger.debug(
+                "Port table doesn't show the result of the mapping, reload it"
+            )
+        return system_actions.get_port_table(force_reload=True)
+
     def map_bidi(self, src_port, dst_port):
         """Create a bidirectional connection between source and destination ports.
 
@@ -131,57 +366,223 @@ class DriverCommands(DriverCommandsInterface):
         self._logger.info(
             "MapBidi, SrcPort: {0}, DstPort: {1}".format(src_port, dst_port)
         )
-        src_port_name = self._convert_cs_port_to_port_name(src_port)
-        dst_port_name = self._convert_cs_port_to_port_name(dst_port)
-
-        with self._get_cli_services_lst() as cli_services_lst:
-            mapping_actions = MappingActions(
-                cli_services_lst,
-                self._logger,
-                self._mapping_timeout,
-                self._mapping_check_delay,
-            )
-            system_actions = SystemActions(cli_services_lst, self._logger)
-            port_table = system_actions.get_port_table()
-            src_logic_port = port_table[src_port_name]
-            dst_logic_port = port_table[dst_port_name]
+        self._map_bidi_multiple([(src_port, dst_port)])
+
+    def map_bidi_multiple(self, port_pairs):
+        """Create bidirectional connections between pairs of ports.
+
+        All pairs are verified with one port table, connected together and
+        checked with one port table loaded after the mapping.
+        It's library API for scripts that use the driver commands directly, the
+        L1 command executor dispatches every MapBidi request to map_bidi.
+        :param port_pairs: src and dst port addresses,
+            [('192.168.42.240:A/A/21', '192.168.42.240:A/A/22')]
+        :type port_pairs: list[tuple[str, str]]
+        :return: handle of the mapping completed in background if the
+            mapping is submitted asynchronously, otherwise None; the error of
+            the failed background mapping is kept in the handle
+        :rtype: w2w_rome.helpers.mapping_tracker.MappingHandle|None
+        :raises Exception: if command failed
+        """
+        self._logger.info(
+            "MapBidi multiple, Ports: {}".format(", ".join(map(" - ".join, port_pairs)))
+        )
+        return self._map_bidi_multiple(port_pairs)
 
-            if port_table.is_connected(src_logic_port, dst_logic_port, bidi=True):
-                self._logger.debug(
-                    "Ports {} and {} already connected".format(
-                        src_port_name, dst_port_name
-                    )
-                )
-                return
+    def _map_bidi_multiple(self, port_pairs):
+        """Create bidirectional connections between pairs of ports.
 
-            port_table.verify_ports_for_connection(
-                src_logic_port, dst_logic_port, bidi=True
+        :type port_pairs: list[tuple[str, str]]
+        :return: handle of the mapping completed in background
+        :rtype: w2w_rome.helpers.mapping_tracker.MappingHandle|None
+        """
+        port_name_pairs = [
+            (
+                self._convert_cs_port_to_port_name(src_port),
+                self._convert_cs_port_to_port_name(dst_port),
             )
-
-            try:
-                mapping_actions.connect(src_logic_port, dst_logic_port, bidi=True)
-
-                port_table = system_actions.get_port_table()
+            for src_port, dst_port in port_pairs
+        ]
+        port_names = {name for pair in port_name_pairs for name in pair}
+
+        with self._lock_mapping(
+            port_names, lambda table: get_port_lock_keys(table, port_names)
+        ) as (cli_services_lst, port_table):
+            mapping_actions = self._create_mapping_actions(cli_services_lst)
+            system_actions = self._create_system_actions(cli_services_lst)
+
+            connect_port_name_pairs = []
+            for src_port_name, dst_port_name in port_name_pairs:
                 src_logic_port = port_table[src_port_name]
                 dst_logic_port = port_table[dst_port_name]
+                if port_table.is_connected(src_logic_port, dst_logic_port, bidi=True):
+                    self._logger.debug(
+                        "Ports {} and {} already connected".format(
+                            src_port_name, dst_port_name
+                        )
+                    )
+                    continue
 
-                is_connected = port_table.is_connected(
+                port_table.verify_ports_for_connection(
                     src_logic_port, dst_logic_port, bidi=True
                 )
-            except Exception:
-                is_connected = False
+                connect_port_name_pairs.append((src_port_name, dst_port_name))
 
-            if not is_connected:
-                mapping_actions.disconnect(
-                    {(src_logic_port, dst_logic_port)}, bidi=True
+            if not connect_port_name_pairs:
+                return
+            self._verify_ports_used_once(connect_port_name_pairs)
+            connect_logic_ports = [
+                (port_table[src_port_name], port_table[dst_port_name])
+                for src_port_name, dst_port_name in connect_port_name_pairs
+            ]
+
+            if self._async_mapping:
+                pending_ports, num_moves = mapping_actions.submit_connect_multiple(
+                    connect_logic_ports
                 )
-                raise ConnectionPortsError(
-                    "Cannot connect port {} to port {} during {}sec".format(
+                return self._mapping_tracker.submit(
+                    {name for pair in connect_port_name_pairs for name in pair},
+                    self._complete_bidi_mapping,
+                    mapping_actions,
+                    port_table,
+                    connect_port_name_pairs,
+                    mapping_actions.start_detached_wait(pending_ports, num_moves),
+                )
+
+            try:
+                mapping_actions.connect_multiple(connect_logic_ports)
+                not_connected = self._get_not_connected_after_mapping(
+                    system_actions, mapping_actions, port_table, connect_port_name_pairs
+                )
+            except Exception:
+                not_connected = connect_logic_ports
+            self._disconnect_not_connected(mapping_actions, not_connected)
+
+    @staticmethod
+    def _get_not_connected(port_table, port_name_pairs):
+        """Get pairs of ports that are not connected bidirectional.
+
+        :type port_table: w2w_rome.helpers.port_entity.PortTable
+        :type port_name_pairs: list[tuple[str, str]]
+        :rtype: list[tuple[w2w_rome.helpers.port_entity.LogicalPort]]
+        """
+        return [
+            (port_table[src_port_name], port_table[dst_port_name])
+            for src_port_name, dst_port_name in port_name_pairs
+            if not port_table.is_connected(
+                port_table[src_port_name], port_table[dst_port_name], bidi=True
+            )
+        ]
+
+    def _get_not_connected_after_mapping(
+        self, system_actions, mapping_actions, port_table, port_name_pairs
+    ):
+        """Get pairs of ports that are not connected after the mapping.
+
+        :type system_actions: SystemActions
+        :type mapping_actions: MappingActions
+        :type port_table: w2w_rome.helpers.port_entity.PortTable
+        :type port_name_pairs: list[tuple[str, str]]
+        :rtype: list[tuple[w2w_rome.helpers.port_entity.LogicalPort]]
+        """
+        port_table = self._get_port_table_after_mapping(
+            system_actions,
+            mapping_actions,
+            port_table,
+            {name for pair in port_name_pairs for name in pair},
+            lambda table: not self._get_not_connected(table, port_name_pairs),
+        )
+        return self._get_not_connected(port_table, port_name_pairs)
+
+    def _disconnect_not_connected(self, mapping_actions, not_connected):
+        """Disconnect ports that are not connected bidirectional and raise error.
+
+        :type mapping_actions: MappingActions
+        :type not_connected: list[tuple[w2w_rome.helpers.port_entity.LogicalPort]]
+        """
+        if not not_connected:
+            return
+
+        mapping_actions.disconnect(set(not_connected), bidi=True)
+        if len(not_connected) == 1:
+            src_logic_port, dst_logic_port = not_connected[0]
+            msg = "Cannot connect port {} to port {} during {}sec".format(
+                src_logic_port.original_logical_name,
+                dst_logic_port.original_logical_name,
+                self._mapping_timeout,
+            )
+        else:
+            msg = "Cannot connect ports: {} during {}sec".format(
+                ", ".join(
+                    "{} - {}".format(
                         src_logic_port.original_logical_name,
                         dst_logic_port.original_logical_name,
-                        self._mapping_timeout,
                     )
+                    for src_logic_port, dst_logic_port in not_connected
+                ),
+                self._mapping_timeout,
+            )
+        raise ConnectionPortsError(msg)
+
+    def _complete_bidi_mapping(
+        self, mapping_actions, port_table, port_name_pairs, wait
+    ):
+        """Wait for the connections in the device queue and check them.
+
+        The session is taken only for the checks of pending connections, so
+        other commands are executed on the device in the meantime.
+        :param mapping_actions: mapping actions that submitted the connections
+        :type mapping_actions: MappingActions
+        :param port_table: port table the mapping was verified with
+        :type port_table: w2w_rome.helpers.port_entity.PortTable
+        :param port_name_pairs: src and dst port names that are connected
+        :type port_name_pairs: list[tuple[str, str]]
+        :param wait: wait for the submitted connections
+        :type wait: w2w_rome.command_actions.mapping_actions.DetachedWait
+        """
+        while True:
+            cancellable_sleep(mapping_actions.get_detached_wait_delay(wait))
+            with self._get_cli_services_lst() as cli_services_lst, (
+                self._port_table_cache.invalidate_on_error()
+            ):
+                mapping_actions.bind_cli_services(cli_services_lst)
+                is_completed = mapping_actions.check_detached_wait(wait)
+                if not is_completed and not wait.expired:
+                    continue
+
+                system_actions = self._create_system_actions(cli_services_lst)
+                not_connected = [
+                    (port_table[src_port_name], port_table[dst_port_name])
+                    for src_port_name, dst_port_name in port_name_pairs
+                ]
+                if not is_completed:
+                    self._logger.error(wait.timeout_message)
+                else:
+                    try:
+                        not_connected = self._get_not_connected_after_mapping(
+                            system_actions,
+                            mapping_actions,
+                            port_table,
+                            port_name_pairs,
+                        )
+                    except Exception:
+                        self._logger.exception("Cannot check the connections")
+                self._disconnect_not_connected(mapping_actions, not_connected)
+                return
+
+    @staticmethod
+    def _verify_ports_used_once(port_name_pairs):
+        """Verify that every port is used only in one connection.
+
+        :type port_name_pairs: list[tuple[str, str]]
+        """
+        used_port_names = set()
+        for port_name in (name for pair in port_name_pairs for name in pair):
+            if port_name in used_port_names:
+                raise ConnectionPortsError(
+                    "Port {} is used in a few connections".format(port_name)
                 )
+            used_port_names.add(port_name)
 
     def map_uni(self, src_port, dst_ports):
         """Unidirectional mapping of two ports.
@@ -207,16 +608,13 @@ class DriverCommands(DriverCommandsInterface):
 
         src_port_name = self._convert_cs_port_to_port_name(src_port)
         dst_port_name = self._convert_cs_port_to_port_name(dst_ports[0])
+        port_names = {src_port_name, dst_port_name}
 
-        with self._get_cli_services_lst() as cli_services_lst:
-            system_actions = SystemActions(cli_services_lst, self._logger)
-            mapping_actions = MappingActions(
-                cli_services_lst,
-                self._logger,
-                self._mapping_timeout,
-                self._mapping_check_delay,
-            )
-            port_table = system_actions.get_port_table()
+        with self._lock_mapping(
+            port_names, lambda table: get_port_lock_keys(table, port_names)
+        ) as (cli_services_lst, port_table):
+            system_actions = self._create_system_actions(cli_services_lst)
+            mapping_actions = self._create_mapping_actions(cli_services_lst)
             src_logic_port = port_table[src_port_name]
             dst_logic_port = port_table[dst_port_name]
 
@@ -231,7 +629,15 @@ class DriverCommands(DriverCommandsInterface):
             port_table.verify_ports_for_connection(src_logic_port, dst_logic_port)
             mapping_actions.connect(src_logic_port, dst_logic_port, bidi=False)
 
-            port_table = system_actions.get_port_table()
+            port_table = self._get_port_table_after_mapping(
+                system_actions,
+                mapping_actions,
+                port_table,
+                {src_port_name, dst_port_name},
+                lambda table: table.is_connected(
+                    table[src_port_name], table[dst_port_name]
+                ),
+            )
             src_logic_port = port_table[src_port_name]
             dst_logic_port = port_table[dst_port_name]
 
@@ -245,7 +651,7 @@ class DriverCommands(DriverCommandsInterface):
     def _split_addresses_and_letter(self, address):
         """Extract resources addresses and matrix letter.
 
-        :param address: <host>:<MatrixA> or <host>:<host>:<Q>
+        :param address: <host>:<MatrixA> or <host>:<host>[:<host>...]:<Q>
         :type address: str
         :return: list of hosts and matrix letter (upper)
         :rtype: tuple[tuple[str], str]
@@ -253,46 +659,29 @@ class DriverCommands(DriverCommandsInterface):
         letter = None
         err_msg = (
             "Incorrect address. Resource address should specify MatrixA, MatrixB, "
-            "MatrixQ or MatrixXY. Format <host>:[<second_host>:]<matrix_letter>. "
-            "Second host is used in Q128 devices."
+            "MatrixQ or MatrixXY. Format <host>[:<host>...]:<matrix_letter>. "
+            "A few hosts are used in stacked Q devices (Q128)."
         )
         if not self.support_multiple_blades:
             try:
                 match = self.ADDRESS_PATTERN.search(address)
-                first_host = match.group("host")
-                second_host = match.group("second_host")
+                hosts = tuple(match.group("hosts").split(":"))
                 letter = match.group("letter").upper()
             except AttributeError:
                 self._logger.error(err_msg)
                 raise BaseRomeException(err_msg)
-            if second_host and letter != "Q":
+            if len(hosts) > 1 and letter != "Q":
                 raise BaseRomeException(err_msg)
-
-            hosts = tuple(filter(None, (first_host, second_host)))
         else:
             hosts = (address,)
         return hosts, letter
 
-    @contextmanager
     def _get_cli_services_lst(self):
-        stacks = [self._cli_handler.default_mode_service()]
-        if self._second_cli_handler:
-            stacks.append(self._second_cli_handler.default_mode_service())
-
-        services = []
-        for stack in stacks:
-            services.append(stack.__enter__())
+        """Default mode CLI services of all hosts of the resource.
 
-        try:
-            yield services
-        finally:
-            not_raise = False
-            exc_info = sys.exc_info()
-            for stack in stacks:
-                not_raise = stack.__exit__(*exc_info)
-
-            if not not_raise and exc_info[0]:
-                raise exc_info[1]
+        :rtype: contextlib.GeneratorContextManager
+        """
+        return self._host_group.default_mode_services()
 
     def get_resource_description(self, address):
         """Auto-load function to retrieve all information from the device.
@@ -307,8 +696,8 @@ class DriverCommands(DriverCommandsInterface):
         _, letter = self._split_addresses_and_letter(address)
 
         with self._get_cli_services_lst() as cli_services_lst:
-            system_actions = SystemActions(cli_services_lst, self._logger)
-            port_table = system_actions.get_port_table()
+            system_actions = self._create_system_actions(cli_services_lst)
+            port_table = system_actions.get_port_table(force_reload=True)
             board_tables_map = system_actions.get_board_tables_map()
 
         autoload_helper = AutoloadHelper(
@@ -330,19 +719,34 @@ class DriverCommands(DriverCommandsInterface):
         self._logger.info("MapClear, Ports: {}".format(", ".join(ports)))
         port_names = map(self._convert_cs_port_to_port_name, ports)
 
-        with self._get_cli_services_lst() as cli_services_lst:
-            mapping_actions = MappingActions(
-                cli_services_lst,
-                self._logger,
-                self._mapping_timeout,
-                self._mapping_check_delay,
-            )
-            system_actions = SystemActions(cli_services_lst, self._logger)
-            port_table = system_actions.get_port_table()
+        def get_lock_keys(table):
+            # ports connected to the cleared ones are changed too
+            connected_port_names = {
+                logic_port.name
+                for pair in table.get_connected_port_pairs(port_names, bidi=True)
+                for logic_port in pair
+            }
+            return get_port_lock_keys(table, connected_port_names.union(port_names))
+
+        with self._lock_mapping(port_names, get_lock_keys) as (
+            cli_services_lst,
+            port_table,
+        ):
+            mapping_actions = self._create_mapping_actions(cli_services_lst)
+            system_actions = self._create_system_actions(cli_services_lst)
             connected_ports = port_table.get_connected_port_pairs(port_names, bidi=True)
             mapping_actions.disconnect(connected_ports)
+            disconnected_port_names = set(port_names).union(
+                logic_port.name for pair in connected_ports for logic_port in pair
+            )
 
-            port_table = system_actions.get_port_table()
+            port_table = self._get_port_table_after_mapping(
+                system_actions,
+                mapping_actions,
+                port_table,
+                disconnected_port_names,
+                lambda table: not table.get_connected_port_pairs(port_names, bidi=True),
+            )
             connected_ports = port_table.get_connected_port_pairs(port_names, bidi=True)
             if connected_ports:
                 connected_port_names = [
@@ -376,16 +780,13 @@ class DriverCommands(DriverCommandsInterface):
 
         src_port_name = self._convert_cs_port_to_port_name(src_port)
         dst_port_name = self._convert_cs_port_to_port_name(dst_ports[0])
+        port_names = {src_port_name, dst_port_name}
 
-        with self._get_cli_services_lst() as cli_services_lst:
-            mapping_actions = MappingActions(
-                cli_services_lst,
-                self._logger,
-                self._mapping_timeout,
-                self._mapping_check_delay,
-            )
-            system_actions = SystemActions(cli_services_lst, self._logger)
-            port_table = system_actions.get_port_table()
+        with self._lock_mapping(
+            port_names, lambda table: get_port_lock_keys(table, port_names)
+        ) as (cli_services_lst, port_table):
+            mapping_actions = self._create_mapping_actions(cli_services_lst)
+            system_actions = self._create_system_actions(cli_services_lst)
             connected_ports = port_table.get_connected_port_pairs([src_port_name])
 
             if not connected_ports:
@@ -401,7 +802,13 @@ class DriverCommands(DriverCommandsInterface):
                 )
             mapping_actions.disconnect(connected_ports)
 
-            port_table = system_actions.get_port_table()
+            port_table = self._get_port_table_after_mapping(
+                system_actions,
+                mapping_actions,
+                port_table,
+                {src_port_name, dst_port_name},
+                lambda table: not table.get_connected_port_pairs([src_port_name]),
+            )
             connected_ports = port_table.get_connected_port_pairs([src_port_name])
             if connected_ports:
                 raise BaseRomeException(
@@ -424,7 +831,7 @@ class DriverCommands(DriverCommandsInterface):
         serial_number = "Serial Number"
         if len(cs_address.split("/")) == 1 and attribute_name == serial_number:
             with self._get_cli_services_lst() as cli_services_lst:
-                system_actions = SystemActions(cli_services_lst, self._logger)
+                system_actions = self._create_system_actions(cli_services_lst)
                 board_tables_map = system_actions.get_board_tables_map()
             return AttributeValueResponseInfo(
                 board_tables_map.values()[0].get("serial_number")
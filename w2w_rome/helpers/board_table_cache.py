@@ -0,0 +1,49 @@
+class BoardTableCache(object):
+    """Board tables of the hosts kept between the driver commands.
+
+    The board table is valid while the session it was loaded with isn't
+    reconnected. The software version can be changed only with a reboot of the
+    device, so a reconnect invalidates the table for it too. Every board table
+    loaded from the device replaces the cached one.
+    """
+
+    def __init__(self, enabled=False):
+        """Board table cache.
+
+        :type enabled: bool
+        """
+        self.enabled = enabled
+        self._board_tables = {}
+
+    def get(self, session):
+        """Return the board table of the host if the session isn't reconnected.
+
+        :type session: cloudshell.cli.session.expect_session.ExpectSession
+        :rtype: dict|None
+        """
+        try:
+            connection_id, board_table = self._board_tables[session.host]
+        except KeyError:
+            return None
+
+        if self.enabled and connection_id == session.connection_id:
+            return board_table
+
+    def store(self, session, board_table):
+        """Keep the board table loaded from the device.
+
+        :type session: cloudshell.cli.session.expect_session.ExpectSession
+        :type board_table: dict
+        """
+        if self.enabled:
+            self._board_tables[session.host] = (session.connection_id, board_table)
+
+    def invalidate(self, host=None):
+        """Drop the board table of the host or of all hosts.
+
+        :type host: str|None
+        """
+        if host is None:
+            self._board_tables.clear()
+        else:
+            self._board_tables.pop(host, None)
@@ -0,0 +1,74 @@
+import re
+import time
+
+from w2w_rome.helpers.thread_executor import is_cancelled
+
+
+class ConnectionCompletionWatcher(object):
+    """Watch the session for logs about completed connections.
+
+    The device logs asynchronous lines like
+    08-06-2019 09:01 Connection A3<->A4 completed successfully
+    when it finishes the connect or disconnect operation.
+    """
+
+    COMPLETED_PATTERN = r"connection\s+({0}<->{1}|{1}<->{0})\s+completed"
+    READ_TIMEOUT = 0.5
+
+    def __init__(self, session, ports, logger):
+        """Connection completion watcher.
+
+        :type session: cloudshell.cli.session.expect_session.ExpectSession
+        :param ports: src and dst ports that are connecting or disconnecting
+        :type ports: list[tuple[str, str]]
+        :type logger: logging.Logger
+        """
+        self._session = session
+        self._logger = logger
+        self._patterns = {
+            (src, dst): re.compile(
+                self.COMPLETED_PATTERN.format(re.escape(src), re.escape(dst)),
+                re.IGNORECASE,
+            )
+            for src, dst in ports
+        }
+        self._not_completed = set(self._patterns)
+
+    @property
+    def completed(self):
+        return not self._not_completed
+
+    def feed(self, output):
+        """Look for completed connections in the output.
+
+        :type output: str
+        """
+        for ports in list(self._not_completed):
+            if self._patterns[ports].search(output):
+                self._not_completed.remove(ports)
+
+    def wait(self, timeout):
+        """Read the session until all connections are completed or timeout.
+
+        Data read from the session is kept in the session's full buffer, so the
+        logs are processed as usual with the next command. The wait stops
+        early if the task in the current thread is cancelled.
+        :type timeout: int|float
+        :return: all connections are completed
+        :rtype: bool
+        """
+        end_time = time.time() + timeout
+        while not self.completed and not is_cancelled():
+            time_left = end_time - time.time()
+            if time_left <= 0:
+                break
+
+            read_timeout = min(time_left, self.READ_TIMEOUT)
+            start_time = time.time()
+            output = self._session._clear_buffer(read_timeout, self._logger)
+            if output:
+                self.feed(output)
+            else:
+                time.sleep(max(0, read_timeout - (time.time() - start_time)))
+
+        return self.completed
@@ -16,3 +16,19 @@ class NotSupportedError(BaseRomeException):
 
 class GotErrorInThreads(BaseRomeException):
     """Got some error when executing func in a thread."""
+
+
+class TaskTimeoutError(BaseRomeException):
+    """Task executed in a thread didn't finish in time."""
+
+
+class TaskCancelledError(BaseRomeException):
+    """Task was cancelled before it started or while it was waiting."""
+
+
+class PortLockTimeoutError(BaseRomeException):
+    """Ports are locked by another command for too long."""
+
+
+class PortLockDeadlockError(BaseRomeException):
+    """Commands wait for the ports locked by each other."""
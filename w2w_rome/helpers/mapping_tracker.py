@@ -0,0 +1,142 @@
+import threading
+
+from w2w_rome.helpers.thread_executor import ThreadExecutor
+
+
+class MappingHandle(object):
+    """Mapping that was added to the device queue and is completed in background."""
+
+    def __init__(self, port_names):
+        """Mapping handle.
+
+        :param port_names: logical port names that are mapped
+        :type port_names: collections.Iterable[str]
+        """
+        self.port_names = frozenset(port_names)
+        self.error = None
+        self._done = threading.Event()
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        """Wait for the mapping is completed.
+
+        :param timeout: seconds, None - wait until the mapping is completed
+        :type timeout: int|float|None
+        :return: the mapping is completed
+        :rtype: bool
+        """
+        return self._done.wait(timeout)
+
+    def finish(self, error=None):
+        """Mark the mapping completed.
+
+        :param error: exception if the mapping failed
+        :type error: Exception|None
+        """
+        self.error = error
+        self._done.set()
+
+    def __repr__(self):
+        return "<MappingHandle {}{}>".format(
+            ", ".join(sorted(self.port_names)), " done" if self.done else ""
+        )
+
+
+class MappingTracker(object):
+    """Complete mappings in background threads.
+
+    Commands for the same ports wait for the mapping in progress, mappings
+    of other ports don't wait and are added to the device queue right away.
+    Errors of the background mappings are logged and kept in their handles,
+    the ports are released for the next commands, e.g. to clear the failed
+    mapping.
+    """
+
+    WORKERS = 4
+
+    def __init__(self, logger, executor=None):
+        """Mapping tracker.
+
+        :type logger: logging.Logger
+        :param executor: runs completions of the mappings
+        :type executor: ThreadExecutor
+        """
+        self._logger = logger
+        self._executor = executor or ThreadExecutor(processes=self.WORKERS)
+        self._lock = threading.Lock()
+        self._handles = set()
+
+    def submit(self, port_names, func, *args):
+        """Complete the mapping of the ports in background.
+
+        :param port_names: logical port names that are mapped
+        :type port_names: collections.Iterable[str]
+        :param func: waits for the mapping and checks the result
+        :type func: function
+        :rtype: MappingHandle
+        """
+        handle = MappingHandle(port_names)
+        with self._lock:
+            self._handles.add(handle)
+        self._executor.submit(self._complete, (handle, func, args))
+        return handle
+
+    def _complete(self, handle, func, args):
+        error = None
+        try:
+            func(*args)
+        except Exception as e:
+            error = e
+            self._logger.exception("Mapping of {} failed".format(handle))
+        finally:
+            handle.finish(error)
+            with self._lock:
+                self._handles.discard(handle)
+
+    def get_handles(self, port_names=None):
+        """Get mappings in progress.
+
+        :param port_names: only mappings of these ports, None - all mappings
+        :type port_names: collections.Iterable[str]|None
+        :rtype: list[MappingHandle]
+        """
+        with self._lock:
+            handles = [handle for handle in self._handles if not handle.done]
+        if port_names is not None:
+            port_names = set(port_names)
+            handles = [handle for handle in handles if handle.port_names & port_names]
+        return handles
+
+    def wait_for_ports(self, port_names, timeout=None):
+        """Wait for the mappings of the ports in progress.
+
+        :type port_names: collections.Iterable[str]
+        :param timeout: seconds for every mapping, None - wait until completed
+        :type timeout: int|float|None
+        :return: the mappings are completed
+        :rtype: bool
+        """
+        handles = self.get_handles(port_names)
+        if handles:
+            self._logger.debug("Waiting for mappings in progress {}".format(handles))
+        return all(handle.wait(timeout) for handle in handles)
+
+    def wait_all(self, timeout=None):
+        """Wait for all mappings in progress.
+
+        :param timeout: seconds for every mapping, None - wait until completed
+        :type timeout: int|float|None
+        :rtype: bool
+        """
+        return all(handle.wait(timeout) for handle in self.get_handles())
+
+    def shutdown(self, wait=True):
+        """Stop the threads of the tracker.
+
+        :param wait: wait for the mappings in progress
+        :type wait: bool
+        """
+        self._executor.shutdown(wait)
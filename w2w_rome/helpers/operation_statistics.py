@@ -0,0 +1,168 @@
+import json
+import os
+import threading
+from collections import defaultdict, deque
+
+
+class OperationStatistics(object):
+    """Measured durations of the mapping operations per host and matrix.
+
+    Every connect or disconnect is split into phases: submitting the commands,
+    waiting in the queue of the device behind other requests, completion of
+    our moves and verification of the result in the port table. The durations
+    are kept in a local JSON file, so they survive driver restarts.
+    """
+
+    SUBMIT = "submit"
+    QUEUE_WAIT = "queue_wait"
+    COMPLETION = "completion"
+    VERIFICATION = "verification"
+    PHASES = (SUBMIT, QUEUE_WAIT, COMPLETION, VERIFICATION)
+
+    HISTORY_SIZE = 50
+    FILE_VERSION = 1
+
+    def __init__(self, file_path=None, logger=None):
+        """Operation statistics.
+
+        :param file_path: JSON file to keep statistics in, None to keep them
+            only in memory
+        :type file_path: str|None
+        :type logger: logging.Logger
+        """
+        self._file_path = file_path
+        self._logger = logger
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        # durations and moves of the last operations per host, matrix and phase
+        self._records = defaultdict(lambda: deque(maxlen=self.HISTORY_SIZE))
+        if file_path:
+            self.load()
+
+    def add(self, host, matrix_letter, phase, duration, moves=None):
+        """Add measured duration of the operation phase.
+
+        :type host: str
+        :param matrix_letter: A, B, Q or XY
+        :type matrix_letter: str
+        :param phase: one of PHASES
+        :type phase: str
+        :param duration: seconds
+        :type duration: float
+        :param moves: number of moves the device did during the phase
+        :type moves: int|None
+        """
+        with self._lock:
+            self._records[(host, matrix_letter, phase)].append((duration, moves))
+
+    def get_expected_duration(self, host, matrix_letter, phase):
+        """Median of the last durations of the phase.
+
+        :type host: str
+        :type matrix_letter: str
+        :type phase: str
+        :rtype: float|None
+        """
+        with self._lock:
+            records = self._records.get((host, matrix_letter, phase), ())
+            durations = sorted(duration for duration, _ in records)
+        if durations:
+            return durations[len(durations) // 2]
+
+    def get_expected_move_duration(self, host, matrix_letter):
+        """Median of the last durations of one move of the device.
+
+        :type host: str
+        :type matrix_letter: str
+        :rtype: float|None
+        """
+        with self._lock:
+            records = self._records.get((host, matrix_letter, self.COMPLETION), ())
+            durations = sorted(duration / moves for duration, moves in records if moves)
+        if durations:
+            return durations[len(durations) // 2]
+
+    def as_dict(self):
+        """Summary of the statistics.
+
+        :return: {host: {matrix_letter: {phase: {count, median, average}}}}
+        :rtype: dict
+        """
+        with self._lock:
+            records_map = {key: list(records) for key, records in self._records.items()}
+
+        result = defaultdict(lambda: defaultdict(dict))
+        for (host, matrix_letter, phase), records in records_map.items():
+            if not records:
+                continue
+            durations = sorted(duration for duration, _ in records)
+            result[host][matrix_letter][phase] = {
+                "count": len(durations),
+                "median": durations[len(durations) // 2],
+                "average": sum(durations) / len(durations),
+            }
+        return {host: dict(matrix_map) for host, matrix_map in result.items()}
+
+    def load(self):
+        """Load statistics from the file.
+
+        Missing or broken file is ignored, the statistics are collected again.
+        """
+        try:
+            with open(self._file_path) as f:
+                data = json.load(f)
+            if data.get("version") != self.FILE_VERSION:
+                raise ValueError("Unsupported version {}".format(data.get("version")))
+
+            records_map = {}
+            for host, matrix_map in data["hosts"].items():
+                for matrix_letter, phase_map in matrix_map.items():
+                    for phase, records in phase_map.items():
+                        records_map[(host, matrix_letter, phase)] = [
+                            (float(duration), moves) for duration, moves in records
+                        ]
+        except (IOError, OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+            if self._logger and os.path.exists(self._file_path):
+                self._logger.warning(
+                    "Cannot load operation statistics from {}: {}".format(
+                        self._file_path, e
+                    )
+                )
+            return
+
+        with self._lock:
+            self._records.clear()
+            for key, records in records_map.items():
+                self._records[key].extend(records)
+
+    def save(self):
+        """Save statistics to the file.
+
+        The file is written next to the old one and then replaces it, so
+        a driver that stops in the middle doesn't leave a broken file.
+        """
+        if not self._file_path:
+            return
+
+        data = {"version": self.FILE_VERSION, "hosts": {}}
+        with self._lock:
+            for (host, matrix_letter, phase), records in self._records.items():
+                matrix_map = data["hosts"].setdefault(host, {})
+                matrix_map.setdefault(matrix_letter, {})[phase] = list(records)
+
+        tmp_path = "{}.tmp".format(self._file_path)
+        try:
+            with self._save_lock:
+                with open(tmp_path, "w") as f:
+                    json.dump(data, f, indent=2, sort_keys=True)
+                # os.rename doesn't replace the file on Windows
+                if os.path.exists(self._file_path):
+                    os.remove(self._file_path)
+                os.rename(tmp_path, self._file_path)
+        except (IOError, OSError) as e:
+            if self._logger:
+                self._logger.warning(
+                    "Cannot save operation statistics to {}: {}".format(
+                        self._file_path, e
+                    )
+                )
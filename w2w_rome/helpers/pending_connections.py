@@ -0,0 +1,177 @@
+import re
+
+
+class PendingRequest(object):
+    """Connect or disconnect request that the device didn't finish."""
+
+    __slots__ = ("request_id", "src_port", "dst_port", "command", "source", "user")
+
+    def __init__(self, request_id, src_port, dst_port, command, source=None, user=None):
+        """Pending request.
+
+        :param request_id: None for the command in process
+        :type request_id: str|None
+        :type src_port: str
+        :type dst_port: str
+        :param command: connect, disconnect or other command of the device
+        :type command: str
+        :type source: str|None
+        :type user: str|None
+        """
+        self.request_id = request_id
+        self.src_port = src_port.upper()
+        self.dst_port = dst_port.upper()
+        self.command = command.lower()
+        self.source = source
+        self.user = user
+
+    @property
+    def ports(self):
+        return self.src_port, self.dst_port
+
+    def __repr__(self):
+        return "<PendingRequest {} {} {}-{}>".format(
+            self.request_id, self.command, self.src_port, self.dst_port
+        )
+
+
+class PendingConnections(object):
+    """Parsed output of "connection show pending".
+
+    Connection execution status: delayed due to command in process
+
+    Command in process:
+    connect, ports: A3-A4, status: in process with payload
+
+    ======= ========= ========= ================== ======= ===================
+    Request Port1     Port2     Command            Source  User
+    ======= ========= ========= ================== ======= ===================
+    772     A1        A2        connect            CLI     admin
+    """
+
+    EXECUTION_STATUS_PATTERN = re.compile(
+        r"^connection execution status:[^\S\n]*(?P<status>[^\n]*?)\s*$",
+        re.IGNORECASE | re.MULTILINE,
+    )
+    IN_PROCESS_PATTERN = re.compile(
+        r"^(?P<command>\w+),\s+ports:\s+(?P<src_port>\w+)-(?P<dst_port>\w+),"
+        r"\s+status:[^\S\n]*(?P<status>[^\n]*?)\s*$",
+        re.IGNORECASE | re.MULTILINE,
+    )
+    TABLE_HEADER_PATTERN = re.compile(
+        r"^=+[ =]*\n[^\S\n]*request\s[^\n]*\n=+[ =]*$", re.IGNORECASE | re.MULTILINE
+    )
+    # rows of the table, any command is accepted, a row that isn't parsed
+    # would look not pending
+    REQUEST_PATTERN = re.compile(
+        r"^(?P<request_id>\w+)[^\S\n]+(?P<src_port>\w+)[^\S\n]+(?P<dst_port>\w+)"
+        r"[^\S\n]+(?P<command>\S+)"
+        r"([^\S\n]+(?P<source>\S+))?([^\S\n]+(?P<user>\S+))?[^\S\n]*$",
+        re.IGNORECASE | re.MULTILINE,
+    )
+
+    def __init__(self, execution_status, in_process, in_process_status, requests):
+        """Pending connections.
+
+        :type execution_status: str|None
+        :param in_process: command that the device executes now
+        :type in_process: PendingRequest|None
+        :type in_process_status: str|None
+        :param requests: queued requests in order of the execution
+        :type requests: list[PendingRequest]
+        """
+        self.execution_status = execution_status
+        self.in_process = in_process
+        self.in_process_status = in_process_status
+        self.requests = requests
+        self._ports = {request.ports for request in self}
+
+    @classmethod
+    def from_output(cls, output):
+        """Parse "connection show pending" output without logs.
+
+        :type output: str
+        :rtype: PendingConnections
+        """
+        match = cls.EXECUTION_STATUS_PATTERN.search(output)
+        execution_status = match.group("status") if match else None
+
+        match = cls.IN_PROCESS_PATTERN.search(output)
+        if match:
+            in_process = PendingRequest(
+                None,
+                match.group("src_port"),
+                match.group("dst_port"),
+                match.group("command"),
+            )
+            in_process_status = match.group("status")
+        else:
+            in_process = in_process_status = None
+
+        match = cls.TABLE_HEADER_PATTERN.search(output)
+        # without the header every line is checked
+        table_start = match.end() if match else 0
+        requests = [
+            PendingRequest(
+                match.group("request_id"),
+                match.group("src_port"),
+                match.group("dst_port"),
+                match.group("command"),
+                match.group("source"),
+                match.group("user"),
+            )
+            for match in cls.REQUEST_PATTERN.finditer(output, table_start)
+        ]
+        return cls(execution_status, in_process, in_process_status, requests)
+
+    def __iter__(self):
+        """In process command and queued requests.
+
+        :rtype: collections.Iterator[PendingRequest]
+        """
+        if self.in_process is not None:
+            yield self.in_process
+        for request in self.requests:
+            yield request
+
+    @property
+    def queue_depth(self):
+        """Number of the requests the device has to execute.
+
+        :rtype: int
+        """
+        return len(self.requests) + (self.in_process is not None)
+
+    def get_requests_ahead(self, ports):
+        """Number of the requests the device executes before the ports.
+
+        :param ports: src and dst port names
+        :type ports: list[tuple[str, str]]
+        :return: number of the requests before the first of the ports
+        :rtype: int
+        """
+        ports = {(src.upper(), dst.upper()) for src, dst in ports}
+        requests_ahead = 0
+        for request in self:
+            if request.ports in ports:
+                break
+            requests_ahead += 1
+        return requests_ahead
+
+    def __contains__(self, ports):
+        """Check that the ports are pending.
+
+        :param ports: src and dst port names
+        :type ports: tuple[str, str]
+        """
+        src_port, dst_port = ports
+        return (src_port.upper(), dst_port.upper()) in self._ports
+
+    def contains_any(self, ports):
+        """Check that some of the ports are pending.
+
+        :param ports: src and dst port names
+        :type ports: list[tuple[str, str]]
+        :rtype: bool
+        """
+        return any(port_pair in self for port_pair in ports)
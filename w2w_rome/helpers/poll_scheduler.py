@@ -0,0 +1,211 @@
+import random
+import threading
+import time
+from collections import defaultdict, deque
+from itertools import repeat
+
+
+class PollStatistics(object):
+    """Statistics of the pending connections waits per matrix type."""
+
+    HISTORY_SIZE = 20
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._durations = defaultdict(lambda: deque(maxlen=self.HISTORY_SIZE))
+        self._move_durations = defaultdict(lambda: deque(maxlen=self.HISTORY_SIZE))
+        self._waits = defaultdict(int)
+        self._polls = defaultdict(int)
+
+    def add(self, matrix_letter, duration, polls, moves=None):
+        """Add completed wait.
+
+        :param matrix_letter: A, B, Q or XY
+        :type matrix_letter: str
+        :param duration: seconds the connections were pending
+        :type duration: float
+        :param polls: number of the pending connections checks
+        :type polls: int
+        :param moves: number of moves the device did during the wait
+        :type moves: int|None
+        """
+        with self._lock:
+            self._durations[matrix_letter].append(duration)
+            self._waits[matrix_letter] += 1
+            self._polls[matrix_letter] += polls
+            if moves:
+                self._move_durations[matrix_letter].append(duration / moves)
+
+    def get_expected_duration(self, matrix_letter):
+        """Median of the last completion times for the matrix.
+
+        :type matrix_letter: str
+        :rtype: float|None
+        """
+        with self._lock:
+            durations = sorted(self._durations.get(matrix_letter, ()))
+        if durations:
+            return durations[len(durations) // 2]
+
+    def get_expected_move_duration(self, matrix_letter):
+        """Median of the last durations of one move for the matrix.
+
+        :type matrix_letter: str
+        :rtype: float|None
+        """
+        with self._lock:
+            durations = sorted(self._move_durations.get(matrix_letter, ()))
+        if durations:
+            return durations[len(durations) // 2]
+
+    def as_dict(self):
+        """Statistics by matrix letter.
+
+        :rtype: dict[str, dict]
+        """
+        with self._lock:
+            return {
+                matrix_letter: {
+                    "waits": waits,
+                    "polls": self._polls[matrix_letter],
+                    "average_polls": float(self._polls[matrix_letter]) / waits,
+                    "average_duration": (
+                        sum(self._durations[matrix_letter])
+                        / len(self._durations[matrix_letter])
+                    ),
+                }
+                for matrix_letter, waits in self._waits.items()
+            }
+
+
+class PollSchedule(object):
+    """Delays between the checks of one pending connections wait."""
+
+    def __init__(self, delays, statistics, matrix_letter):
+        """Poll schedule.
+
+        :type delays: collections.Iterator[float]
+        :type statistics: PollStatistics
+        :type matrix_letter: str
+        """
+        self._delays = delays
+        self._statistics = statistics
+        self._matrix_letter = matrix_letter
+        self._start_time = time.time()
+        self.polls = 0
+
+    def next_delay(self):
+        """Delay before the next check.
+
+        :rtype: float
+        """
+        self.polls += 1
+        return next(self._delays)
+
+    def finish(self, moves=None):
+        """Save statistics of the completed wait.
+
+        :param moves: number of moves the device did during the wait
+        :type moves: int|None
+        """
+        self._statistics.add(
+            self._matrix_letter, time.time() - self._start_time, self.polls, moves
+        )
+
+
+class BasePollScheduler(object):
+    def __init__(self, statistics=None):
+        """Poll scheduler.
+
+        :type statistics: PollStatistics
+        """
+        self.statistics = statistics or PollStatistics()
+
+    def _get_delays(self, matrix_letter, moves, timeout):
+        """Delays between the checks.
+
+        :type matrix_letter: str
+        :type moves: int|None
+        :type timeout: int|float|None
+        :rtype: collections.Iterator[float]
+        """
+        raise NotImplementedError
+
+    def new_schedule(self, matrix_letter, moves=None, timeout=None):
+        """Create schedule for the new pending connections wait.
+
+        :param matrix_letter: A, B, Q or XY
+        :type matrix_letter: str
+        :param moves: number of moves the device does during the wait
+        :type moves: int|None
+        :param timeout: seconds of the wait, the checks are not delayed longer
+        :type timeout: int|float|None
+        :rtype: PollSchedule
+        """
+        return PollSchedule(
+            self._get_delays(matrix_letter, moves, timeout),
+            self.statistics,
+            matrix_letter,
+        )
+
+
+class ConstantPollScheduler(BasePollScheduler):
+    """Check pending connections with the same delay."""
+
+    def __init__(self, delay, statistics=None):
+        """Constant poll scheduler.
+
+        :type delay: int|float
+        :type statistics: PollStatistics
+        """
+        super(ConstantPollScheduler, self).__init__(statistics)
+        self._delay = delay
+
+    def _get_delays(self, matrix_letter, moves, timeout):
+        return repeat(self._delay)
+
+
+class BackoffPollScheduler(BasePollScheduler):
+    """Check pending connections quickly at first and then back off.
+
+    If we know how long one move usually takes for the matrix the first check
+    is done shortly before the expected completion of the moves of the wait.
+    """
+
+    EXPECTED_DURATION_RATIO = 0.8
+
+    def __init__(self, initial_delay, max_delay, factor=2, jitter=0.1, statistics=None):
+        """Exponential backoff poll scheduler.
+
+        :type initial_delay: int|float
+        :type max_delay: int|float
+        :param factor: next delay is the previous one multiplied by the factor
+        :type factor: int|float
+        :param jitter: random deviation of the delay, 0.1 is +-10%
+        :type jitter: float
+        :type statistics: PollStatistics
+        """
+        super(BackoffPollScheduler, self).__init__(statistics)
+        self._initial_delay = initial_delay
+        self._max_delay = max_delay
+        self._factor = factor
+        self._jitter = jitter
+
+    def _add_jitter(self, delay):
+        return delay * random.uniform(1 - self._jitter, 1 + self._jitter)
+
+    def _get_delays(self, matrix_letter, moves, timeout):
+        expected_move_duration = self.statistics.get_expected_move_duration(
+            matrix_letter
+        )
+        if expected_move_duration and moves:
+            first_delay = expected_move_duration * moves * self.EXPECTED_DURATION_RATIO
+            if timeout is not None:
+                first_delay = min(first_delay, timeout)
+            if first_delay > self._initial_delay:
+                yield self._add_jitter(first_delay)
+
+        delay = self._initial_delay
+        while True:
+            yield self._add_jitter(delay)
+            delay = min(delay * self._factor, self._max_delay)
@@ -1,7 +1,7 @@
-import itertools
+import hashlib
 import random
 import re
-from copy import copy
+import threading
 
 from w2w_rome.helpers.cached_property import cached_property
 from w2w_rome.helpers.errors import (
@@ -11,20 +11,41 @@ from w2w_rome.helpers.errors import (
 )
 
 
+def _intern(value):
+    """Intern the string to share it between sub ports and port tables."""
+    return intern(value) if type(value) is str else value  # noqa: F821
+
+
 class SubPort(object):
     """Sub port that keep fiber port for one direction."""
 
+    __slots__ = (
+        "direction",
+        "sub_port_id",
+        "sub_port_full_name",
+        "sub_port_name",
+        "locked",
+        "enabled",
+        "connected",
+        "connected_to_direction",
+        "connected_to_sub_port_id",
+        "port_resource",
+        "original_logical_name",
+    )
+
+    # [^\S\n] - whitespace in the same line, so the pattern can be used for
+    # the whole output with MULTILINE flag
     PORT_PATTERN = re.compile(
         r"^(?P<direction>[EW])(?P<port_id>\d+)"
-        r"\[(?P<port_full_name>\w+?)\]\s+"
-        r"(?P<admin_status>(locked|unlocked))\s+"
-        r"(?P<oper_status>(enabled|disabled))\s+"
-        r"(?P<port_status>((dis)?connected)|in process)\s+"
-        r"\d+\s+"
+        r"\[(?P<port_full_name>\w+)\][^\S\n]+"
+        r"(?P<admin_status>(locked|unlocked))[^\S\n]+"
+        r"(?P<oper_status>(enabled|disabled))[^\S\n]+"
+        r"(?P<port_status>((dis)?connected)|in process)[^\S\n]+"
+        r"\d+[^\S\n]+"
         r"((?P<conn_to_direction>[EW])(?P<conn_to_port_id>\d+)"
-        r"\[\w+\])?\s+"
-        r"(?P<logical_name>[ABQPXY]\d+)\s*$",
-        re.IGNORECASE,
+        r"\[\w+\])?[^\S\n]+"
+        r"(?P<logical_name>[ABQPXY]\d+)[^\S\n]*$",
+        re.IGNORECASE | re.MULTILINE,
     )
 
     def __init__(
@@ -41,31 +62,41 @@ class SubPort(object):
         port_resource,
     ):
         self.direction = direction
-        self.sub_port_id = port_id
+        self.sub_port_id = _intern(port_id)
         self.sub_port_full_name = port_full_name
-        self.blade_letter = logical[0] if logical[0] != "P" else "Q"
-        self.sub_port_name = "{}{}".format(direction, port_id)  # E12
+        self.sub_port_name = _intern("{}{}".format(direction, port_id))  # E12
         self.locked = locked
         self.enabled = enabled
         self.connected = connected
         self.connected_to_direction = connected_to_direction
-        self.connected_to_sub_port_id = connected_to_port_id
-        self.logical = logical if logical[0] != "P" else "Q" + logical[1:]
-        if self.blade_letter in "XY":
-            # XY ports have sub ports from different blades and different port id for
-            # the same logical port name, e.g. X1 - E129B, W1A; Y4 - E4A, W132B
-            self.port_name = logical
-        else:
-            # A13, Q1
-            self.port_name = "{}{}".format(self.blade_letter, self.sub_port_id)
+        self.connected_to_sub_port_id = _intern(connected_to_port_id)
         self.port_resource = port_resource
-        self.original_logical_name = logical
+        self.original_logical_name = _intern(logical)
 
     def __str__(self):
         return "<SubPort {0.port_resource}:{0.sub_port_name}>".format(self)
 
     __repr__ = __str__
 
+    @property
+    def blade_letter(self):
+        letter = self.original_logical_name[0]
+        return letter if letter != "P" else "Q"
+
+    @property
+    def logical(self):
+        logical = self.original_logical_name
+        return logical if logical[0] != "P" else "Q" + logical[1:]
+
+    @property
+    def port_name(self):
+        if self.blade_letter in "XY":
+            # XY ports have sub ports from different blades and different port id for
+            # the same logical port name, e.g. X1 - E129B, W1A; Y4 - E4A, W132B
+            return self.original_logical_name
+        # A13, Q1
+        return "{}{}".format(self.blade_letter, self.sub_port_id)
+
     def table_view(self):
         delimiter = ""
         port_width = 17 - 2 - len(self.sub_port_name) - len(self.sub_port_full_name)
@@ -127,20 +158,96 @@ class SubPort(object):
         if match is None:
             return
 
-        group_dict = match.groupdict("")
+        return cls.from_match(match, port_resource)
+
+    @classmethod
+    def from_output(cls, output, port_resource):
+        """Parse all sub ports from CLI port show output in one pass.
+
+        :type output: str
+        :type port_resource: str
+        :rtype: collections.Iterator[SubPort]
+        """
+        for match in cls.PORT_PATTERN.finditer(output):
+            yield cls.from_match(match, port_resource)
+
+    @classmethod
+    def from_match(cls, match, port_resource):
+        (
+            direction,
+            port_id,
+            port_full_name,
+            admin_status,
+            oper_status,
+            port_status,
+            conn_to_direction,
+            conn_to_port_id,
+            logical_name,
+        ) = match.group(
+            "direction",
+            "port_id",
+            "port_full_name",
+            "admin_status",
+            "oper_status",
+            "port_status",
+            "conn_to_direction",
+            "conn_to_port_id",
+            "logical_name",
+        )
         return cls(
-            group_dict["direction"].upper(),
-            group_dict["port_id"],
-            group_dict["port_full_name"],
-            group_dict["admin_status"].lower() == "locked",
-            group_dict["oper_status"].lower() == "enabled",
-            group_dict["port_status"].lower() == "connected",
-            group_dict.get("conn_to_direction", "").upper(),
-            group_dict.get("conn_to_port_id"),
-            group_dict["logical_name"].upper(),
+            direction.upper(),
+            port_id,
+            port_full_name,
+            admin_status.lower() == "locked",
+            oper_status.lower() == "enabled",
+            port_status.lower() == "connected",
+            (conn_to_direction or "").upper(),
+            conn_to_port_id or "",
+            logical_name.upper(),
             port_resource,
         )
 
+    def copy(self):
+        """Independent copy of the sub port.
+
+        :rtype: SubPort
+        """
+        sub_port = SubPort.__new__(SubPort)
+        for attr_name in self.__slots__:
+            setattr(sub_port, attr_name, getattr(self, attr_name))
+        return sub_port
+
+    def set_connected_to(self, sub_port):
+        """Update the sub port after it was connected to another sub port.
+
+        :type sub_port: SubPort
+        """
+        self.connected = True
+        self.connected_to_direction = sub_port.direction
+        self.connected_to_sub_port_id = sub_port.sub_port_id
+
+    def set_disconnected(self):
+        self.connected = False
+        self.connected_to_direction = ""
+        self.connected_to_sub_port_id = ""
+
+    def update_state(self, sub_port):
+        """Update the sub port with the state loaded from the device.
+
+        :type sub_port: SubPort
+        """
+        if not sub_port == self or sub_port.logical != self.logical:
+            raise BaseRomeException(
+                "Cannot update {} with the state of {} ({})".format(
+                    self, sub_port, sub_port.logical
+                )
+            )
+        self.locked = sub_port.locked
+        self.enabled = sub_port.enabled
+        self.connected = sub_port.connected
+        self.connected_to_direction = sub_port.connected_to_direction
+        self.connected_to_sub_port_id = sub_port.connected_to_sub_port_id
+
     def verify_sub_port_is_not_locked_or_disabled(self):
         """Check that Sub Ports are not locked or disabled."""
         if self.locked:
@@ -160,10 +267,11 @@ class RomePort(object):
     :type w_port: SubPort
     """
 
+    __slots__ = ("port_resource", "port_name", "e_port", "w_port")
+
     def __init__(self, port_resource, port_name):
         self.port_resource = port_resource
         self.port_name = port_name
-        self.sub_port_id = port_name[1:]
         self.e_port = None
         self.w_port = None
 
@@ -172,6 +280,20 @@ class RomePort(object):
 
     __repr__ = __str__
 
+    def copy(self):
+        """Copy of the Rome port with copies of the sub ports.
+
+        :rtype: RomePort
+        """
+        rome_port = RomePort(self.port_resource, self.port_name)
+        rome_port.e_port = self.e_port.copy()
+        rome_port.w_port = self.w_port.copy()
+        return rome_port
+
+    @property
+    def sub_port_id(self):
+        return self.port_name[1:]
+
     @property
     def blade_letter(self):
         return self.e_port.blade_letter
@@ -205,12 +327,23 @@ class LogicalPort(object):
     :type name: str
     """
 
+    __slots__ = ("name", "_rome_ports_map")
+
     def __init__(self, name):
         self.name = name
-        self.blade_letter = name[0].upper()
-        self.port_id = name[1:]
         self._rome_ports_map = {}  # (<port_resource>, <port_name>): <rome_port>
-        self.is_q_port = self.blade_letter == "Q"
+
+    @property
+    def blade_letter(self):
+        return self.name[0].upper()
+
+    @property
+    def port_id(self):
+        return self.name[1:]
+
+    @property
+    def is_q_port(self):
+        return self.blade_letter == "Q"
 
     @property
     def rome_ports(self):
@@ -253,6 +386,16 @@ class LogicalPort(object):
     def __iter__(self):
         return iter(self.rome_ports)
 
+    def copy(self):
+        """Copy of the logical port with copies of the Rome ports.
+
+        :rtype: LogicalPort
+        """
+        logical_port = LogicalPort(self.name)
+        for key, rome_port in self._rome_ports_map.items():
+            logical_port._rome_ports_map[key] = rome_port.copy()
+        return logical_port
+
     def get_or_create_rome_port(self, port_resource, port_name):
         """Get exiting Rome port or create new.
 
@@ -268,6 +411,18 @@ class LogicalPort(object):
 
         return rome_port
 
+    def add_rome_ports(self, rome_ports):
+        """Add Rome ports of the same logical port from another table.
+
+        Rome ports are not copied, the logical port keeps references to them.
+        :type rome_ports: collections.Iterable[RomePort]
+        """
+        for rome_port in rome_ports:
+            key = (rome_port.port_resource, rome_port.port_name)
+            if key in self._rome_ports_map:
+                raise ValueError("{} already added to {}".format(rome_port, self))
+            self._rome_ports_map[key] = rome_port
+
     def add_sub_port(self, sub_port):
         """Adding sub port.
 
@@ -331,11 +486,22 @@ class LogicalPort(object):
 class PortTable(object):
     """Table with Rome ports.
 
+    Snapshots of the table share the ports with it until one of the tables
+    is updated in place, then the updated table copies the ports first.
     :type _map_ports: dict[str, LogicalPort]
     """
 
+    # built from the ports and valid while the ports are not changed
+    SHARED_PROPERTIES = (
+        "map_sub_port_name_to_ports",
+        "map_sub_ports",
+        "connection_index",
+    )
+
     def __init__(self):
         self._map_ports = {}
+        self._is_shared = False
+        self._lock = threading.Lock()
 
     @classmethod
     def from_output(cls, port_table_output, host):
@@ -346,11 +512,9 @@ class PortTable(object):
         :rtype: PortTable
         """
         port_table = cls()
-        for line in port_table_output.splitlines():
-            sub_port = SubPort.from_line(line, host)
-            if sub_port:
-                rome_logical_port = port_table.get_or_create(sub_port.logical)
-                rome_logical_port.add_sub_port(sub_port)
+        for sub_port in SubPort.from_output(port_table_output, host):
+            rome_logical_port = port_table.get_or_create(sub_port.logical)
+            rome_logical_port.add_sub_port(sub_port)
         port_table.validate(port_table_output)
         return port_table
 
@@ -374,27 +538,102 @@ class PortTable(object):
                 dict_.update({rp.e_port.sub_port_name: lp, rp.w_port.sub_port_name: lp})
         return dict_
 
-    def __add__(self, other):
-        cls = type(self)
-        if not isinstance(other, cls):
-            raise ValueError("Cannot add {} to PortTable".format(type(other)))
+    @cached_property
+    def map_sub_ports(self):
+        """Sub ports by the port resource and the sub port name.
 
-        if set(self._map_ports.keys()) != set(other._map_ports.keys()):
-            raise ValueError("Port tables have different logical ports")
+        :rtype: dict[tuple[str, str], SubPort]
+        """
+        return {
+            (sub_port.port_resource, sub_port.sub_port_name): sub_port
+            for lp in self.logical_ports
+            for rp in lp.rome_ports
+            for sub_port in (rp.e_port, rp.w_port)
+        }
+
+    @classmethod
+    def merge(cls, port_tables):
+        """Merge port tables of a few hosts.
+
+        Sub ports and Rome ports are not copied, the merged table references
+        them from the port tables. Only logical ports are created.
+        :type port_tables: list[PortTable]
+        :rtype: PortTable
+        """
+        first_port_table = port_tables[0]
+        port_names = set(first_port_table._map_ports)
+        for port_table in port_tables[1:]:
+            if not isinstance(port_table, cls):
+                raise ValueError("Cannot add {} to PortTable".format(type(port_table)))
+            if port_names != set(port_table._map_ports):
+                raise ValueError("Port tables have different logical ports")
 
         new_port_table = cls()
-        for port_name, first_logical_port in self._map_ports.items():
-            second_logical_port = other[port_name]
+        for port_name in first_port_table._map_ports:
             new_logical_port = new_port_table.get_or_create(port_name)
+            for port_table in port_tables:
+                new_logical_port.add_rome_ports(port_table[port_name])
+
+        return new_port_table
+
+    def __add__(self, other):
+        return self.merge([self, other])
+
+    def copy(self):
+        """Copy of the port table.
+
+        Logical ports, Rome ports and sub ports are copied, so the copy can
+        be updated in place without changing the original table.
+        :rtype: PortTable
+        """
+        port_table = PortTable()
+        for logical_name, logical_port in self._map_ports.items():
+            port_table._map_ports[logical_name] = logical_port.copy()
+        return port_table
 
-            for rome_port in itertools.chain(first_logical_port, second_logical_port):
-                new_e_sub_port = copy(rome_port.e_port)
-                new_w_sub_port = copy(rome_port.w_port)
-                new_logical_port.add_sub_port(new_e_sub_port)
-                new_logical_port.add_sub_port(new_w_sub_port)
+    def snapshot(self):
+        """Snapshot of the port table that is copied only when it's updated.
 
+        :rtype: PortTable
+        """
+        with self._lock:
+            self._is_shared = True
+            port_table = PortTable()
+            port_table._map_ports = self._map_ports
+            port_table._is_shared = True
+            for name in self.SHARED_PROPERTIES:
+                if name in self.__dict__:
+                    port_table.__dict__[name] = self.__dict__[name]
+        return port_table
+
+    def replace_logical_ports(self, port_table, port_names):
+        """Snapshot of the table with the logical ports taken from another table.
+
+        :param port_table: table with the actual state of the ports
+        :type port_table: PortTable
+        :param port_names: logical port names to take from the port table
+        :type port_names: collections.Iterable[str]
+        :rtype: PortTable
+        """
+        new_port_table = PortTable()
+        new_port_table._map_ports = dict(self._map_ports)
+        new_port_table._is_shared = True
+        for port_name in port_names:
+            new_port_table._map_ports[port_name] = port_table[port_name].copy()
         return new_port_table
 
+    def _own_ports(self):
+        """Copy the ports shared with other tables before updating them."""
+        with self._lock:
+            if self._is_shared:
+                self._map_ports = {
+                    logical_name: logical_port.copy()
+                    for logical_name, logical_port in self._map_ports.items()
+                }
+                self._is_shared = False
+                for name in self.SHARED_PROPERTIES:
+                    self.__dict__.pop(name, None)
+
     def validate(self, output):
         blade_name = self.logical_ports[0].blade_letter
         msg = "The Port Table isn't loaded correctly. Loaded {} ports".format(
@@ -445,18 +684,116 @@ class PortTable(object):
         """
         return self.map_sub_port_name_to_ports[sub_port_name]
 
+    def get_sub_port(self, port_resource, sub_port_name):
+        """Get Sub Port by the port resource and the sub port name.
+
+        :type port_resource: str
+        :type sub_port_name: str
+        :rtype: SubPort
+        """
+        try:
+            val = self.map_sub_ports[(port_resource, sub_port_name)]
+        except KeyError:
+            raise BaseRomeException(
+                'We don\'t have sub port "{}" on the "{}" in Ports table'.format(
+                    sub_port_name, port_resource
+                )
+            )
+        return val
+
+    def set_sub_ports_connected(self, port_resource, e_port_name, w_port_name):
+        """Update the table in place after the sub ports were connected.
+
+        :type port_resource: str
+        :type e_port_name: str
+        :type w_port_name: str
+        """
+        self._own_ports()
+        e_port = self.get_sub_port(port_resource, e_port_name)
+        w_port = self.get_sub_port(port_resource, w_port_name)
+        e_port.set_connected_to(w_port)
+        w_port.set_connected_to(e_port)
+        self._reset_connection_index()
+
+    def set_sub_ports_disconnected(self, port_resource, e_port_name, w_port_name):
+        """Update the table in place after the sub ports were disconnected.
+
+        :type port_resource: str
+        :type e_port_name: str
+        :type w_port_name: str
+        """
+        self._own_ports()
+        self.get_sub_port(port_resource, e_port_name).set_disconnected()
+        self.get_sub_port(port_resource, w_port_name).set_disconnected()
+        self._reset_connection_index()
+
+    def update_logical_port(self, port_resource, logical_port, port_info_output):
+        """Update sub ports of the logical port in place with CLI port show output.
+
+        :type port_resource: str
+        :type logical_port: LogicalPort
+        :param port_info_output: output of the port show for the logical port
+        :type port_info_output: str
+        """
+        self._own_ports()
+        logical_port = self[logical_port.name]
+        sub_ports = [
+            sub_port
+            for rome_port in logical_port
+            if rome_port.port_resource == port_resource
+            for sub_port in (rome_port.e_port, rome_port.w_port)
+        ]
+        loaded_sub_ports = {
+            sub_port.sub_port_name: sub_port
+            for sub_port in SubPort.from_output(port_info_output, port_resource)
+        }
+        self._reset_connection_index()
+
+        for sub_port in sub_ports:
+            try:
+                loaded_sub_port = loaded_sub_ports[sub_port.sub_port_name]
+            except KeyError:
+                raise BaseRomeException(
+                    "Not all sub ports of the {} are loaded. Output is:\n{}".format(
+                        logical_port, port_info_output
+                    )
+                )
+            sub_port.update_state(loaded_sub_port)
+
     def __iter__(self):
         return iter(self._map_ports.values())
 
+    @cached_property
+    def connection_index(self):
+        """Logical ports connected to and from every logical port.
+
+        Built once for the table and reset when the table is updated.
+        :return: {<logical port name>: (<connected to ports>, <connected from ports>)}
+        :rtype: dict[str, tuple[list[LogicalPort], list[LogicalPort]]]
+        """
+        return {
+            logical_port.name: (
+                map(
+                    self.get_by_sub_port_name, logical_port.connected_to_sub_port_names
+                ),
+                map(
+                    self.get_by_sub_port_name,
+                    logical_port.connected_from_sub_port_names,
+                ),
+            )
+            for logical_port in self.logical_ports
+        }
+
+    def _reset_connection_index(self):
+        self.__dict__.pop("connection_index", None)
+
     def get_connected_to_port(self, logical_port):
         """Return a port that connected to given.
 
         :type logical_port: LogicalPort
         :rtype: LogicalPort
         """
-        connected_to_ports = map(
-            self.get_by_sub_port_name, logical_port.connected_to_sub_port_names
-        )
+        connected_to_ports = self.connection_index[logical_port.name][0]
         if connected_to_ports:
             logical_port.verify_connected_ports(connected_to_ports)
             return connected_to_ports[0]
@@ -467,9 +804,7 @@ class PortTable(object):
         :type logical_port: LogicalPort
         :rtype: LogicalPort
         """
-        connected_from_ports = map(
-            self.get_by_sub_port_name, logical_port.connected_from_sub_port_names
-        )
+        connected_from_ports = self.connection_index[logical_port.name][1]
         if connected_from_ports:
             logical_port.verify_connected_ports(connected_from_ports)
             return connected_from_ports[0]
@@ -551,3 +886,21 @@ class PortTable(object):
                     connected_ports.add((connected_from, logic_port))
 
         return connected_ports
+
+    def get_connections_hash(self):
+        """Hash of the connections between the sub ports.
+
+        It doesn't depend on the order of the ports in the table.
+        :rtype: str
+        """
+        connections = sorted(
+            (
+                sub_port.port_resource,
+                sub_port.sub_port_name,
+                sub_port.connected_to_direction,
+                sub_port.connected_to_sub_port_id,
+            )
+            for sub_port in self.map_sub_ports.values()
+            if sub_port.connected
+        )
+        return hashlib.md5(repr(connections)).hexdigest()
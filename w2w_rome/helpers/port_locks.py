@@ -0,0 +1,182 @@
+import threading
+import time
+from contextlib import contextmanager
+
+from w2w_rome.helpers.errors import PortLockDeadlockError, PortLockTimeoutError
+
+
+def get_port_lock_keys(port_table, port_names):
+    """Get lock keys of the logical ports and their sub ports.
+
+    Sub ports of Q and XY ports are locked too, XY logical ports are built from
+    sub ports of different blades.
+    :type port_table: w2w_rome.helpers.port_entity.PortTable
+    :param port_names: logical port names
+    :type port_names: collections.Iterable[str]
+    :rtype: set[str]
+    """
+    keys = set()
+    for port_name in port_names:
+        logical_port = port_table[port_name]
+        keys.add(logical_port.name)
+        if logical_port.is_q_port or logical_port.blade_letter in "XY":
+            for rome_port in logical_port.rome_ports:
+                for sub_port in (rome_port.e_port, rome_port.w_port):
+                    keys.add(
+                        "{}:{}".format(
+                            sub_port.port_resource, sub_port.sub_port_full_name
+                        )
+                    )
+    return keys
+
+
+class PortLock(object):
+    """Locks of the ports acquired by one command."""
+
+    def __init__(self, manager):
+        """Port lock.
+
+        :type manager: PortLockManager
+        """
+        self._manager = manager
+        self._keys = []
+
+    def acquire(self, keys, blocking=True):
+        """Lock more ports, e.g. found in the port table.
+
+        :param keys: logical port names or sub port keys
+        :type keys: collections.Iterable[str]
+        :param blocking: wait for the ports locked by other commands, otherwise
+            nothing is locked if some of the ports are locked
+        :type blocking: bool
+        :return: the ports are locked
+        :rtype: bool
+        :raises PortLockDeadlockError: if the ports are locked by the command
+            that waits for the ports of this command
+        :raises PortLockTimeoutError: if the ports aren't unlocked in time
+        """
+        new_keys = self._manager.acquire(keys, blocking)
+        if new_keys is None:
+            return False
+        self._keys.extend(new_keys)
+        return True
+
+    def release(self):
+        keys, self._keys = self._keys, []
+        self._manager.release(keys)
+
+
+class PortLockManager(object):
+    """Locks of the ports for the concurrent mapping commands.
+
+    Commands on different ports are executed together, commands on the same
+    ports wait for each other. All requested ports are locked at once, so
+    the command doesn't keep some of them while waiting for others. If the
+    command locks more ports later and it waits for the command that waits
+    for it, the deadlock is detected and the later command fails.
+    Locks are reentrant for the thread.
+    """
+
+    def __init__(self, timeout=None):
+        """Port lock manager.
+
+        :param timeout: seconds to wait for the ports, None - wait until unlocked
+        :type timeout: int|float|None
+        """
+        self._timeout = timeout
+        self._condition = threading.Condition()
+        self._owners = {}  # key: thread ident
+        self._waits_for = {}  # thread ident: set of thread idents
+
+    @contextmanager
+    def lock(self, keys):
+        """Lock the ports until the end of the block.
+
+        :param keys: logical port names or sub port keys
+        :type keys: collections.Iterable[str]
+        :rtype: collections.Iterator[PortLock]
+        """
+        port_lock = PortLock(self)
+        try:
+            port_lock.acquire(keys)
+            yield port_lock
+        finally:
+            port_lock.release()
+
+    def acquire(self, keys, blocking=True):
+        """Lock the ports that aren't locked by the current thread yet.
+
+        :type keys: collections.Iterable[str]
+        :param blocking: wait for the ports locked by other threads
+        :type blocking: bool
+        :return: locked keys, None if the ports are locked and not blocking
+        :rtype: list[str]|None
+        """
+        owner = threading.current_thread().ident
+        keys = sorted(set(keys))
+        end_time = None if self._timeout is None else time.time() + self._timeout
+
+        with self._condition:
+            try:
+                while True:
+                    blockers = {
+                        self._owners[key]
+                        for key in keys
+                        if self._owners.get(key, owner) != owner
+                    }
+                    if not blockers:
+                        break
+                    if not blocking:
+                        return None
+
+                    self._waits_for[owner] = blockers
+                    if self._is_waiting_for(blockers, owner):
+                        raise PortLockDeadlockError(
+                            "Deadlock detected when locking ports {}".format(
+                                ", ".join(keys)
+                            )
+                        )
+
+                    time_left = None if end_time is None else end_time - time.time()
+                    if time_left is not None and time_left <= 0:
+                        raise PortLockTimeoutError(
+                            "Ports {} are locked longer than {}sec".format(
+                                ", ".join(keys), self._timeout
+                            )
+                        )
+                    self._condition.wait(time_left)
+            finally:
+                self._waits_for.pop(owner, None)
+
+            new_keys = [key for key in keys if key not in self._owners]
+            for key in new_keys:
+                self._owners[key] = owner
+            return new_keys
+
+    def release(self, keys):
+        """Unlock the ports.
+
+        :type keys: collections.Iterable[str]
+        """
+        with self._condition:
+            for key in keys:
+                self._owners.pop(key, None)
+            self._condition.notify_all()
+
+    def _is_waiting_for(self, owners, owner):
+        """Check that the owners wait for the owner, directly or through others.
+
+        :type owners: set[int]
+        :type owner: int
+        :rtype: bool
+        """
+        visited = set()
+        stack = list(owners)
+        while stack:
+            current = stack.pop()
+            if current == owner:
+                return True
+            if current not in visited:
+                visited.add(current)
+                stack.extend(self._waits_for.get(current, ()))
+        return False
@@ -0,0 +1,130 @@
+import threading
+import time
+from contextlib import contextmanager
+
+
+class PortTableCache(object):
+    """Port table kept between the driver commands.
+
+    The driver updates the table in place after its own mapping operations,
+    the table is loaded from the device again when it's older than TTL.
+    With the change detection the stale table is used while the operation
+    counters of the device ("show board") are not changed.
+    The cache keeps its own snapshot of the table and returns snapshots of it,
+    so the commands can update their tables in place independently.
+    The cache is shared by the commands that run concurrently, so the table
+    and its state are changed under the lock.
+    """
+
+    def __init__(self, ttl, change_detection=False):
+        """Port table cache.
+
+        :param ttl: seconds the loaded port table is valid, 0 disables the cache
+        :type ttl: int|float
+        :param change_detection: reuse the stale port table if the operation
+            counters of the device are not changed
+        :type change_detection: bool
+        """
+        self._ttl = ttl
+        self.change_detection = change_detection
+        self._lock = threading.Lock()
+        self._hosts = None
+        self._port_table = None
+        self._loaded_at = None
+        self._operation_counts = None
+
+    @property
+    def enabled(self):
+        return self._ttl > 0 or self.change_detection
+
+    def bind(self, hosts):
+        """Reset the cache if the driver works with other hosts.
+
+        :type hosts: tuple[str]
+        """
+        with self._lock:
+            if hosts != self._hosts:
+                self._invalidate()
+                self._hosts = hosts
+
+    def get(self):
+        """Return the port table if it's not stale.
+
+        :rtype: w2w_rome.helpers.port_entity.PortTable|None
+        """
+        with self._lock:
+            if (
+                self._ttl > 0
+                and self._port_table is not None
+                and time.time() - self._loaded_at < self._ttl
+            ):
+                return self._port_table.snapshot()
+
+    def get_unchanged(self, operation_counts):
+        """Return the port table if the device didn't perform any operations.
+
+        :param operation_counts: operation counters of the hosts
+        :type operation_counts: tuple[int]|None
+        :rtype: w2w_rome.helpers.port_entity.PortTable|None
+        """
+        with self._lock:
+            if (
+                self.change_detection
+                and self._port_table is not None
+                and operation_counts is not None
+                and operation_counts == self._operation_counts
+            ):
+                self._loaded_at = time.time()
+                return self._port_table.snapshot()
+
+    def store(self, port_table, operation_counts=None):
+        """Keep the port table loaded from the device.
+
+        :type port_table: w2w_rome.helpers.port_entity.PortTable
+        :param operation_counts: operation counters of the hosts read before the
+            port table was loaded
+        :type operation_counts: tuple[int]|None
+        """
+        if self.enabled:
+            port_table = port_table.snapshot()
+            with self._lock:
+                self._port_table = port_table
+                self._loaded_at = time.time()
+                self._operation_counts = operation_counts
+
+    def update(self, port_table, port_names):
+        """Take the state of the mapped ports from the table updated after mapping.
+
+        Only the mapped ports are taken, other ports can be mapped by
+        concurrent commands in the meantime. Nothing is kept if the cache was
+        invalidated.
+        :type port_table: w2w_rome.helpers.port_entity.PortTable
+        :param port_names: logical port names that were mapped
+        :type port_names: collections.Iterable[str]
+        """
+        with self._lock:
+            if self.enabled and self._port_table is not None:
+                self._port_table = self._port_table.replace_logical_ports(
+                    port_table, port_names
+                )
+
+    def invalidate(self):
+        with self._lock:
+            self._invalidate()
+
+    def _invalidate(self):
+        self._port_table = None
+        self._loaded_at = None
+        self._operation_counts = None
+
+    @contextmanager
+    def invalidate_on_error(self):
+        """Drop the port table if the operation failed.
+
+        After a failed operation we don't know the state of the ports.
+        """
+        try:
+            yield
+        except Exception:
+            self.invalidate()
+            raise
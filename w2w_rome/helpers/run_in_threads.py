@@ -1,34 +1,100 @@
-from multiprocessing.pool import ThreadPool
+import time
+from Queue import Empty, Queue
 
-from w2w_rome.helpers.errors import GotErrorInThreads
+from w2w_rome.helpers.errors import (
+    GotErrorInThreads,
+    TaskCancelledError,
+    TaskTimeoutError,
+)
+from w2w_rome.helpers.thread_executor import ThreadExecutor
 
 
-def run_in_threads(func, logger, param_map):
+def run_in_threads(func, logger, param_map, executor=None):
     """Run function in the threads.
 
+    When the function fails on one host the tasks on other hosts are
+    cancelled and stop at their next cancellation check, so the error is
+    raised without waiting for them to finish as usual. Sessions of the tasks
+    that are still running after the timeout are disconnected, so they are not
+    returned to the pool while the task uses them.
+
     :type func: function
     :type logger: logging.Logger
     :param param_map: cli_service: [args_list, kwargs_dict]
     :type param_map: dict[cloudshell.cli.cli_service_impl.CliServiceImpl, list[list, dict]]  # noqa: E501
+    :param executor: executor that is used by the driver, if it isn't set
+        threads are created only for this function
+    :type executor: w2w_rome.helpers.thread_executor.ThreadExecutor
     :return: dict with cli_service: result
     :rtype: dict[cloudshell.cli.cli_service_impl.CliServiceImpl, str]
     """
-    pool = ThreadPool(processes=len(param_map))
-    async_results = {
-        cli_service: pool.apply_async(func, args=args, kwds=kwargs)
-        for cli_service, (args, kwargs) in param_map.items()
-    }
-
-    errors = []
-    results_map = {}
-    for cli_service, async_result in async_results.items():
-        try:
-            results_map[cli_service] = async_result.get()
-        except Exception as e:
-            errors.append(e)
-            logger.exception(
-                "Got exception on the host {}".format(cli_service.session.host)
-            )
+    own_executor = executor is None
+    if own_executor:
+        executor = ThreadExecutor(processes=len(param_map))
+
+    try:
+        tasks = {
+            cli_service: executor.submit(func, args, kwargs)
+            for cli_service, (args, kwargs) in param_map.items()
+        }
+        finished = Queue()
+        for cli_service, task in tasks.items():
+            task.add_done_callback(lambda _, key=cli_service: finished.put(key))
+
+        errors = []
+        results_map = {}
+        not_finished = set(tasks)
+        # the timeout is for all tasks, not for every of them
+        deadline = (
+            time.time() + executor.task_timeout
+            if executor.task_timeout is not None
+            else None
+        )
+        while not_finished:
+            try:
+                cli_service = finished.get(
+                    timeout=None if deadline is None else max(deadline - time.time(), 0)
+                )
+            except Empty:
+                for cli_service in not_finished:
+                    # don't start tasks that are still waiting for a thread,
+                    # running task can't keep using the session
+                    if not tasks[cli_service].cancel():
+                        cli_service.session.disconnect()
+                    errors.append(
+                        TaskTimeoutError(
+                            "Task {} didn't finish in {}sec".format(
+                                func.__name__, executor.task_timeout
+                            )
+                        )
+                    )
+                    logger.error(
+                        "Task on the host {} didn't finish in time".format(
+                            cli_service.session.host
+                        )
+                    )
+                break
+
+            not_finished.discard(cli_service)
+            try:
+                results_map[cli_service] = tasks[cli_service].result(
+                    executor.task_timeout
+                )
+            except TaskCancelledError:
+                logger.debug(
+                    "Task on the host {} is cancelled".format(cli_service.session.host)
+                )
+            except Exception as e:
+                errors.append(e)
+                logger.exception(
+                    "Got exception on the host {}".format(cli_service.session.host)
+                )
+                # fail fast, tasks on other hosts stop waiting for the device
+                for other_cli_service in not_finished:
+                    tasks[other_cli_service].cancel()
+    finally:
+        if own_executor:
+            executor.shutdown(wait=False)
 
     if errors:
         raise GotErrorInThreads("Got exception on the host, look in the logs")
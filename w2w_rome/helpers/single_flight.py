@@ -0,0 +1,62 @@
+import threading
+
+
+class _Flight(object):
+    def __init__(self):
+        self.result = None
+        self.error = None
+        self.followers = 0
+        self.done = threading.Event()
+
+
+class SingleFlight(object):
+    """Share one call of the function between concurrent callers.
+
+    The first caller runs the function, callers that come while it's in
+    progress wait for it and get the same result or the same error.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights = {}
+
+    def do(self, key, func, fresh=False):
+        """Run the function or wait for the call in progress with the same key.
+
+        :param key: calls with the same key are shared
+        :type key: collections.Hashable
+        :type func: function
+        :param fresh: don't join the call that started before this one, the
+            caller needs the result that is newer than its own changes; callers
+            that come later join the new call
+        :type fresh: bool
+        :return: result of the function and whether it's shared with other callers
+        :rtype: tuple[object, bool]
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None and not fresh:
+                flight.followers += 1
+                is_leader = False
+            else:
+                flight = self._flights[key] = _Flight()
+                is_leader = True
+
+        if not is_leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result, True
+
+        try:
+            flight.result = func()
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+                is_shared = flight.followers > 0
+            flight.done.set()
+        return flight.result, is_shared
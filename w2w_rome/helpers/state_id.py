@@ -0,0 +1,75 @@
+class DeviceStateId(object):
+    """Synchronization ID of the device for CloudShell.
+
+    The ID is the hash of the connections in the port table. The hash is
+    calculated again only if the operation counters of the device are changed,
+    so for the unchanged device we need only "show board". After SetStateId
+    the ID from CloudShell is returned while the connections are the same.
+    """
+
+    NOT_USED = "-1"
+
+    def __init__(self):
+        self._hosts = None
+        self.invalidate()
+
+    def invalidate(self):
+        self._operation_counts = None
+        self._connections_hash = None
+        self._synced_connections_hash = None
+        self._synced_state_id = None
+
+    def bind(self, hosts):
+        """Reset the state if the driver works with other hosts.
+
+        :type hosts: tuple[str]
+        """
+        if hosts != self._hosts:
+            self.invalidate()
+            self._hosts = hosts
+
+    def is_actual(self, operation_counts):
+        """Check that the device didn't perform any operations.
+
+        :param operation_counts: operation counters of the hosts
+        :type operation_counts: tuple[int]|None
+        :rtype: bool
+        """
+        return (
+            operation_counts is not None
+            and self._connections_hash is not None
+            and operation_counts == self._operation_counts
+        )
+
+    def update(self, operation_counts, port_table):
+        """Update the state with the port table loaded from the device.
+
+        :param operation_counts: operation counters read before the port table
+        :type operation_counts: tuple[int]|None
+        :type port_table: w2w_rome.helpers.port_entity.PortTable
+        """
+        self._operation_counts = operation_counts
+        self._connections_hash = port_table.get_connections_hash()
+
+    def set_synced(self, state_id):
+        """Keep ID that CloudShell set for the current state.
+
+        :type state_id: str
+        """
+        self._synced_state_id = state_id
+        self._synced_connections_hash = self._connections_hash
+
+    @property
+    def value(self):
+        """Synchronization ID.
+
+        :rtype: str
+        """
+        if self._connections_hash is None:
+            return self.NOT_USED
+        if (
+            self._synced_state_id is not None
+            and self._connections_hash == self._synced_connections_hash
+        ):
+            return self._synced_state_id
+        return self._connections_hash
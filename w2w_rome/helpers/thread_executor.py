@@ -0,0 +1,193 @@
+import multiprocessing
+import threading
+import time
+from multiprocessing.pool import ThreadPool
+
+from w2w_rome.helpers.errors import TaskCancelledError, TaskTimeoutError
+
+_local = threading.local()
+
+
+def get_current_task():
+    """Task that is run in the current thread.
+
+    :rtype: ThreadTask|None
+    """
+    return getattr(_local, "task", None)
+
+
+def is_cancelled():
+    """Check that the task run in the current thread was cancelled.
+
+    :rtype: bool
+    """
+    task = get_current_task()
+    return task is not None and task.cancelled
+
+
+def check_cancelled():
+    """Stop the task run in the current thread if it was cancelled.
+
+    Long running functions call it in their wait loops.
+    :raises TaskCancelledError: if the task was cancelled
+    """
+    if is_cancelled():
+        raise TaskCancelledError("Task was cancelled while it was running")
+
+
+def cancellable_sleep(seconds):
+    """Sleep that is interrupted when the task in the current thread is cancelled.
+
+    :type seconds: int|float
+    :raises TaskCancelledError: if the task was cancelled
+    """
+    task = get_current_task()
+    if task is None:
+        time.sleep(seconds)
+    else:
+        task._cancelled.wait(seconds)
+        check_cancelled()
+
+
+class ThreadTask(object):
+    """Function submitted to the thread executor."""
+
+    def __init__(self, func, args, kwargs):
+        self._func = func
+        self._args = args
+        self._kwargs = kwargs
+        self._cancelled = threading.Event()
+        self._started = threading.Event()
+        self._async_result = None
+        self._lock = threading.Lock()
+        self._done = False
+        self._done_callbacks = []
+
+    def run(self):
+        try:
+            if self._cancelled.is_set():
+                raise TaskCancelledError("Task was cancelled before it started")
+            self._started.set()
+            _local.task = self
+            try:
+                return self._func(*self._args, **self._kwargs)
+            finally:
+                _local.task = None
+        finally:
+            self._set_done()
+
+    def _set_done(self):
+        with self._lock:
+            self._done = True
+            callbacks, self._done_callbacks = self._done_callbacks, []
+        for callback in callbacks:
+            callback(self)
+
+    def add_done_callback(self, callback):
+        """Call the function with the task when the task is finished.
+
+        The function is called right away if the task is already finished.
+        :param callback: function(task)
+        :type callback: function
+        """
+        with self._lock:
+            if not self._done:
+                self._done_callbacks.append(callback)
+                return
+        callback(self)
+
+    @property
+    def started(self):
+        return self._started.is_set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        """Cancel the task.
+
+        The task that isn't started yet will not be run. Running task is
+        stopped only when it checks the cancellation, see check_cancelled and
+        cancellable_sleep, otherwise it's finished as usual.
+        :return: the task will not be run
+        :rtype: bool
+        """
+        self._cancelled.set()
+        return not self.started
+
+    def result(self, timeout=None):
+        """Wait for the task and return its result.
+
+        :param timeout: seconds to wait, None - wait until the task is finished
+        :type timeout: int|float|None
+        :raises TaskTimeoutError: if the task isn't finished in time
+        """
+        try:
+            return self._async_result.get(timeout)
+        except multiprocessing.TimeoutError:
+            raise TaskTimeoutError(
+                "Task {} didn't finish in {}sec".format(self._func.__name__, timeout)
+            )
+
+
+class ThreadExecutor(object):
+    """Thread pool that is used during the driver lifetime.
+
+    Threads are created with the first task and reused by the next ones.
+    """
+
+    def __init__(self, processes=1, task_timeout=None):
+        """Thread executor.
+
+        :param processes: number of threads
+        :type processes: int
+        :param task_timeout: default seconds to wait for a task
+        :type task_timeout: int|float|None
+        """
+        self._processes = processes
+        self.task_timeout = task_timeout
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def resize(self, processes):
+        """Change number of threads, e.g. after login to another number of hosts.
+
+        Running tasks are finished in the old threads.
+        :type processes: int
+        """
+        with self._lock:
+            if processes == self._processes:
+                return
+            self._processes = processes
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.close()
+
+    def submit(self, func, args=(), kwargs=None):
+        """Run the function in a thread.
+
+        :type func: function
+        :type args: list|tuple
+        :type kwargs: dict
+        :rtype: ThreadTask
+        """
+        task = ThreadTask(func, args, kwargs or {})
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPool(processes=self._processes)
+            task._async_result = self._pool.apply_async(task.run)
+        return task
+
+    def shutdown(self, wait=True):
+        """Stop the threads after they finish submitted tasks.
+
+        :param wait: wait for the threads to finish
+        :type wait: bool
+        """
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.close()
+            if wait:
+                pool.join()
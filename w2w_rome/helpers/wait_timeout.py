@@ -0,0 +1,169 @@
+import time
+
+
+class BaseWaitTimeout(object):
+    """Timeout of the wait for pending connections."""
+
+    def __init__(self, move_timeout, num_moves):
+        """Wait timeout.
+
+        :param move_timeout: seconds for one move of the device
+        :type move_timeout: int|float
+        :param num_moves: number of sub port connections we wait for
+        :type num_moves: int
+        """
+        self._move_timeout = move_timeout
+        self._num_moves = num_moves
+        self._start_time = time.time()
+
+    @property
+    def deadline(self):
+        raise NotImplementedError
+
+    @property
+    def time_left(self):
+        return max(self.deadline - time.time(), 0)
+
+    @property
+    def expired(self):
+        return time.time() >= self.deadline
+
+    @property
+    def elapsed(self):
+        return time.time() - self._start_time
+
+    def update(self, pending_connections, ports, num_operations):
+        """Update the timeout with the pending connections of the device.
+
+        :type pending_connections: w2w_rome.helpers.pending_connections.PendingConnections  # noqa: E501
+        :param ports: src and dst ports we wait for
+        :type ports: list[tuple[str, str]]
+        :param num_operations: number of sub port operations logged by the device
+            on the host we wait for
+        :type num_operations: int
+        """
+        pass
+
+    def get_eta(self):
+        """Expected seconds until our connections are completed.
+
+        :rtype: float|None
+        """
+        return None
+
+    @property
+    def total_moves(self):
+        """Our moves and moves queued ahead of them.
+
+        :rtype: int
+        """
+        return self._num_moves
+
+
+class FixedWaitTimeout(BaseWaitTimeout):
+    """Mapping timeout for every move we wait for."""
+
+    @property
+    def deadline(self):
+        return self._start_time + self._move_timeout * self._num_moves
+
+
+class QueueAwareWaitTimeout(BaseWaitTimeout):
+    """Abort the wait if the device doesn't make progress.
+
+    The device makes progress when the pending requests are changed or it logs
+    new sub port operations. The wait is aborted if there is no progress for
+    a few expected durations of the request the device executes now, but not
+    longer than the mapping timeout of its moves. Requests queued ahead of
+    ours extend the whole wait, so long queues of other users are not aborted.
+    """
+
+    STALL_FACTOR = 3
+    MIN_STALL_TIMEOUT = 10
+
+    def __init__(self, move_timeout, num_moves, expected_move_duration=None):
+        """Queue aware wait timeout.
+
+        :type move_timeout: int|float
+        :type num_moves: int
+        :param expected_move_duration: observed seconds of one move
+        :type expected_move_duration: float|None
+        """
+        super(QueueAwareWaitTimeout, self).__init__(move_timeout, num_moves)
+        self._expected_move_duration = expected_move_duration
+        self._last_progress_time = self._start_time
+        self._progress_state = None
+        self._moves_ahead = 0
+        self._remaining_moves = num_moves
+        # moves of the request the device executes now
+        self._current_moves = 1
+
+    @property
+    def stall_timeout(self):
+        max_stall_timeout = self._move_timeout * self._current_moves
+        if self._expected_move_duration is None:
+            return max_stall_timeout
+        return min(
+            max(
+                self._expected_move_duration * self.STALL_FACTOR * self._current_moves,
+                self.MIN_STALL_TIMEOUT,
+            ),
+            max_stall_timeout,
+        )
+
+    @staticmethod
+    def _get_request_moves(request, ports, moves_per_request):
+        """Estimate number of moves of the pending request.
+
+        Other users' requests of logical ports are estimated as ours, requests
+        of E and W sub ports make one move.
+        :type request: w2w_rome.helpers.pending_connections.PendingRequest
+        :param ports: src and dst ports we wait for
+        :type ports: set[tuple[str, str]]
+        :type moves_per_request: float
+        :rtype: float
+        """
+        if request.ports in ports:
+            return moves_per_request
+        if all(port[:1] in "EW" and port[1:].isdigit() for port in request.ports):
+            return 1
+        return max(moves_per_request, 1)
+
+    @property
+    def deadline(self):
+        end_time = self._start_time + self._move_timeout * self.total_moves
+        return min(end_time, self._last_progress_time + self.stall_timeout)
+
+    @property
+    def total_moves(self):
+        return self._num_moves + self._moves_ahead
+
+    def update(self, pending_connections, ports, num_operations):
+        moves_per_request = float(self._num_moves) / len(ports)
+        requests_ahead = pending_connections.get_requests_ahead(ports)
+        our_requests = sum(port_pair in pending_connections for port_pair in ports)
+
+        # moves ahead are known only at the start, then they're executed
+        self._moves_ahead = max(
+            self._moves_ahead, int(requests_ahead * moves_per_request)
+        )
+        self._remaining_moves = (requests_ahead + our_requests) * moves_per_request
+        current_request = next(iter(pending_connections), None)
+        if current_request is not None:
+            self._current_moves = self._get_request_moves(
+                current_request,
+                {(src.upper(), dst.upper()) for src, dst in ports},
+                moves_per_request,
+            )
+
+        progress_state = (
+            tuple(request.ports for request in pending_connections),
+            num_operations,
+        )
+        if progress_state != self._progress_state:
+            self._progress_state = progress_state
+            self._last_progress_time = time.time()
+
+    def get_eta(self):
+        if self._expected_move_duration is not None:
+            return self._remaining_moves * self._expected_move_duration